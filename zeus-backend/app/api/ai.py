@@ -1,5 +1,5 @@
-import asyncio
 import json
+from contextlib import aclosing
 from fastapi import APIRouter, Depends, HTTPException, Request, status, Body
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -10,6 +10,8 @@ from app.schemas.meal_plan import AIMealPlanRequest
 from app.schemas.user import UserResponse
 from app.services.ai_service import ai_service
 from app.utils.dependencies import get_current_active_user
+from app.utils.incremental_json import IncrementalJSONParser
+from app.utils.sse import event_stream_response, wants_event_stream
 from app.database import get_database
 from app.config import settings
 import logging
@@ -39,8 +41,13 @@ async def generate_recipe(
     - Serving size requirements
 
     The generated recipe will be saved to the user's recipes and marked as AI-generated.
+
+    With `Accept: text/event-stream`, recipe fields are streamed as `field`
+    events as they are generated, followed by `done` with the saved recipe.
     """
     user_id = current_user.id if current_user else "anonymous"
+    if wants_event_stream(request):
+        return await event_stream_response(ai_service.generate_recipe_stream(recipe_request, user_id))
     return await ai_service.generate_recipe(recipe_request, user_id)
 
 
@@ -97,6 +104,20 @@ async def get_recipe_suggestions(
     }
 
 
+# Static part of the /ask prompt (the user's context goes in the message)
+ASK_SYSTEM_PROMPT = """You are a helpful cooking assistant for a meal planning app called Zeus.
+You are given context about the user (USER CONTEXT) to give personalized advice.
+
+GUIDELINES:
+- Give specific, actionable recipe ideas or cooking advice
+- When suggesting recipes, mention which pantry items they'd use
+- Respect dietary restrictions and allergies absolutely
+- Keep responses concise but helpful (2-4 paragraphs max)
+- If suggesting a recipe, include a brief ingredient list and quick instructions
+- Format with clear sections using bold text and bullet points
+- Don't use emojis excessively"""
+
+
 class AskAIRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=1000, description="User's question or prompt")
 
@@ -117,6 +138,9 @@ async def ask_ai(
     - "I have chicken and rice, what can I make?"
     - "Give me a high-protein snack idea"
     - "What can I make with what's in my pantry?"
+
+    With `Accept: text/event-stream`, the answer is streamed as `token` events
+    followed by `done` with the same body as the JSON response.
     """
     if not ai_service.client:
         raise HTTPException(
@@ -125,103 +149,20 @@ async def ask_ai(
         )
 
     try:
-        db = get_database()
-
-        # Gather user context
-        user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
-        profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
-        preferences = profile_data.get("preferences", {})
-
-        # Get pantry items
-        pantry_result = db.table("pantry_items").select(
-            "item_name, quantity, unit, category"
-        ).eq("user_id", current_user.id).execute()
-        pantry_items = pantry_result.data or []
-
-        # Get recently liked recipes for taste context
-        liked_result = db.table("recipe_likes").select("recipe_id").eq(
-            "user_id", current_user.id
-        ).limit(10).execute()
-        liked_ids = [r["recipe_id"] for r in (liked_result.data or [])]
-
-        liked_titles = []
-        if liked_ids:
-            liked_recipes = db.table("recipes").select("title, cuisine_type").in_(
-                "id", liked_ids
-            ).execute()
-            liked_titles = [f"{r['title']} ({r.get('cuisine_type', '?')})" for r in (liked_recipes.data or [])]
-
-        # Build context-rich prompt
-        pantry_text = "None"
-        if pantry_items:
-            pantry_entries = []
-            for item in pantry_items[:30]:
-                entry = item.get("item_name", "")
-                if item.get("quantity"):
-                    entry += f" ({item['quantity']} {item.get('unit', '')})"
-                pantry_entries.append(entry)
-            pantry_text = ", ".join(pantry_entries)
-
-        dietary = ", ".join(preferences.get("dietary_restrictions", [])) or "None"
-        allergies = ", ".join(preferences.get("allergies", [])) or "None"
-        cuisines = ", ".join(preferences.get("cuisine_preferences", [])) or "Any"
-        skill = preferences.get("cooking_skill", "intermediate")
-        household = preferences.get("household_size", 2)
-        calorie_target = preferences.get("calorie_target") or "Not set"
-        liked_text = ", ".join(liked_titles[:8]) if liked_titles else "None yet"
-
-        system_prompt = f"""You are a helpful cooking assistant for a meal planning app called Zeus.
-You have context about the user to give personalized advice.
-
-USER CONTEXT:
-- Pantry items: {pantry_text}
-- Dietary restrictions: {dietary}
-- Allergies: {allergies}
-- Preferred cuisines: {cuisines}
-- Cooking skill: {skill}
-- Household size: {household} people
-- Daily calorie target: {calorie_target}
-- Recently liked recipes: {liked_text}
+        prompt, context_used = await _build_ask_prompt(body, current_user.id)
+        messages = [{"role": "user", "content": prompt}]
 
-GUIDELINES:
-- Give specific, actionable recipe ideas or cooking advice
-- When suggesting recipes, mention which pantry items they'd use
-- Respect dietary restrictions and allergies absolutely
-- Keep responses concise but helpful (2-4 paragraphs max)
-- If suggesting a recipe, include a brief ingredient list and quick instructions
-- Format with clear sections using bold text and bullet points
-- Don't use emojis excessively"""
+        if wants_event_stream(request):
+            return await event_stream_response(_stream_ask(messages, context_used))
 
-        import asyncio
-        loop = asyncio.get_event_loop()
-        response_text = await asyncio.wait_for(
-            loop.run_in_executor(
-                ai_service.executor,
-                ai_service._call_claude_sync,
-                "claude-sonnet-4-5-20250929",
-                1500,
-                0.7,
-                [
-                    {"role": "user", "content": f"{system_prompt}\n\nUser's question: {body.message}"}
-                ]
-            ),
-            timeout=30
+        response_text = await ai_service.call_claude(
+            "claude-sonnet-4-5-20250929", 1500, 0.7, messages, timeout=30,
+            system=ASK_SYSTEM_PROMPT, prompt_name="ask",
         )
+        return {"response": response_text, "context_used": context_used}
 
-        return {
-            "response": response_text,
-            "context_used": {
-                "pantry_items_count": len(pantry_items),
-                "has_dietary_restrictions": bool(preferences.get("dietary_restrictions")),
-                "has_liked_recipes": bool(liked_titles),
-            }
-        }
-
-    except asyncio.TimeoutError:
-        raise HTTPException(
-            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            detail="AI response timed out. Please try again."
-        )
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         logger.error(f"Ask AI failed: {e}\n{traceback.format_exc()}")
@@ -231,6 +172,85 @@ GUIDELINES:
         )
 
 
+async def _stream_ask(messages: list, context_used: Dict[str, Any]):
+    """SSE events for /ask: a `token` per text delta, then `done` with the full response."""
+    chunks = []
+    async with aclosing(ai_service.stream_claude(
+        "claude-sonnet-4-5-20250929", 1500, 0.7, messages, timeout=30,
+        system=ASK_SYSTEM_PROMPT, prompt_name="ask",
+    )) as stream:
+        async for text in stream:
+            chunks.append(text)
+            yield "token", {"text": text}
+    yield "done", {"response": "".join(chunks), "context_used": context_used}
+
+
+async def _build_ask_prompt(body: AskAIRequest, user_id: str):
+    """User message for /ask (the user's pantry, preferences and liked recipes), plus a context summary."""
+    db = get_database()
+
+    # Gather user context
+    user_result = await db.table("users").select("profile_data").eq("id", user_id).execute()
+    profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
+    preferences = profile_data.get("preferences", {})
+
+    # Get pantry items
+    pantry_result = await db.table("pantry_items").select(
+        "item_name, quantity, unit, category"
+    ).eq("user_id", user_id).execute()
+    pantry_items = pantry_result.data or []
+
+    # Get recently liked recipes for taste context
+    liked_result = await db.table("recipe_likes").select("recipe_id").eq(
+        "user_id", user_id
+    ).limit(10).execute()
+    liked_ids = [r["recipe_id"] for r in (liked_result.data or [])]
+
+    liked_titles = []
+    if liked_ids:
+        liked_recipes = await db.table("recipes").select("title, cuisine_type").in_(
+            "id", liked_ids
+        ).execute()
+        liked_titles = [f"{r['title']} ({r.get('cuisine_type', '?')})" for r in (liked_recipes.data or [])]
+
+    # Build context-rich prompt
+    pantry_text = "None"
+    if pantry_items:
+        pantry_entries = []
+        for item in pantry_items[:30]:
+            entry = item.get("item_name", "")
+            if item.get("quantity"):
+                entry += f" ({item['quantity']} {item.get('unit', '')})"
+            pantry_entries.append(entry)
+        pantry_text = ", ".join(pantry_entries)
+
+    dietary = ", ".join(preferences.get("dietary_restrictions", [])) or "None"
+    allergies = ", ".join(preferences.get("allergies", [])) or "None"
+    cuisines = ", ".join(preferences.get("cuisine_preferences", [])) or "Any"
+    skill = preferences.get("cooking_skill", "intermediate")
+    household = preferences.get("household_size", 2)
+    calorie_target = preferences.get("calorie_target") or "Not set"
+    liked_text = ", ".join(liked_titles[:8]) if liked_titles else "None yet"
+
+    prompt = f"""USER CONTEXT:
+- Pantry items: {pantry_text}
+- Dietary restrictions: {dietary}
+- Allergies: {allergies}
+- Preferred cuisines: {cuisines}
+- Cooking skill: {skill}
+- Household size: {household} people
+- Daily calorie target: {calorie_target}
+- Recently liked recipes: {liked_text}
+
+User's question: {body.message}"""
+    context_used = {
+        "pantry_items_count": len(pantry_items),
+        "has_dietary_restrictions": bool(preferences.get("dietary_restrictions")),
+        "has_liked_recipes": bool(liked_titles),
+    }
+    return prompt, context_used
+
+
 # --- Smart AI Features ---
 
 HAIKU_MODEL = "claude-haiku-4-5-20251001"
@@ -268,16 +288,17 @@ async def get_substitution(
     """
     from app.services.cache_service import cache, make_cache_key, hash_dict, TTL_AI_RESPONSE
 
-    # Check cache
     cache_key = make_cache_key("substitution", body.recipe_id, body.ingredient_name)
-    cached = cache.get(cache_key, TTL_AI_RESPONSE)
-    if cached:
-        return cached
+    return await cache.get_or_compute(
+        cache_key, TTL_AI_RESPONSE, lambda: _compute_substitution(body, current_user.id)
+    )
 
+
+async def _compute_substitution(body: SubstitutionRequest, user_id: str) -> Dict[str, Any]:
     db = get_database()
 
     # Fetch recipe
-    recipe_result = db.table("recipes").select(
+    recipe_result = await db.table("recipes").select(
         "title, ingredients, instructions"
     ).eq("id", body.recipe_id).execute()
     if not recipe_result.data:
@@ -287,7 +308,7 @@ async def get_substitution(
     ingredients_text = json.dumps(recipe["ingredients"])
 
     # Get user dietary context
-    user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+    user_result = await db.table("users").select("profile_data").eq("id", user_id).execute()
     prefs = (user_result.data[0].get("profile_data", {}).get("preferences", {}) if user_result.data else {})
     dietary = ", ".join(prefs.get("dietary_restrictions", [])) or "None"
     allergies = ", ".join(prefs.get("allergies", [])) or "None"
@@ -309,15 +330,11 @@ Provide 2-3 substitution options. For each, explain:
 Respond in JSON: {{"substitutions": [{{"substitute": "...", "quantity": "...", "impact": "...", "adjustments": "..."}}]}}"""
 
     try:
-        loop = asyncio.get_event_loop()
-        response_text = await asyncio.wait_for(
-            loop.run_in_executor(
-                ai_service.executor,
-                ai_service._call_claude_sync,
-                HAIKU_MODEL, 500, 0.3,
-                [{"role": "user", "content": prompt}]
-            ),
-            timeout=15
+        response_text = await ai_service.call_claude(
+            HAIKU_MODEL, 500, 0.3,
+            [{"role": "user", "content": prompt}],
+            timeout=15,
+            prompt_name="substitution",
         )
 
         import re
@@ -329,12 +346,10 @@ Respond in JSON: {{"substitutions": [{{"substitute": "...", "quantity": "...", "
 
         result["recipe_title"] = recipe["title"]
         result["original_ingredient"] = body.ingredient_name
-
-        cache.set(cache_key, result, TTL_AI_RESPONSE)
         return result
 
-    except asyncio.TimeoutError:
-        raise HTTPException(status_code=504, detail="Request timed out")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Substitution failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to get substitution")
@@ -351,20 +366,27 @@ async def cook_tonight(
     Get a personalized 'what to cook tonight' suggestion based on
     pantry items (prioritizing expiring items), preferences, and time constraints.
     Uses Sonnet for quality recommendations.
+
+    With `Accept: text/event-stream`, suggestion fields (recipe_title, why,
+    quick_instructions, ...) are streamed as `field` events as each completes,
+    followed by `done` with the same body as the JSON response.
     """
     db = get_database()
 
     # Get pantry items, prioritize expiring
-    pantry_result = db.table("pantry_items").select(
+    pantry_result = await db.table("pantry_items").select(
         "item_name, quantity, unit, category, expires_at"
     ).eq("user_id", current_user.id).order("expires_at", desc=False).limit(40).execute()
     pantry_items = pantry_result.data or []
 
     if not pantry_items:
-        return {
+        result = {
             "suggestion": None,
             "message": "Add items to your pantry first so I can suggest what to cook!",
         }
+        if wants_event_stream(request):
+            return await event_stream_response(_single_event("done", result))
+        return result
 
     # Separate expiring items
     from datetime import datetime, timedelta
@@ -378,7 +400,7 @@ async def cook_tonight(
             other_items.append(item)
 
     # Get preferences
-    user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+    user_result = await db.table("users").select("profile_data").eq("id", current_user.id).execute()
     prefs = (user_result.data[0].get("profile_data", {}).get("preferences", {}) if user_result.data else {})
 
     expiring_text = ", ".join(f"{i['item_name']} (expires {i.get('expires_at', '?')})" for i in expiring_soon[:10]) or "None"
@@ -407,33 +429,58 @@ Respond in JSON:
   "quick_instructions": ["Step 1...", "Step 2...", "Step 3..."]
 }}"""
 
+    messages = [{"role": "user", "content": prompt}]
+    if wants_event_stream(request):
+        return await event_stream_response(_stream_cook_tonight(messages, len(expiring_soon)))
+
     try:
-        loop = asyncio.get_event_loop()
-        response_text = await asyncio.wait_for(
-            loop.run_in_executor(
-                ai_service.executor,
-                ai_service._call_claude_sync,
-                SONNET_MODEL, 800, 0.7,
-                [{"role": "user", "content": prompt}]
-            ),
-            timeout=30
+        response_text = await ai_service.call_claude(
+            SONNET_MODEL, 800, 0.7, messages, timeout=30, prompt_name="cook_tonight",
         )
+        return {"suggestion": _parse_suggestion(response_text, len(expiring_soon)), "message": None}
 
-        import re
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
-            suggestion = json.loads(json_match.group())
-        else:
-            suggestion = {"recipe_title": "Custom suggestion", "quick_instructions": [response_text]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Cook tonight failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get suggestion")
 
-        suggestion["expiring_items_count"] = len(expiring_soon)
-        return {"suggestion": suggestion, "message": None}
 
-    except asyncio.TimeoutError:
-        raise HTTPException(status_code=504, detail="Request timed out")
+async def _stream_cook_tonight(messages: list, expiring_count: int):
+    """SSE events for /cook-tonight: a `field` per completed suggestion field, then `done`."""
+    parser = IncrementalJSONParser()
+    chunks = []
+    try:
+        async with aclosing(ai_service.stream_claude(
+            SONNET_MODEL, 800, 0.7, messages, timeout=30, prompt_name="cook_tonight",
+        )) as stream:
+            async for text in stream:
+                chunks.append(text)
+                for name, value in parser.feed(text):
+                    yield "field", {"name": name, "value": value}
+        suggestion = _parse_suggestion("".join(chunks), expiring_count)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Cook tonight failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to get suggestion")
+    yield "done", {"suggestion": suggestion, "message": None}
+
+
+async def _single_event(event: str, data: Any):
+    yield event, data
+
+
+def _parse_suggestion(response_text: str, expiring_count: int) -> Dict[str, Any]:
+    import re
+    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+    if json_match:
+        suggestion = json.loads(json_match.group())
+    else:
+        suggestion = {"recipe_title": "Custom suggestion", "quick_instructions": [response_text]}
+
+    suggestion["expiring_items_count"] = expiring_count
+    return suggestion
 
 
 @router.post("/cooking-tips")
@@ -450,10 +497,10 @@ async def get_cooking_tip(
     from app.services.cache_service import cache, make_cache_key, hash_dict, TTL_AI_RESPONSE
 
     cache_key = make_cache_key("tip", hash_dict({"title": body.recipe_title, "step": body.step_number, "q": body.question or ""}))
-    cached = cache.get(cache_key, TTL_AI_RESPONSE)
-    if cached:
-        return cached
+    return await cache.get_or_compute(cache_key, TTL_AI_RESPONSE, lambda: _compute_cooking_tip(body))
+
 
+async def _compute_cooking_tip(body: CookingTipRequest) -> Dict[str, Any]:
     question_text = body.question or "Explain this step in detail with tips for getting it right."
 
     prompt = f"""You're a patient cooking instructor helping someone cook "{body.recipe_title}".
@@ -468,15 +515,11 @@ Give a helpful, concise answer (2-3 short paragraphs max). Include:
 - Visual/sensory cues to know when it's done right"""
 
     try:
-        loop = asyncio.get_event_loop()
-        response_text = await asyncio.wait_for(
-            loop.run_in_executor(
-                ai_service.executor,
-                ai_service._call_claude_sync,
-                HAIKU_MODEL, 400, 0.5,
-                [{"role": "user", "content": prompt}]
-            ),
-            timeout=10
+        response_text = await ai_service.call_claude(
+            HAIKU_MODEL, 400, 0.5,
+            [{"role": "user", "content": prompt}],
+            timeout=10,
+            prompt_name="cooking_tip",
         )
 
         result = {
@@ -484,11 +527,10 @@ Give a helpful, concise answer (2-3 short paragraphs max). Include:
             "step_number": body.step_number,
             "tip": response_text,
         }
-        cache.set(cache_key, result, TTL_AI_RESPONSE)
         return result
 
-    except asyncio.TimeoutError:
-        raise HTTPException(status_code=504, detail="Request timed out")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Cooking tip failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to get cooking tip")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Response
 from app.schemas.user import UserResponse
 from app.utils.dependencies import get_current_active_user
 from app.database import get_database
@@ -7,9 +7,14 @@ from app.services.nutrition_service import nutrition_service
 from app.services.meal_assignment_service import meal_assignment_service
 from app.services.recipe_shortlist_service import recipe_shortlist_service
 from app.services.analytics_service import analytics
-from typing import Dict, Any, List, Optional
+from app.services.task_service import task_service, ProgressCallback
+from app.services.calorie_optimizer_service import calorie_optimizer, DaySlot
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset_page, next_keyset_cursor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -69,145 +74,230 @@ def _calculate_unique_recipe_counts(
     }
 
 
-@router.post("/generate/")
-async def generate_meal_plan(
-    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    selected_days: Optional[List[str]] = Query(None, description="Days to include"),
-    current_user: UserResponse = Depends(get_current_active_user)
-) -> Dict[str, Any]:
+async def _load_generation_context(db, user_id: str) -> Tuple[dict, List[dict]]:
     """
-    Generate AI-powered meal plan for selected days.
+    Fetch everything plan generation needs about the user in one round trip.
 
-    Creates recipes (breakfast, lunch, dinner) for the selected days based on
-    user's pantry inventory and dietary preferences.
-
-    Args:
-        start_date: The start date of the meal plan (YYYY-MM-DD)
-        selected_days: List of days to include (e.g., ["monday", "tuesday"]).
-                       Defaults to all 7 days if not provided.
+    The profile, pantry and likes reads are independent, so they run
+    concurrently. Returns (preferences, pantry_items); liked recipe IDs are
+    merged into preferences["liked_recipe_ids"] for the shortlist scorer.
     """
-    try:
-        db = get_database()
+    user_result, pantry_result, liked_result = await asyncio.gather(
+        db.table("users").select("profile_data").eq("id", user_id).execute(),
+        db.table("pantry_items").select(
+            "item_name, quantity, unit, category"
+        ).eq("user_id", user_id).execute(),
+        db.table("recipe_likes").select("recipe_id").eq("user_id", user_id).execute(),
+    )
 
-        # Get user preferences
-        user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
-        profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
-        preferences = profile_data.get("preferences", {})
+    profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
+    preferences = profile_data.get("preferences", {})
 
-        # Normalize and validate selected_days
-        all_days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        if selected_days:
-            normalized_days = [d.lower() for d in selected_days]
-            for d in normalized_days:
-                if d not in all_days:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Invalid day: {d}. Must be one of {all_days}"
-                    )
-        else:
-            normalized_days = all_days
-
-        # Hybrid AI meal plan generation: shortlist DB recipes → Claude picks → assign
-        logger.info(f"Generating hybrid meal plan for user {current_user.id} starting {start_date}")
-        logger.info(f"User calorie target: {preferences.get('calorie_target', 'not set')}, protein target: {preferences.get('protein_target_grams', 'not set')}")
-
-        # Get batch cooking preferences
-        cooking_sessions = preferences.get("cooking_sessions_per_week", 6)
-        leftover_tolerance = preferences.get("leftover_tolerance", "moderate")
-        num_days = len(normalized_days)
-
-        logger.info(f"Batch cooking mode: {cooking_sessions} sessions, {leftover_tolerance} tolerance, {num_days} days")
-
-        # Calculate how many unique recipes needed per meal type
-        unique_recipe_counts = _calculate_unique_recipe_counts(
-            num_days, cooking_sessions, leftover_tolerance
-        )
-        logger.info(f"Unique recipe counts needed: {unique_recipe_counts}")
+    pantry_items = pantry_result.data or []
+    logger.info(f"Fetched {len(pantry_items)} pantry items for pantry-aware scoring")
 
-        # Fetch user's pantry items for pantry-aware scoring
-        pantry_result = db.table("pantry_items").select(
-            "item_name, quantity, unit, category"
-        ).eq("user_id", current_user.id).execute()
-        pantry_items = pantry_result.data or []
-        logger.info(f"Fetched {len(pantry_items)} pantry items for pantry-aware scoring")
-
-        # Fetch user's liked recipe IDs for preference-aware selection
-        liked_result = db.table("recipe_likes").select("recipe_id").eq("user_id", current_user.id).execute()
-        liked_recipe_ids = [r["recipe_id"] for r in (liked_result.data or [])]
-        if liked_recipe_ids:
-            preferences["liked_recipe_ids"] = liked_recipe_ids
-            logger.info(f"User has {len(liked_recipe_ids)} liked recipes for preference boosting")
-
-        # Step 1: Shortlist candidates from the recipe database (pantry-aware)
-        candidates = await recipe_shortlist_service.shortlist_candidates(
-            preferences=preferences,
-            selected_days=normalized_days,
-            meal_types=["breakfast", "snack", "lunch", "dinner"],
-            pantry_items=pantry_items,
-        )
+    # Liked recipe IDs for preference-aware selection
+    liked_recipe_ids = [r["recipe_id"] for r in (liked_result.data or [])]
+    if liked_recipe_ids:
+        preferences["liked_recipe_ids"] = liked_recipe_ids
+        logger.info(f"User has {len(liked_recipe_ids)} liked recipes for preference boosting")
 
-        total_candidates = sum(len(v) for v in candidates.values())
-        logger.info(f"Shortlisted {total_candidates} candidate recipes from database")
+    return preferences, pantry_items
 
-        # Step 2: Claude selects the best combination (with pantry context)
-        selected_ids = await ai_service.select_meal_plan_recipes(
-            candidates=candidates,
-            preferences=preferences,
-            selected_days=normalized_days,
-            unique_recipe_counts=unique_recipe_counts,
-            pantry_items=pantry_items,
-        )
 
-        # Step 3: Fetch selected recipes from DB
-        all_selected_ids = []
-        for ids in selected_ids.values():
-            all_selected_ids.extend(ids)
+ALL_DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+def _no_progress(progress: int, stage: str) -> None:
+    pass
+
 
-        if not all_selected_ids:
+def _normalize_selected_days(selected_days: Optional[List[str]]) -> List[str]:
+    """Lowercase and validate selected_days (400 on unknown days). Defaults to all 7."""
+    if not selected_days:
+        return list(ALL_DAYS)
+    normalized_days = [d.lower() for d in selected_days]
+    for d in normalized_days:
+        if d not in ALL_DAYS:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="No recipes could be selected for the meal plan"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid day: {d}. Must be one of {ALL_DAYS}"
             )
+    return normalized_days
+
 
-        recipes_result = db.table("recipes").select(
-            "id, title, meal_type"
-        ).in_("id", all_selected_ids).execute()
+async def _start_background(task_type: str, user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Queue a task (handlers registered at the bottom of this module)."""
+    task_id = await task_service.submit(task_type, user_id, payload)
+    return {"task_id": task_id, "status": "pending"}
 
-        selected_recipes = recipes_result.data or []
-        logger.info(f"Fetched {len(selected_recipes)} selected recipes from database")
 
-        # Step 4: Assign recipes to week slots for selected days only
-        assignments = meal_assignment_service.assign_meals_to_week(
-            recipes=selected_recipes,
-            cooking_sessions=cooking_sessions,
-            leftover_tolerance=leftover_tolerance,
-            selected_days=normalized_days
+async def _generate_plan(
+    user_id: str,
+    week_start_date: str,
+    normalized_days: List[str],
+    replace_existing: bool = False,
+    progress: ProgressCallback = _no_progress,
+    meal_plan_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Hybrid meal plan generation: shortlist DB recipes → Claude picks → assign → save.
+
+    With replace_existing, the user's current plan for week_start_date is
+    deleted just before the new one is saved (so a failed generation keeps it).
+
+    A meal_plan_id chosen up front makes the save idempotent: a retried
+    background task overwrites the plan its earlier attempt saved instead of
+    adding a second one.
+    """
+    db = get_database()
+
+    # Fetch profile, pantry and likes concurrently
+    progress(5, "loading_profile")
+    preferences, pantry_items = await _load_generation_context(db, user_id)
+
+    logger.info(f"Generating hybrid meal plan for user {user_id} starting {week_start_date}")
+    logger.info(f"User calorie target: {preferences.get('calorie_target', 'not set')}, protein target: {preferences.get('protein_target_grams', 'not set')}")
+
+    # Get batch cooking preferences
+    cooking_sessions = preferences.get("cooking_sessions_per_week", 6)
+    leftover_tolerance = preferences.get("leftover_tolerance", "moderate")
+    num_days = len(normalized_days)
+
+    logger.info(f"Batch cooking mode: {cooking_sessions} sessions, {leftover_tolerance} tolerance, {num_days} days")
+
+    # Calculate how many unique recipes needed per meal type
+    unique_recipe_counts = _calculate_unique_recipe_counts(
+        num_days, cooking_sessions, leftover_tolerance
+    )
+    logger.info(f"Unique recipe counts needed: {unique_recipe_counts}")
+
+    # Step 1: Shortlist candidates from the recipe database (pantry-aware)
+    progress(20, "shortlisting")
+    candidates = await recipe_shortlist_service.shortlist_candidates(
+        preferences=preferences,
+        selected_days=normalized_days,
+        meal_types=["breakfast", "snack", "lunch", "dinner"],
+        pantry_items=pantry_items,
+    )
+
+    total_candidates = sum(len(v) for v in candidates.values())
+    logger.info(f"Shortlisted {total_candidates} candidate recipes from database")
+
+    # Step 2: Claude selects the best combination (with pantry context)
+    progress(40, "selecting")
+    selected_ids = await ai_service.select_meal_plan_recipes(
+        candidates=candidates,
+        preferences=preferences,
+        selected_days=normalized_days,
+        unique_recipe_counts=unique_recipe_counts,
+        pantry_items=pantry_items,
+    )
+
+    # Step 3: Fetch selected recipes from DB
+    progress(75, "loading_recipes")
+    all_selected_ids = []
+    for ids in selected_ids.values():
+        all_selected_ids.extend(ids)
+
+    if not all_selected_ids:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="No recipes could be selected for the meal plan"
         )
 
-        saved_recipes = assignments
+    recipes_result = await db.table("recipes").select(
+        "id, title, meal_type"
+    ).in_("id", all_selected_ids).execute()
 
-        # Step 5: Save meal plan
-        meal_plan_record = {
-            "user_id": current_user.id,
-            "plan_name": f"Meal Plan - {num_days} days starting {start_date}",
-            "week_start_date": start_date,
-            "selected_days": normalized_days,
-            "meals": saved_recipes
-        }
-        result = db.table("meal_plans").insert(meal_plan_record).execute()
+    selected_recipes = recipes_result.data or []
+    logger.info(f"Fetched {len(selected_recipes)} selected recipes from database")
 
-        plan_id = result.data[0]["id"]
-        logger.info(f"Successfully created hybrid meal plan {plan_id} with {len(saved_recipes)} days")
-        analytics.track("meal_plan_generated", current_user.id, {"plan_id": plan_id, "days": len(normalized_days)})
+    # Step 4: Assign recipes to week slots for selected days only
+    progress(85, "assigning")
+    assignments = meal_assignment_service.assign_meals_to_week(
+        recipes=selected_recipes,
+        cooking_sessions=cooking_sessions,
+        leftover_tolerance=leftover_tolerance,
+        selected_days=normalized_days
+    )
 
-        return {
-            "meal_plan_id": plan_id,
+    saved_recipes = assignments
+
+    # Step 5: Save meal plan (replacing this week's plan if asked)
+    progress(95, "saving")
+    if replace_existing:
+        existing_query = db.table("meal_plans")\
+            .select("id")\
+            .eq("user_id", user_id)\
+            .eq("week_start_date", week_start_date)
+        if meal_plan_id:
+            existing_query = existing_query.neq("id", meal_plan_id)
+        existing = await existing_query.execute()
+        if existing.data:
+            logger.info(f"Deleting existing meal plan for week {week_start_date}")
+            await db.table("meal_plans").delete().in_(
+                "id", [row["id"] for row in existing.data]
+            ).execute()
+
+    meal_plan_record = {
+        "user_id": user_id,
+        "plan_name": f"Meal Plan - {num_days} days starting {week_start_date}",
+        "week_start_date": week_start_date,
+        "selected_days": normalized_days,
+        "meals": saved_recipes
+    }
+    if meal_plan_id:
+        meal_plan_record["id"] = meal_plan_id
+        result = await db.table("meal_plans").upsert(meal_plan_record, on_conflict="id").execute()
+    else:
+        result = await db.table("meal_plans").insert(meal_plan_record).execute()
+
+    plan_id = result.data[0]["id"]
+    logger.info(f"Successfully created hybrid meal plan {plan_id} with {len(saved_recipes)} days")
+    analytics.track("meal_plan_generated", user_id, {"plan_id": plan_id, "days": len(normalized_days)})
+
+    return {
+        "meal_plan_id": plan_id,
+        "selected_days": normalized_days,
+        "meals": saved_recipes,
+        "summary": {},
+        "grocery_list": []
+    }
+
+
+@router.post("/generate/")
+async def generate_meal_plan(
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    selected_days: Optional[List[str]] = Query(None, description="Days to include"),
+    background: bool = Query(False, description="Return a task_id immediately and generate in the background"),
+    current_user: UserResponse = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Generate AI-powered meal plan for selected days.
+
+    Creates recipes (breakfast, lunch, dinner) for the selected days based on
+    user's pantry inventory and dietary preferences.
+
+    Args:
+        start_date: The start date of the meal plan (YYYY-MM-DD)
+        selected_days: List of days to include (e.g., ["monday", "tuesday"]).
+                       Defaults to all 7 days if not provided.
+        background: If true, returns {"task_id", "status"} right away; poll
+                    GET /api/tasks/{task_id} for progress and the usual response
+                    as its result.
+    """
+    normalized_days = _normalize_selected_days(selected_days)
+
+    if background:
+        return await _start_background("meal_plan_generation", current_user.id, {
+            "user_id": current_user.id,
+            "week_start_date": start_date,
             "selected_days": normalized_days,
-            "meals": saved_recipes,
-            "summary": {},
-            "grocery_list": []
-        }
+            "meal_plan_id": str(uuid.uuid4()),
+        })
 
+    try:
+        return await _generate_plan(current_user.id, start_date, normalized_days)
     except Exception as e:
         logger.error(f"Failed to generate meal plan: {e}")
         raise HTTPException(
@@ -222,15 +312,16 @@ async def optimize_meal_plan_calories(
     current_user: UserResponse = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
-    Analyze a meal plan's calories vs user targets and suggest swaps
-    to better match daily calorie goals. Uses Claude to intelligently
-    pick replacement recipes that bring each day closer to the target.
+    Analyze a meal plan's calories vs user targets and swap recipes
+    to better match daily calorie goals. Days more than 200 cal off target
+    get at most one swap each, solved together by the calorie optimizer
+    (calories first, then protein) so days don't compete for the same recipe.
     """
     try:
         db = get_database()
 
         # Get the meal plan
-        mp_result = db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", current_user.id).execute()
+        mp_result = await db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", current_user.id).execute()
         if not mp_result.data:
             raise HTTPException(status_code=404, detail="Meal plan not found")
 
@@ -239,7 +330,7 @@ async def optimize_meal_plan_calories(
         selected_days = meal_plan.get("selected_days") or ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
 
         # Get user preferences
-        user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+        user_result = await db.table("users").select("profile_data").eq("id", current_user.id).execute()
         profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
         preferences = profile_data.get("preferences", {})
 
@@ -263,7 +354,7 @@ async def optimize_meal_plan_calories(
         if not unique_recipe_ids:
             return {"meal_plan_id": meal_plan_id, "optimized": False, "message": "No recipes in meal plan"}
 
-        recipes_result = db.table("recipes").select(
+        recipes_result = await db.table("recipes").select(
             "id, title, calories, protein_grams, meal_type"
         ).in_("id", list(unique_recipe_ids)).execute()
         recipes_by_id = {r["id"]: r for r in recipes_result.data}
@@ -305,30 +396,43 @@ async def optimize_meal_plan_calories(
                 "analysis": []
             }
 
-        # For each day that's off, find better swaps from the recipe database
-        # Focus on the meal slot that's furthest from its per-meal target
-        swaps_made = 0
-        analysis = []
-        exclude_ids = list(unique_recipe_ids)  # Don't swap to recipes already in the plan
-
+        # Solve swaps for all off-target days together: one candidate pool per
+        # meal type, at most one swap per day, no recipe used twice
+        protein_target = preferences.get("protein_target_grams")
+        days_to_solve = {}
+        meal_targets = {}
         for day_info in days_needing_optimization:
             day = day_info["day"]
-            day_meals_detail = day_info["meals"]
-
-            # Find the meal slot most off-target
-            worst_slot = None
-            worst_diff = 0
-            for meal_type, info in day_meals_detail.items():
+            slots = []
+            protein = 0.0
+            for meal_type, info in day_info["meals"].items():
+                protein += recipes_by_id[info["recipe_id"]].get("protein_grams") or 0
                 # Skip repeat/leftover meals
                 meal_data = meals.get(day, {}).get(meal_type)
                 if isinstance(meal_data, dict) and meal_data.get("is_repeat"):
                     continue
-                slot_diff = abs(info["calories"] - info["target"])
-                if slot_diff > worst_diff:
-                    worst_diff = slot_diff
-                    worst_slot = meal_type
+                slots.append(DaySlot(
+                    meal_type=meal_type,
+                    recipe_id=info["recipe_id"],
+                    calories=info["calories"],
+                    protein=recipes_by_id[info["recipe_id"]].get("protein_grams") or 0,
+                ))
+                meal_targets[meal_type] = info["target"]
+            if slots:
+                days_to_solve[day] = {"calories": day_info["total"], "protein": protein, "slots": slots}
+
+        pools = await calorie_optimizer.fetch_candidate_pools(
+            meal_targets, preferences, exclude_recipe_ids=unique_recipe_ids
+        ) if meal_targets else {}
+        chosen = calorie_optimizer.solve(days_to_solve, pools, calorie_target, protein_target)
+
+        swaps_made = 0
+        analysis = []
+        for day_info in days_needing_optimization:
+            day = day_info["day"]
+            day_meals_detail = day_info["meals"]
 
-            if not worst_slot or worst_diff < 100:
+            if day not in days_to_solve:
                 analysis.append({
                     "day": day,
                     "action": "skipped",
@@ -338,62 +442,49 @@ async def optimize_meal_plan_calories(
                 })
                 continue
 
-            # Find a better recipe for this slot
-            target_cal = day_meals_detail[worst_slot]["target"]
-            old_recipe = day_meals_detail[worst_slot]
-
-            # Query candidates close to the target calories
-            cal_min = max(50, int(target_cal * 0.8))
-            cal_max = int(target_cal * 1.2)
-
-            query = db.table("recipes").select("id, title, calories, protein_grams, image_url, meal_type")
-            query = query.contains("meal_type", [worst_slot.capitalize()])
-            query = query.gte("calories", cal_min)
-            query = query.lte("calories", cal_max)
-            query = query.not_.is_("image_url", "null")
-
-            # Apply dietary restrictions
-            dietary = preferences.get("dietary_restrictions", [])
-            if dietary:
-                query = query.contains("dietary_tags", dietary)
-
-            query = query.order("likes_count", desc=True).limit(20)
-            swap_result = query.execute()
-
-            swap_candidates = [r for r in (swap_result.data or []) if r["id"] not in exclude_ids]
-
-            if not swap_candidates:
-                analysis.append({
-                    "day": day,
-                    "action": "no_swap_found",
-                    "slot": worst_slot,
-                    "reason": f"No {worst_slot} recipes found near {target_cal} cal target",
-                    "total_calories": day_info["total"],
-                    "target": calorie_target,
-                })
+            option = chosen.get(day)
+            if option is None:
+                slots = days_to_solve[day]["slots"]
+                if any(pools.get(slot.meal_type) for slot in slots):
+                    analysis.append({
+                        "day": day,
+                        "action": "skipped",
+                        "reason": "No available swap brings this day meaningfully closer to target",
+                        "total_calories": day_info["total"],
+                        "target": calorie_target,
+                    })
+                else:
+                    worst_slot = max(
+                        slots, key=lambda slot: abs(slot.calories - day_meals_detail[slot.meal_type]["target"])
+                    ).meal_type
+                    target_cal = day_meals_detail[worst_slot]["target"]
+                    analysis.append({
+                        "day": day,
+                        "action": "no_swap_found",
+                        "slot": worst_slot,
+                        "reason": f"No {worst_slot} recipes found near {target_cal} cal target",
+                        "total_calories": day_info["total"],
+                        "target": calorie_target,
+                    })
                 continue
 
-            # Pick the candidate closest to target
-            swap_candidates.sort(key=lambda r: abs((r.get("calories") or 0) - target_cal))
-            new_recipe = swap_candidates[0]
-
             # Apply the swap
-            if day not in meals:
-                meals[day] = {}
-            meals[day][worst_slot] = {
+            slot = option.slot.meal_type
+            old_recipe = day_meals_detail[slot]
+            new_recipe = option.recipe
+            meals[day][slot] = {
                 "recipe_id": new_recipe["id"],
                 "is_repeat": False,
                 "original_day": None,
-                "order": {"breakfast": 1, "snack": 2, "lunch": 3, "dinner": 4}.get(worst_slot, 1)
+                "order": {"breakfast": 1, "snack": 2, "lunch": 3, "dinner": 4}.get(slot, 1)
             }
             swaps_made += 1
-            exclude_ids.append(new_recipe["id"])
 
             new_day_total = day_info["total"] - old_recipe["calories"] + (new_recipe.get("calories") or 0)
             analysis.append({
                 "day": day,
                 "action": "swapped",
-                "slot": worst_slot,
+                "slot": slot,
                 "old_recipe": old_recipe["title"],
                 "old_calories": old_recipe["calories"],
                 "new_recipe": new_recipe["title"],
@@ -405,7 +496,7 @@ async def optimize_meal_plan_calories(
 
         # Save updated meals if any swaps were made
         if swaps_made > 0:
-            db.table("meal_plans").update({"meals": meals}).eq("id", meal_plan_id).execute()
+            await db.table("meal_plans").update({"meals": meals}).eq("id", meal_plan_id).execute()
             logger.info(f"Optimized meal plan {meal_plan_id}: {swaps_made} swaps made")
 
         return {
@@ -456,7 +547,7 @@ async def create_manual_meal_plan(
                 )
 
         # Check if a meal plan already exists for this week
-        existing = db.table("meal_plans")\
+        existing = await db.table("meal_plans")\
             .select("id")\
             .eq("user_id", current_user.id)\
             .eq("week_start_date", start_date)\
@@ -465,7 +556,7 @@ async def create_manual_meal_plan(
         if existing.data:
             # Delete existing meal plan for this week
             logger.info(f"Deleting existing meal plan for week {start_date}")
-            db.table("meal_plans").delete().eq("id", existing.data[0]["id"]).execute()
+            await db.table("meal_plans").delete().eq("id", existing.data[0]["id"]).execute()
 
         # Create the meal plan
         meal_plan_record = {
@@ -475,7 +566,7 @@ async def create_manual_meal_plan(
             "selected_days": normalized_days,
             "meals": meals
         }
-        result = db.table("meal_plans").insert(meal_plan_record).execute()
+        result = await db.table("meal_plans").insert(meal_plan_record).execute()
 
         logger.info(f"Created manual meal plan {result.data[0]['id']} with {len(meals)} days")
 
@@ -499,6 +590,54 @@ async def create_manual_meal_plan(
         )
 
 
+@router.get("/")
+async def list_meal_plans(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header (overrides offset)"),
+    current_user: UserResponse = Depends(get_current_active_user)
+) -> List[Dict[str, Any]]:
+    """
+    List the current user's meal plans, newest first.
+
+    Each item has the same shape as GET /current/. When more plans follow,
+    the X-Next-Cursor header holds the cursor for the next page.
+    """
+    try:
+        db = get_database()
+
+        query = db.table("meal_plans").select("*").eq("user_id", current_user.id)
+        result = await apply_keyset_page(query, limit, offset, cursor).execute()
+        meal_plans = result.data or []
+
+        next_cursor = next_keyset_cursor(meal_plans, limit)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+        return [
+            {
+                "id": meal_plan["id"],
+                "user_id": meal_plan["user_id"],
+                "plan_name": meal_plan["plan_name"],
+                "week_start_date": meal_plan["week_start_date"],
+                "selected_days": meal_plan.get("selected_days") or ALL_DAYS,
+                "meals": meal_plan["meals"],
+                "created_at": meal_plan["created_at"]
+            }
+            for meal_plan in meal_plans
+        ]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to list meal plans: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve meal plans"
+        )
+
+
 @router.get("/current/")
 async def get_current_week_meal_plan(
     current_user: UserResponse = Depends(get_current_active_user)
@@ -512,7 +651,7 @@ async def get_current_week_meal_plan(
         db = get_database()
 
         # Get most recent meal plan (by creation time, not start date)
-        result = db.table("meal_plans")\
+        result = await db.table("meal_plans")\
             .select("*")\
             .eq("user_id", current_user.id)\
             .order("created_at", desc=True)\
@@ -577,7 +716,7 @@ async def get_meal_plan_by_week(
         logger.info(f"Looking for meal plan for week starting {target_monday}")
 
         # Find meal plan for that week
-        result = db.table("meal_plans")\
+        result = await db.table("meal_plans")\
             .select("*")\
             .eq("user_id", current_user.id)\
             .eq("week_start_date", target_monday)\
@@ -616,6 +755,7 @@ async def get_meal_plan_by_week(
 async def generate_meal_plan_for_week(
     week_offset: int,
     selected_days: Optional[List[str]] = Query(None, description="Days to include"),
+    background: bool = Query(False, description="Return a task_id immediately and generate in the background"),
     current_user: UserResponse = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
@@ -625,140 +765,29 @@ async def generate_meal_plan_for_week(
         week_offset: 0 = current week, 1 = next week, etc.
         selected_days: List of days to include (e.g., ["monday", "tuesday"]).
                        Defaults to all 7 days if not provided.
+        background: If true, returns {"task_id", "status"} right away (see /generate/).
 
     If a meal plan already exists for that week, it will be replaced.
     """
-    try:
-        db = get_database()
-
-        # Calculate the Monday of the target week
-        target_monday = get_monday_of_week(datetime.now(), week_offset)
-        logger.info(f"Generating meal plan for week starting {target_monday}")
-
-        # Check if a meal plan already exists for this week
-        existing = db.table("meal_plans")\
-            .select("id")\
-            .eq("user_id", current_user.id)\
-            .eq("week_start_date", target_monday)\
-            .execute()
+    normalized_days = _normalize_selected_days(selected_days)
 
-        if existing.data:
-            # Delete existing meal plan for this week
-            logger.info(f"Deleting existing meal plan for week {target_monday}")
-            db.table("meal_plans").delete().eq("id", existing.data[0]["id"]).execute()
+    # Calculate the Monday of the target week
+    target_monday = get_monday_of_week(datetime.now(), week_offset)
+    logger.info(f"Generating meal plan for week starting {target_monday}")
 
-        # Get user preferences
-        user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
-        profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
-        preferences = profile_data.get("preferences", {})
-
-        # Normalize and validate selected_days
-        all_days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        if selected_days:
-            normalized_days = [d.lower() for d in selected_days]
-            for d in normalized_days:
-                if d not in all_days:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Invalid day: {d}. Must be one of {all_days}"
-                    )
-        else:
-            normalized_days = all_days
-
-        # Get batch cooking preferences
-        cooking_sessions = preferences.get("cooking_sessions_per_week", 6)
-        leftover_tolerance = preferences.get("leftover_tolerance", "moderate")
-        num_days = len(normalized_days)
-
-        logger.info(f"Generating hybrid meal plan for user {current_user.id} starting {target_monday}")
-        logger.info(f"Batch cooking: {cooking_sessions} sessions, {leftover_tolerance} tolerance, {num_days} days")
-
-        # Calculate unique recipe counts
-        unique_recipe_counts = _calculate_unique_recipe_counts(
-            num_days, cooking_sessions, leftover_tolerance
-        )
-
-        # Fetch user's pantry items for pantry-aware scoring
-        pantry_result = db.table("pantry_items").select(
-            "item_name, quantity, unit, category"
-        ).eq("user_id", current_user.id).execute()
-        pantry_items = pantry_result.data or []
-        logger.info(f"Fetched {len(pantry_items)} pantry items for pantry-aware scoring")
-
-        # Fetch user's liked recipe IDs for preference-aware selection
-        liked_result = db.table("recipe_likes").select("recipe_id").eq("user_id", current_user.id).execute()
-        liked_recipe_ids = [r["recipe_id"] for r in (liked_result.data or [])]
-        if liked_recipe_ids:
-            preferences["liked_recipe_ids"] = liked_recipe_ids
-            logger.info(f"User has {len(liked_recipe_ids)} liked recipes for preference boosting")
-
-        # Step 1: Shortlist candidates from the recipe database (pantry-aware)
-        candidates = await recipe_shortlist_service.shortlist_candidates(
-            preferences=preferences,
-            selected_days=normalized_days,
-            meal_types=["breakfast", "snack", "lunch", "dinner"],
-            pantry_items=pantry_items,
-        )
-
-        total_candidates = sum(len(v) for v in candidates.values())
-        logger.info(f"Shortlisted {total_candidates} candidate recipes from database")
-
-        # Step 2: Claude selects the best combination (with pantry context)
-        selected_ids = await ai_service.select_meal_plan_recipes(
-            candidates=candidates,
-            preferences=preferences,
-            selected_days=normalized_days,
-            unique_recipe_counts=unique_recipe_counts,
-            pantry_items=pantry_items,
-        )
-
-        # Step 3: Fetch selected recipes from DB
-        all_selected_ids = []
-        for ids in selected_ids.values():
-            all_selected_ids.extend(ids)
-
-        if not all_selected_ids:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="No recipes could be selected for the meal plan"
-            )
-
-        recipes_result = db.table("recipes").select(
-            "id, title, meal_type"
-        ).in_("id", all_selected_ids).execute()
-
-        selected_recipes = recipes_result.data or []
-
-        # Step 4: Assign recipes to week slots for selected days only
-        assignments = meal_assignment_service.assign_meals_to_week(
-            recipes=selected_recipes,
-            cooking_sessions=cooking_sessions,
-            leftover_tolerance=leftover_tolerance,
-            selected_days=normalized_days
-        )
-
-        saved_recipes = assignments
-
-        # Step 5: Save meal plan
-        meal_plan_record = {
+    if background:
+        return await _start_background("meal_plan_generation", current_user.id, {
             "user_id": current_user.id,
-            "plan_name": f"Meal Plan - {num_days} days starting {target_monday}",
             "week_start_date": target_monday,
             "selected_days": normalized_days,
-            "meals": saved_recipes
-        }
-        result = db.table("meal_plans").insert(meal_plan_record).execute()
-
-        logger.info(f"Successfully created hybrid meal plan {result.data[0]['id']} with {len(saved_recipes)} days")
-
-        return {
-            "meal_plan_id": result.data[0]["id"],
-            "selected_days": normalized_days,
-            "meals": saved_recipes,
-            "summary": {},
-            "grocery_list": []
-        }
+            "replace_existing": True,
+            "meal_plan_id": str(uuid.uuid4()),
+        })
 
+    try:
+        return await _generate_plan(
+            current_user.id, target_monday, normalized_days, replace_existing=True
+        )
     except Exception as e:
         logger.error(f"Failed to generate meal plan for week {week_offset}: {e}")
         raise HTTPException(
@@ -780,7 +809,7 @@ async def get_meal_plan(
     try:
         db = get_database()
 
-        result = db.table("meal_plans")\
+        result = await db.table("meal_plans")\
             .select("*")\
             .eq("id", meal_plan_id)\
             .eq("user_id", current_user.id)\
@@ -832,7 +861,7 @@ async def delete_meal_plan(
         db = get_database()
 
         # Verify ownership
-        mp_result = db.table("meal_plans")\
+        mp_result = await db.table("meal_plans")\
             .select("id")\
             .eq("id", meal_plan_id)\
             .eq("user_id", current_user.id)\
@@ -845,7 +874,7 @@ async def delete_meal_plan(
             )
 
         # Delete the meal plan
-        db.table("meal_plans").delete().eq("id", meal_plan_id).execute()
+        await db.table("meal_plans").delete().eq("id", meal_plan_id).execute()
 
         logger.info(f"Deleted meal plan {meal_plan_id} for user {current_user.id}")
 
@@ -877,7 +906,7 @@ async def update_meal_plan_meals(
         db = get_database()
 
         # Verify ownership
-        mp_result = db.table("meal_plans")\
+        mp_result = await db.table("meal_plans")\
             .select("*")\
             .eq("id", meal_plan_id)\
             .eq("user_id", current_user.id)\
@@ -890,12 +919,12 @@ async def update_meal_plan_meals(
             )
 
         # Update the meals
-        db.table("meal_plans").update({"meals": meals_update}).eq("id", meal_plan_id).execute()
+        await db.table("meal_plans").update({"meals": meals_update}).eq("id", meal_plan_id).execute()
 
         logger.info(f"Updated meals for meal plan {meal_plan_id}")
 
         # Return the updated meal plan
-        updated_result = db.table("meal_plans")\
+        updated_result = await db.table("meal_plans")\
             .select("*")\
             .eq("id", meal_plan_id)\
             .execute()
@@ -942,7 +971,7 @@ async def regenerate_single_meal(
         db = get_database()
 
         # Get meal plan and verify ownership
-        mp_result = db.table("meal_plans")\
+        mp_result = await db.table("meal_plans")\
             .select("*")\
             .eq("id", meal_plan_id)\
             .eq("user_id", current_user.id)\
@@ -957,7 +986,7 @@ async def regenerate_single_meal(
         meal_plan = mp_result.data[0]
 
         # Get user preferences
-        user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+        user_result = await db.table("users").select("profile_data").eq("id", current_user.id).execute()
         profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
         preferences = profile_data.get("preferences", {})
 
@@ -979,6 +1008,7 @@ async def regenerate_single_meal(
             preferences=preferences,
             meal_type=meal_type,
             exclude_recipe_ids=list(existing_recipe_ids),
+            pool_key=meal_plan_id,
         )
 
         if not new_recipe_id:
@@ -988,7 +1018,7 @@ async def regenerate_single_meal(
             )
 
         # Fetch the full recipe for the response
-        recipe_result = db.table("recipes").select("*").eq("id", new_recipe_id).execute()
+        recipe_result = await db.table("recipes").select("*").eq("id", new_recipe_id).execute()
         if not recipe_result.data:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1007,7 +1037,7 @@ async def regenerate_single_meal(
             "order": {"breakfast": 1, "snack": 2, "lunch": 3, "dinner": 4}.get(meal_type, 1)
         }
 
-        db.table("meal_plans").update({"meals": meals}).eq("id", meal_plan_id).execute()
+        await db.table("meal_plans").update({"meals": meals}).eq("id", meal_plan_id).execute()
 
         logger.info(f"Successfully regenerated {meal_type} for {day} with recipe: {recipe_data.get('title')}")
 
@@ -1023,124 +1053,140 @@ async def regenerate_single_meal(
         )
 
 
-@router.post("/{meal_plan_id}/fill-remaining")
-async def fill_remaining_with_ai(
-    meal_plan_id: str,
-    current_user: UserResponse = Depends(get_current_active_user)
-) -> Dict[str, Any]:
-    """
-    Fill all empty meal slots in an existing meal plan with AI-generated recipes.
-
-    Useful for hybrid meal planning where user manually fills some slots
-    and wants AI to fill the rest.
-    """
-    try:
-        db = get_database()
-
-        # Get meal plan and verify ownership
-        mp_result = db.table("meal_plans")\
-            .select("*")\
-            .eq("id", meal_plan_id)\
-            .eq("user_id", current_user.id)\
-            .execute()
-
-        if not mp_result.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meal plan not found"
-            )
-
-        meal_plan = mp_result.data[0]
-        meals = meal_plan.get("meals", {})
+async def _get_owned_meal_plan(meal_plan_id: str, user_id: str) -> dict:
+    """Fetch a meal plan, verifying ownership (404 otherwise)."""
+    db = get_database()
+    mp_result = await db.table("meal_plans")\
+        .select("*")\
+        .eq("id", meal_plan_id)\
+        .eq("user_id", user_id)\
+        .execute()
 
-        # Get selected_days from meal plan (or default to all 7 days)
-        all_days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        selected_days = meal_plan.get("selected_days") or all_days
-
-        # Find empty slots
-        empty_slots = []
-        meal_types = ["breakfast", "snack", "lunch", "dinner"]
-
-        for day in selected_days:
-            day_meals = meals.get(day, {})
-            for meal_type in meal_types:
-                meal_data = day_meals.get(meal_type)
-                if not meal_data:
-                    empty_slots.append((day, meal_type))
-                elif isinstance(meal_data, dict) and not meal_data.get("recipe_id"):
-                    empty_slots.append((day, meal_type))
-
-        if not empty_slots:
-            return {
-                "message": "No empty slots to fill",
-                "filled_count": 0,
-                "meals": meals
-            }
+    if not mp_result.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meal plan not found"
+        )
+    return mp_result.data[0]
 
-        logger.info(f"Filling {len(empty_slots)} empty slots in meal plan {meal_plan_id}")
 
-        # Get user preferences
-        user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
-        profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
-        preferences = profile_data.get("preferences", {})
+async def _fill_remaining_slots(
+    user_id: str,
+    meal_plan: dict,
+    progress: ProgressCallback = _no_progress,
+) -> Dict[str, Any]:
+    """Fill the empty slots of `meal_plan` (already ownership-checked) from the recipe DB."""
+    db = get_database()
+    meal_plan_id = meal_plan["id"]
+    meals = meal_plan.get("meals", {})
+
+    # Get selected_days from meal plan (or default to all 7 days)
+    selected_days = meal_plan.get("selected_days") or ALL_DAYS
+
+    # Find empty slots
+    empty_slots = []
+    meal_types = ["breakfast", "snack", "lunch", "dinner"]
+
+    for day in selected_days:
+        day_meals = meals.get(day, {})
+        for meal_type in meal_types:
+            meal_data = day_meals.get(meal_type)
+            if not meal_data:
+                empty_slots.append((day, meal_type))
+            elif isinstance(meal_data, dict) and not meal_data.get("recipe_id"):
+                empty_slots.append((day, meal_type))
+
+    if not empty_slots:
+        return {
+            "message": "No empty slots to fill",
+            "filled_count": 0,
+            "meals": meals
+        }
 
-        # Collect existing recipe IDs to exclude
-        existing_recipe_ids = set()
-        for day_meals in meals.values():
-            if isinstance(day_meals, dict):
-                for meal_data in day_meals.values():
-                    if isinstance(meal_data, str):
-                        existing_recipe_ids.add(meal_data)
-                    elif isinstance(meal_data, dict) and 'recipe_id' in meal_data:
-                        existing_recipe_ids.add(meal_data['recipe_id'])
+    logger.info(f"Filling {len(empty_slots)} empty slots in meal plan {meal_plan_id}")
+
+    # Get user preferences
+    progress(5, "loading_profile")
+    user_result = await db.table("users").select("profile_data").eq("id", user_id).execute()
+    profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
+    preferences = profile_data.get("preferences", {})
+
+    # Collect existing recipe IDs to exclude
+    existing_recipe_ids = set()
+    for day_meals in meals.values():
+        if isinstance(day_meals, dict):
+            for meal_data in day_meals.values():
+                if isinstance(meal_data, str):
+                    existing_recipe_ids.add(meal_data)
+                elif isinstance(meal_data, dict) and 'recipe_id' in meal_data:
+                    existing_recipe_ids.add(meal_data['recipe_id'])
+
+    # Fill empty slots from one shortlist per meal type (instant, no AI calls)
+    progress(10, "filling")
+    picks = await recipe_shortlist_service.pick_for_slots(
+        preferences=preferences,
+        slots=empty_slots,
+        exclude_recipe_ids=list(existing_recipe_ids),
+        pool_key=meal_plan_id,
+    )
+
+    filled_count = 0
+    for day, meal_type in empty_slots:
+        new_recipe_id = picks.get((day, meal_type))
+        if not new_recipe_id:
+            logger.warning(f"No suitable {meal_type} recipe found for {day}")
+            continue
 
-        # Fill empty slots using shortlist service (instant, no AI calls)
-        filled_count = 0
-        exclude_ids = list(existing_recipe_ids)
+        # Update meal plan with new recipe
+        if day not in meals:
+            meals[day] = {}
+        meals[day][meal_type] = {
+            "recipe_id": new_recipe_id,
+            "is_repeat": False,
+            "original_day": None,
+            "order": {"breakfast": 1, "snack": 2, "lunch": 3, "dinner": 4}.get(meal_type, 1)
+        }
+        filled_count += 1
 
-        for day, meal_type in empty_slots:
-            try:
-                new_recipe_id = await recipe_shortlist_service.pick_top_for_slot(
-                    preferences=preferences,
-                    meal_type=meal_type,
-                    exclude_recipe_ids=exclude_ids,
-                )
+        logger.info(f"Filled {meal_type} for {day} with recipe {new_recipe_id}")
 
-                if not new_recipe_id:
-                    logger.warning(f"No suitable {meal_type} recipe found for {day}")
-                    continue
+    # Save updated meal plan
+    progress(95, "saving")
+    await db.table("meal_plans").update({"meals": meals}).eq("id", meal_plan_id).execute()
 
-                # Update meal plan with new recipe
-                if day not in meals:
-                    meals[day] = {}
-                meals[day][meal_type] = {
-                    "recipe_id": new_recipe_id,
-                    "is_repeat": False,
-                    "original_day": None,
-                    "order": {"breakfast": 1, "snack": 2, "lunch": 3, "dinner": 4}.get(meal_type, 1)
-                }
-                filled_count += 1
+    logger.info(f"Filled {filled_count} slots in meal plan {meal_plan_id}")
 
-                # Add to exclude list to avoid duplicates in subsequent slots
-                exclude_ids.append(new_recipe_id)
+    return {
+        "message": f"Successfully filled {filled_count} empty slots",
+        "filled_count": filled_count,
+        "total_empty": len(empty_slots),
+        "meals": meals
+    }
 
-                logger.info(f"Filled {meal_type} for {day} with recipe {new_recipe_id}")
 
-            except Exception as e:
-                logger.error(f"Failed to fill {meal_type} for {day}: {e}")
-                continue
+@router.post("/{meal_plan_id}/fill-remaining")
+async def fill_remaining_with_ai(
+    meal_plan_id: str,
+    background: bool = Query(False, description="Return a task_id immediately and fill in the background"),
+    current_user: UserResponse = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Fill all empty meal slots in an existing meal plan with AI-generated recipes.
 
-        # Save updated meal plan
-        db.table("meal_plans").update({"meals": meals}).eq("id", meal_plan_id).execute()
+    Useful for hybrid meal planning where user manually fills some slots
+    and wants AI to fill the rest. With background=true the ownership check
+    still happens up front; the fill itself runs as a task (see /generate/).
+    """
+    try:
+        meal_plan = await _get_owned_meal_plan(meal_plan_id, current_user.id)
 
-        logger.info(f"Filled {filled_count} slots in meal plan {meal_plan_id}")
+        if background:
+            return await _start_background("meal_plan_fill", current_user.id, {
+                "user_id": current_user.id,
+                "meal_plan_id": meal_plan_id,
+            })
 
-        return {
-            "message": f"Successfully filled {filled_count} empty slots",
-            "filled_count": filled_count,
-            "total_empty": len(empty_slots),
-            "meals": meals
-        }
+        return await _fill_remaining_slots(current_user.id, meal_plan)
 
     except HTTPException:
         raise
@@ -1167,7 +1213,7 @@ async def get_meal_plan_macro_summary(
         db = get_database()
 
         # Get meal plan and verify ownership
-        mp_result = db.table("meal_plans")\
+        mp_result = await db.table("meal_plans")\
             .select("*")\
             .eq("id", meal_plan_id)\
             .eq("user_id", current_user.id)\
@@ -1210,7 +1256,7 @@ async def get_meal_plan_macro_summary(
             }
 
         # Fetch all unique recipes
-        recipes_result = db.table("recipes")\
+        recipes_result = await db.table("recipes")\
             .select("id, title, calories, protein_grams, carbs_grams, fat_grams")\
             .in_("id", list(unique_recipe_ids))\
             .execute()
@@ -1275,7 +1321,7 @@ async def get_meal_plan_macro_summary(
                     validation_warnings.append(f"{recipe.get('title', 'Unknown')}: {error}")
 
         # Get user targets for comparison
-        user_result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+        user_result = await db.table("users").select("profile_data").eq("id", current_user.id).execute()
         profile_data = user_result.data[0].get("profile_data", {}) if user_result.data else {}
         preferences = profile_data.get("preferences", {})
 
@@ -1321,3 +1367,27 @@ async def get_meal_plan_macro_summary(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to calculate macro summary"
         )
+
+
+# --- Background task handlers (run by TaskService runners, see ?background=true) ---
+
+async def _generate_plan_task(payload: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    return await _generate_plan(
+        payload["user_id"],
+        payload["week_start_date"],
+        payload["selected_days"],
+        replace_existing=payload.get("replace_existing", False),
+        progress=progress,
+        meal_plan_id=payload.get("meal_plan_id"),
+    )
+
+
+async def _fill_remaining_task(payload: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    # Re-read the plan: the user may have edited it while the task was queued
+    meal_plan = await _get_owned_meal_plan(payload["meal_plan_id"], payload["user_id"])
+    return await _fill_remaining_slots(payload["user_id"], meal_plan, progress)
+
+
+# Generation makes one Sonnet selection call; keep it within a worker's Sonnet limit
+task_service.register("meal_plan_generation", _generate_plan_task, max_concurrent=4, timeout=120)
+task_service.register("meal_plan_fill", _fill_remaining_task, max_concurrent=8, timeout=60)
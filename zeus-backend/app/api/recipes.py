@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File
 from typing import List, Optional
+from datetime import date
 from app.schemas.recipe import (
     RecipeCreate, RecipeUpdate, RecipeResponse, RecipeFeedFilter,
     DifficultyLevel, MealType
 )
 from app.schemas.user import UserResponse
 from app.services.recipe_service import recipe_service
+from app.services.feed_service import decode_cursor, encode_cursor, feed_materializer
 from app.services.s3_service import s3_service
 from app.services.cache_service import cache, make_cache_key, hash_dict, TTL_RECIPE_FEED, TTL_RECIPE
 from app.services.analytics_service import analytics
 from app.utils.dependencies import get_current_active_user, get_current_user_optional
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/api/recipes", tags=["Recipes"])
 
 
+def _set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+async def _invalidate_feeds() -> None:
+    """Drop cached feed pages and orderings after a recipe is added, changed or removed."""
+    await cache.invalidate_pattern("feed:")
+    await cache.invalidate_pattern("feedorder:")
+
+
 @router.post("/", response_model=RecipeResponse)
 async def create_recipe(
     recipe_data: RecipeCreate,
@@ -26,12 +40,13 @@ async def create_recipe(
     """
     result = await recipe_service.create_recipe(recipe_data, current_user.id)
     analytics.track("recipe_created", current_user.id, {"recipe_id": result.id})
-    cache.invalidate_pattern("feed:")
+    await _invalidate_feeds()
     return result
 
 
 @router.get("/feed", response_model=List[RecipeResponse])
 async def get_recipe_feed(
+    response: Response,
     cuisine_type: Optional[str] = Query(None, description="Filter by cuisine type"),
     cuisine_preferences: Optional[List[str]] = Query(None, description="Preferred cuisines (returns these first)"),
     difficulty: Optional[DifficultyLevel] = Query(None, description="Filter by difficulty level"),
@@ -43,12 +58,15 @@ async def get_recipe_feed(
     use_pantry_items: bool = Query(False, description="Prioritize recipes using pantry items"),
     limit: int = Query(20, ge=1, le=500, description="Number of recipes to return"),
     offset: int = Query(0, ge=0, description="Number of recipes to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header (overrides offset)"),
     current_user: Optional[UserResponse] = Depends(get_current_user_optional)
 ):
     """
     Get paginated recipe feed with optional filters.
 
     If authenticated, includes user-specific data like likes and saves.
+    Pages with more recipes after them set an X-Next-Cursor header; pass it
+    back as `cursor` to keep paging the same day's ordering.
     """
     filters = RecipeFeedFilter(
         cuisine_type=cuisine_type,
@@ -66,25 +84,38 @@ async def get_recipe_feed(
     
     user_id = current_user.id if current_user else None
 
-    # Cache anonymous feed queries (user-specific feeds have likes/saves so skip cache)
-    if not user_id and not use_pantry_items:
-        cache_key = make_cache_key("feed", hash_dict(filters.dict()))
-        cached = cache.get(cache_key, TTL_RECIPE_FEED)
-        if cached:
-            return cached
-
-    result = await recipe_service.get_recipe_feed(filters, user_id)
-
-    if not user_id and not use_pantry_items:
-        cache.set(cache_key, result, TTL_RECIPE_FEED)
-
-    return result
+    # Pantry mode depends on the user's pantry, so it's never shared
+    if use_pantry_items:
+        return await recipe_service.get_recipe_feed(filters, user_id)
+
+    day = date.today()
+    if cursor:
+        day, filters.offset = decode_cursor(cursor, filters)
+
+    # The page itself is the same for everyone (daily-seeded shuffle), so it's
+    # cached once; each user's likes/saves are overlaid on a copy.
+    cache_key = make_cache_key("feed", hash_dict({**filters.dict(), "day": day.isoformat()}))
+    page = await cache.get_or_compute(
+        cache_key,
+        TTL_RECIPE_FEED,
+        lambda: recipe_service.get_recipe_feed(filters, None, day),
+    )
+    # Based on the ordering, not the page: ids whose rows are gone are skipped
+    # when hydrating, and a short page must not end pagination early
+    ordering = await feed_materializer.get_ordering(filters, day)
+    if filters.offset + filters.limit < len(ordering):
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(filters, day, filters.offset + filters.limit)
+    if not user_id:
+        return page
+    return await recipe_service.with_user_interactions(page, user_id)
 
 
 @router.get("/saved/my", response_model=List[RecipeResponse])
 async def get_my_saved_recipes(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header (overrides offset)"),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """
@@ -92,13 +123,17 @@ async def get_my_saved_recipes(
 
     Requires authentication.
     """
-    return await recipe_service.get_saved_recipes(current_user.id, limit, offset)
+    recipes, next_cursor = await recipe_service.get_saved_recipes(current_user.id, limit, offset, cursor)
+    _set_next_cursor(response, next_cursor)
+    return recipes
 
 
 @router.get("/liked", response_model=List[RecipeResponse])
 async def get_my_liked_recipes(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header (overrides offset)"),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """
@@ -106,15 +141,19 @@ async def get_my_liked_recipes(
 
     Requires authentication.
     """
-    return await recipe_service.get_liked_recipes(current_user.id, limit, offset)
+    recipes, next_cursor = await recipe_service.get_liked_recipes(current_user.id, limit, offset, cursor)
+    _set_next_cursor(response, next_cursor)
+    return recipes
 
 
 @router.get("/my-recipes", response_model=List[RecipeResponse])
 async def get_my_recipes(
+    response: Response,
     search: Optional[str] = Query(None, description="Search by recipe title"),
     meal_type: Optional[str] = Query(None, description="Filter by meal type (breakfast, lunch, dinner)"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header (overrides offset)"),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """
@@ -123,13 +162,16 @@ async def get_my_recipes(
     Supports search by title and filtering by meal type.
     Requires authentication.
     """
-    return await recipe_service.get_user_recipes(
+    recipes, next_cursor = await recipe_service.get_user_recipes(
         current_user.id,
         limit,
         offset,
         search=search,
-        meal_type=meal_type
+        meal_type=meal_type,
+        cursor=cursor,
     )
+    _set_next_cursor(response, next_cursor)
+    return recipes
 
 
 @router.post("/batch", response_model=List[RecipeResponse])
@@ -180,7 +222,9 @@ async def update_recipe(
     
     Only the recipe creator can update their own recipes.
     """
-    return await recipe_service.update_recipe(recipe_id, recipe_data, current_user.id)
+    result = await recipe_service.update_recipe(recipe_id, recipe_data, current_user.id)
+    await _invalidate_feeds()
+    return result
 
 
 @router.delete("/{recipe_id}")
@@ -194,6 +238,7 @@ async def delete_recipe(
     Only the recipe creator can delete their own recipes.
     """
     await recipe_service.delete_recipe(recipe_id, current_user.id)
+    await _invalidate_feeds()
     return {"message": "Recipe deleted successfully"}
 
 
@@ -256,8 +301,10 @@ async def unsave_recipe(
 @router.get("/user/{user_id}", response_model=List[RecipeResponse])
 async def get_user_recipes(
     user_id: str,
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header (overrides offset)"),
     current_user: Optional[UserResponse] = Depends(get_current_user_optional)
 ):
     """
@@ -265,7 +312,9 @@ async def get_user_recipes(
 
     Public endpoint - no authentication required.
     """
-    return await recipe_service.get_user_recipes(user_id, limit, offset)
+    recipes, next_cursor = await recipe_service.get_user_recipes(user_id, limit, offset, cursor=cursor)
+    _set_next_cursor(response, next_cursor)
+    return recipes
 
 
 @router.post("/upload-image")
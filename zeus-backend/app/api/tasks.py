@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from app.schemas.user import UserResponse
 from app.utils.dependencies import get_current_active_user
+from app.utils.sse import event_stream_response, wants_event_stream
 from app.services.task_service import task_service
 from typing import Dict, Any, List
 
@@ -10,12 +11,24 @@ router = APIRouter(prefix="/api/tasks", tags=["Tasks"])
 @router.get("/{task_id}")
 async def get_task_status(
     task_id: str,
+    request: Request,
     current_user: UserResponse = Depends(get_current_active_user),
 ) -> Dict[str, Any]:
-    """Poll for a background task's status and result."""
-    task = task_service.get_task(task_id, user_id=current_user.id)
+    """
+    Poll for a background task's status and result.
+
+    With `Accept: text/event-stream`, keeps the connection open instead and
+    pushes the task as it changes (`task` events), ending with a `done` event
+    once it has completed or failed. Auth runs once per stream rather than on
+    every poll.
+    """
+    task = await task_service.get_task(task_id, user_id=current_user.id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+
+    if wants_event_stream(request):
+        return await event_stream_response(task_service.watch(task_id, user_id=current_user.id))
+
     return task
 
 
@@ -24,4 +37,4 @@ async def get_my_tasks(
     current_user: UserResponse = Depends(get_current_active_user),
 ) -> List[Dict[str, Any]]:
     """Get all active tasks for the current user."""
-    return task_service.get_user_tasks(current_user.id)
+    return await task_service.get_user_tasks(current_user.id)
@@ -19,7 +19,7 @@ async def get_user_preferences(current_user: UserResponse = Depends(get_current_
     """
     try:
         db = get_database()
-        result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+        result = await db.table("users").select("profile_data").eq("id", current_user.id).execute()
 
         if not result.data:
             raise HTTPException(
@@ -67,7 +67,7 @@ async def update_user_preferences(
         db = get_database()
 
         # Get current profile_data
-        result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+        result = await db.table("users").select("profile_data").eq("id", current_user.id).execute()
 
         if not result.data:
             raise HTTPException(
@@ -81,7 +81,7 @@ async def update_user_preferences(
         profile_data["preferences"] = preferences.dict()
 
         # Save back to database
-        db.table("users").update({"profile_data": profile_data}).eq("id", current_user.id).execute()
+        await db.table("users").update({"profile_data": profile_data}).eq("id", current_user.id).execute()
 
         logger.info(f"Updated preferences for user {current_user.id}")
 
@@ -117,7 +117,7 @@ async def update_user_full_profile(
         # Handle preferences update if provided
         if profile_update.preferences is not None:
             # Get current profile_data
-            result = db.table("users").select("profile_data").eq("id", current_user.id).execute()
+            result = await db.table("users").select("profile_data").eq("id", current_user.id).execute()
             profile_data = result.data[0].get("profile_data", {}) if result.data else {}
 
             # Update preferences
@@ -126,10 +126,10 @@ async def update_user_full_profile(
 
         # Update database
         if update_data:
-            db.table("users").update(update_data).eq("id", current_user.id).execute()
+            await db.table("users").update(update_data).eq("id", current_user.id).execute()
 
         # Get updated user data
-        updated_result = db.table("users").select("*").eq("id", current_user.id).execute()
+        updated_result = await db.table("users").select("*").eq("id", current_user.id).execute()
 
         if not updated_result.data:
             raise HTTPException(
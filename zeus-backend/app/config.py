@@ -14,6 +14,29 @@ class Settings(BaseSettings):
     supabase_anon_key: str
     supabase_service_key: str
 
+    # Database connection pool (async PostgREST client, per worker)
+    database_timeout_seconds: int = 30
+    database_max_connections: int = 50
+    database_max_keepalive_connections: int = 20
+
+    # In-process recipe catalog (feed + meal plan shortlist)
+    recipe_catalog_enabled: bool = True
+    recipe_catalog_refresh_seconds: int = 60
+    recipe_catalog_full_refresh_seconds: int = 3600
+
+    # Shared cache (optional - per-process memory cache when unset)
+    redis_url: str = ""
+    cache_l1_enabled: bool = True       # per-process near-cache in front of Redis
+    cache_l1_maxsize: int = 512
+    cache_l1_ttl_seconds: int = 30
+
+    # Background tasks (meal plan generation, slot filling)
+    task_db_path: str = ""                 # SQLite file shared by workers on this host; empty = per-process memory
+    task_worker_concurrency: int = 2       # task runners per web process (0 = run them via `python -m app.worker`)
+    task_max_per_user: int = 2             # running tasks per user, across all runners
+    task_lease_seconds: int = 30           # a runner that misses heartbeats this long loses the task
+    task_retention_seconds: int = 3600     # finished tasks stay pollable this long
+
     # AWS (optional - for image uploads)
     aws_access_key_id: str = ""
     aws_secret_access_key: str = ""
@@ -22,6 +45,13 @@ class Settings(BaseSettings):
 
     # AI
     anthropic_api_key: str
+    ai_max_concurrent_sonnet: int = 4      # in-flight Claude calls per worker, per model family
+    ai_max_concurrent_haiku: int = 8
+    ai_max_queued_requests: int = 16       # waiting callers per model before rejecting with 503
+    ai_max_queue_wait_seconds: float = 10.0
+    ai_max_connections: int = 20           # pooled HTTP connections to the Anthropic API
+    ai_selection_mode: str = "hedged"      # "hedged": race Claude against the algorithm; "claude": wait for Claude
+    ai_selection_budget_seconds: float = 4.0  # hedged mode: how long Claude gets before the algorithm wins
 
     # Instacart
     instacart_api_key: str = ""
@@ -0,0 +1,56 @@
+"""
+Dietary restriction data shared by nutrition_service (compliance checks) and
+utils/exclusion_matching (precompiled matchers and recipe bitmasks).
+"""
+
+# Forbidden ingredients by dietary restriction
+FORBIDDEN_INGREDIENTS = {
+    'vegan': [
+        'butter', 'milk', 'eggs', 'egg', 'chicken', 'beef', 'pork', 'fish',
+        'honey', 'cheese', 'cream', 'yogurt', 'bacon', 'ham', 'turkey',
+        'lamb', 'duck', 'shrimp', 'salmon', 'tuna', 'crab', 'lobster',
+        'scallop', 'mussel', 'oyster', 'anchovy', 'gelatin', 'lard',
+        'whey', 'casein', 'ghee', 'mayonnaise', 'mayo'
+    ],
+    'vegetarian': [
+        'chicken', 'beef', 'pork', 'fish', 'bacon', 'ham', 'turkey',
+        'lamb', 'duck', 'shrimp', 'salmon', 'tuna', 'crab', 'lobster',
+        'scallop', 'mussel', 'oyster', 'anchovy', 'meat', 'seafood',
+        'prosciutto', 'pepperoni', 'sausage', 'steak', 'ribs'
+    ],
+    'gluten-free': [
+        'wheat', 'flour', 'bread', 'pasta', 'barley', 'rye', 'couscous',
+        'semolina', 'spelt', 'farro', 'bulgur', 'seitan', 'breadcrumbs',
+        'panko', 'croutons', 'noodles', 'tortilla', 'pita', 'naan',
+        'soy sauce', 'teriyaki'
+    ],
+    'dairy-free': [
+        'milk', 'butter', 'cheese', 'cream', 'yogurt', 'whey', 'casein',
+        'ghee', 'parmesan', 'mozzarella', 'cheddar', 'feta', 'ricotta',
+        'cottage cheese', 'sour cream', 'ice cream', 'half and half',
+        'condensed milk', 'evaporated milk'
+    ],
+    'nut-free': [
+        'peanut', 'almond', 'cashew', 'walnut', 'pecan', 'pistachio',
+        'hazelnut', 'macadamia', 'brazil nut', 'pine nut', 'chestnut',
+        'nut butter', 'peanut butter', 'almond butter', 'nutella',
+        'marzipan', 'praline', 'nougat'
+    ],
+    'keto': [
+        # Foods that are typically too high in carbs for keto
+        'sugar', 'flour', 'bread', 'pasta', 'rice', 'potato', 'corn',
+        'banana', 'grape', 'mango', 'apple', 'orange', 'honey',
+        'maple syrup', 'agave', 'oatmeal', 'cereal', 'beans', 'lentils',
+        'quinoa', 'couscous'
+    ],
+    'paleo': [
+        'bread', 'pasta', 'rice', 'beans', 'lentils', 'peanut', 'tofu',
+        'soy', 'dairy', 'milk', 'cheese', 'yogurt', 'sugar', 'corn',
+        'potato', 'cereal', 'oatmeal', 'canola oil', 'vegetable oil'
+    ],
+    'pescatarian': [
+        'chicken', 'beef', 'pork', 'bacon', 'ham', 'turkey', 'lamb',
+        'duck', 'meat', 'prosciutto', 'pepperoni', 'sausage', 'steak',
+        'ribs', 'veal', 'venison'
+    ]
+}
@@ -1,29 +1,88 @@
+"""
+Database access for Zeus backend.
+
+The API talks to PostgREST through an async client so queries never block the
+event loop. All requests on a worker share one pooled HTTP/2 connection
+(httpx), so concurrent queries are multiplexed instead of opening a socket per
+call.
+
+The synchronous supabase client is still available through
+get_sync_database() for one-off scripts that run outside the event loop.
+"""
+
+from typing import Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient
 from supabase import create_client, Client
+
 from app.config import settings
-from typing import Optional
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient backed by a shared HTTP/2 connection pool."""
+
+    def create_session(self, base_url, headers, timeout, *args, **kwargs) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=settings.database_max_connections,
+                max_keepalive_connections=settings.database_max_keepalive_connections,
+            ),
+        )
 
 
 class Database:
     def __init__(self):
+        self.client: Optional[AsyncPostgrestClient] = None
         self.supabase: Optional[Client] = None
-        
-    def connect(self) -> Client:
+
+    def connect(self) -> AsyncPostgrestClient:
+        if not self.client:
+            key = settings.supabase_service_key
+            self.client = PooledPostgrestClient(
+                f"{settings.supabase_url}/rest/v1",
+                headers={
+                    "apiKey": key,
+                    "Authorization": f"Bearer {key}",
+                },
+                timeout=settings.database_timeout_seconds,
+            )
+        return self.client
+
+    def get_client(self) -> AsyncPostgrestClient:
+        if not self.client:
+            self.connect()
+        return self.client
+
+    def get_sync_client(self) -> Client:
         if not self.supabase:
             self.supabase = create_client(
                 settings.supabase_url,
                 settings.supabase_service_key
             )
         return self.supabase
-    
-    def get_client(self) -> Client:
-        if not self.supabase:
-            self.connect()
-        return self.supabase
+
+    async def close(self) -> None:
+        """Close the pooled connections (called on app shutdown)."""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
 
 
 # Global database instance
 database = Database()
 
 
-def get_database() -> Client:
-    return database.get_client()
\ No newline at end of file
+def get_database() -> AsyncPostgrestClient:
+    """Async PostgREST client. Every query must be awaited: `await q.execute()`."""
+    return database.get_client()
+
+
+def get_sync_database() -> Client:
+    """Blocking supabase client for scripts. Do not use inside request handlers."""
+    return database.get_sync_client()
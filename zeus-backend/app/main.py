@@ -60,6 +60,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -108,6 +109,62 @@ for router_module in [auth, recipes, ai, pantry, users, meal_plans, grocery_list
     # The routers already have /api/ prefix, so v1 routes are added via redirect
 
 
+# --- Lifecycle ---
+@app.on_event("startup")
+async def start_recipe_catalog():
+    if settings.recipe_catalog_enabled:
+        from app.services.recipe_catalog_service import recipe_catalog
+        recipe_catalog.start()
+
+
+@app.on_event("startup")
+async def start_cache():
+    from app.services.cache_service import cache
+    await cache.start()
+
+
+@app.on_event("startup")
+async def load_ingredient_categories():
+    from app.services.ingredient_category_service import ingredient_categories
+    ingredient_categories.start()
+
+
+@app.on_event("startup")
+async def start_task_runners():
+    from app.services.task_service import task_service
+    await task_service.start(settings.task_worker_concurrency)
+
+
+@app.on_event("shutdown")
+async def stop_task_runners():
+    from app.services.task_service import task_service
+    await task_service.stop()
+
+
+@app.on_event("shutdown")
+async def stop_recipe_catalog():
+    from app.services.recipe_catalog_service import recipe_catalog
+    await recipe_catalog.stop()
+
+
+@app.on_event("shutdown")
+async def close_cache():
+    from app.services.cache_service import cache
+    await cache.close()
+
+
+@app.on_event("shutdown")
+async def close_ai_client():
+    from app.services.ai_service import ai_service
+    await ai_service.close()
+
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    from app.database import database
+    await database.close()
+
+
 # --- Root endpoints ---
 @app.get("/")
 async def root():
@@ -117,12 +174,24 @@ async def root():
 @app.get("/health")
 async def health_check():
     from app.services.cache_service import cache
+    from app.services.recipe_catalog_service import recipe_catalog
+    from app.utils.ingredient_matching import normalize_cache_stats
+    from app.services.ai_service import ai_service
+    from app.services.ingredient_category_service import ingredient_categories
+    from app.services.task_service import task_service
     return {
         "status": "healthy",
         "app_name": settings.app_name,
         "environment": settings.environment,
         "version": "1.2.0",
         "cache": cache.stats if not settings.is_production else None,
+        "recipe_catalog": recipe_catalog.stats if not settings.is_production else None,
+        "ingredient_normalizer": normalize_cache_stats() if not settings.is_production else None,
+        "ai_concurrency": ai_service.limiter.stats() if not settings.is_production else None,
+        "ai_selection": ai_service.selection_stats.stats() if not settings.is_production else None,
+        "ai_prompt_tokens": ai_service.token_usage.stats() if not settings.is_production else None,
+        "ingredient_categories": ingredient_categories.stats if not settings.is_production else None,
+        "tasks": task_service.stats if not settings.is_production else None,
     }
 
 
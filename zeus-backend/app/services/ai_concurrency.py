@@ -0,0 +1,235 @@
+"""
+Per-model concurrency limits for Claude calls.
+
+Each model family (sonnet, haiku) gets a limiter per worker:
+
+- at most `limit` calls in flight
+- at most `max_queue` callers waiting for a slot; anyone beyond that is
+  rejected immediately with 503 instead of queueing until a timeout fires
+- a queued caller gives up with 503 after `max_wait` seconds
+
+Rejections carry a Retry-After header estimated from recent call durations.
+Queue depth, wait times and rejection counts are reported by `stats()` (see
+/health outside production).
+
+HedgeStats records how hedged calls (Claude raced against a local fallback
+under a latency budget) resolve, for tuning the budget. PromptUsageStats
+reports tokens (including prompt-cache reads/writes) and latency per prompt.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from fastapi import HTTPException, status
+
+# Recent samples kept for wait/duration percentiles
+SAMPLE_WINDOW = 256
+
+
+class AIOverloadedError(HTTPException):
+    """503 raised when the AI tier is at capacity (locally or upstream)."""
+
+    def __init__(self, detail: str, retry_after: int = 5):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def model_family(model: str) -> str:
+    return "haiku" if "haiku" in model else "sonnet"
+
+
+def _percentile(samples: Deque[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class ModelLimiter:
+    """Semaphore with a bounded wait queue and wait-time metrics."""
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(limit)
+
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_wait_timeout = 0
+        self._waits: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._durations: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free (median recent call duration)."""
+        return max(1, round(_percentile(self._durations, 0.5) or 5))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of the block."""
+        enqueued = time.monotonic()
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()  # free slot: returns without suspending
+        else:
+            if self.queued >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise AIOverloadedError(
+                    "AI service is busy. Please try again shortly.", self.retry_after()
+                )
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected_wait_timeout += 1
+                raise AIOverloadedError(
+                    "AI service is busy. Please try again shortly.", self.retry_after()
+                )
+            finally:
+                self.queued -= 1
+
+        started = time.monotonic()
+        self._waits.append(started - enqueued)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._durations.append(time.monotonic() - started)
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_wait_timeout": self.rejected_wait_timeout,
+            "wait_ms_p50": round(_percentile(self._waits, 0.5) * 1000, 1),
+            "wait_ms_p95": round(_percentile(self._waits, 0.95) * 1000, 1),
+            "call_ms_p50": round(_percentile(self._durations, 0.5) * 1000, 1),
+        }
+
+
+class AIConcurrencyManager:
+    """One ModelLimiter per model family."""
+
+    def __init__(self, limits: Dict[str, int], max_queue: int, max_wait: float):
+        self._limiters = {
+            family: ModelLimiter(family, limit, max_queue, max_wait)
+            for family, limit in limits.items()
+        }
+
+    def limiter(self, model: str) -> ModelLimiter:
+        return self._limiters[model_family(model)]
+
+    def slot(self, model: str):
+        return self.limiter(model).slot()
+
+    def stats(self) -> dict:
+        return {family: limiter.stats() for family, limiter in self._limiters.items()}
+
+
+class HedgeStats:
+    """Outcomes of a hedged call: which path won, why the fallback was used, latencies."""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.requests = 0
+        self.wins: Dict[str, int] = {"claude": 0, "fallback": 0}
+        self.fallback_reasons: Dict[str, int] = {}
+        self._claude_latencies: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._latencies: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._agreement: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    def record(
+        self,
+        winner: str,
+        latency: float,
+        claude_latency: Optional[float] = None,
+        reason: Optional[str] = None,
+        agreement: Optional[float] = None,
+    ) -> None:
+        """
+        `claude_latency` is set whenever Claude answered (even if rejected);
+        `agreement` is the share of Claude's picks the fallback also made.
+        """
+        self.requests += 1
+        self.wins[winner] += 1
+        self._latencies.append(latency)
+        if reason:
+            self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+        if claude_latency is not None:
+            self._claude_latencies.append(claude_latency)
+        if agreement is not None:
+            self._agreement.append(agreement)
+
+    def stats(self) -> dict:
+        return {
+            "budget_seconds": self.budget,
+            "requests": self.requests,
+            "wins": dict(self.wins),
+            "fallback_reasons": dict(self.fallback_reasons),
+            "latency_ms_p50": round(_percentile(self._latencies, 0.5) * 1000, 1),
+            "latency_ms_p95": round(_percentile(self._latencies, 0.95) * 1000, 1),
+            # Only calls that finished inside the budget; budget misses are in fallback_reasons
+            "claude_ms_p50": round(_percentile(self._claude_latencies, 0.5) * 1000, 1),
+            "claude_ms_p95": round(_percentile(self._claude_latencies, 0.95) * 1000, 1),
+            "claude_agreement_avg": (
+                round(sum(self._agreement) / len(self._agreement), 3) if self._agreement else None
+            ),
+        }
+
+
+class PromptUsageStats:
+    """Token usage and latency per named prompt, from each response's `usage`."""
+
+    def __init__(self):
+        self._prompts: Dict[str, dict] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def record(self, prompt: str, usage, latency: float) -> None:
+        entry = self._prompts.setdefault(prompt, {
+            "calls": 0,
+            "input_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_write_tokens": 0,
+            "output_tokens": 0,
+        })
+        entry["calls"] += 1
+        entry["input_tokens"] += getattr(usage, "input_tokens", 0) or 0
+        entry["cache_read_tokens"] += getattr(usage, "cache_read_input_tokens", 0) or 0
+        entry["cache_write_tokens"] += getattr(usage, "cache_creation_input_tokens", 0) or 0
+        entry["output_tokens"] += getattr(usage, "output_tokens", 0) or 0
+        self._latencies.setdefault(prompt, deque(maxlen=SAMPLE_WINDOW)).append(latency)
+
+    def stats(self) -> dict:
+        report = {}
+        for prompt, entry in self._prompts.items():
+            calls = entry["calls"]
+            # input_tokens excludes cached tokens; the prompt size is the sum of all three
+            prompt_tokens = entry["input_tokens"] + entry["cache_read_tokens"] + entry["cache_write_tokens"]
+            report[prompt] = {
+                **entry,
+                "avg_prompt_tokens": round(prompt_tokens / calls),
+                "avg_uncached_input_tokens": round(entry["input_tokens"] / calls),
+                "avg_output_tokens": round(entry["output_tokens"] / calls),
+                "cache_hit_ratio": round(entry["cache_read_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0,
+                "latency_ms_p50": round(_percentile(self._latencies[prompt], 0.5) * 1000, 1),
+                "latency_ms_p95": round(_percentile(self._latencies[prompt], 0.95) * 1000, 1),
+            }
+        return report
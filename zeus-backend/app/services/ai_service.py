@@ -1,75 +1,326 @@
 import anthropic
-from typing import List, Optional, Dict, Any
+import httpx
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from fastapi import HTTPException, status
 from app.config import settings
 from app.schemas.recipe import AIRecipeRequest, RecipeResponse, Ingredient, Instruction, DifficultyLevel
 from app.schemas.meal_plan import AIMealPlanRequest, MealPlanResponse
+from app.services.ai_concurrency import (
+    AIConcurrencyManager,
+    AIOverloadedError,
+    HedgeStats,
+    PromptUsageStats,
+    model_family,
+)
 from app.services.recipe_service import recipe_service
 from app.services.nutrition_service import nutrition_service
+from app.utils.incremental_json import IncrementalJSONParser
 import json
 import logging
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import time
+from contextlib import aclosing
 
 logger = logging.getLogger(__name__)
 
 # Timeout settings (in seconds)
 RECIPE_GENERATION_TIMEOUT = 60  # 60 seconds for single recipe
 MEAL_PLAN_GENERATION_TIMEOUT = 180  # 180 seconds for full meal plan with ingredients/instructions
+SELECTION_TIMEOUT = 15  # recipe selection when not hedged (see settings.ai_selection_mode)
+
+
+# Static part of the recipe selection prompt; the candidates and the user's
+# targets go in the user message built by _build_selection_prompt
+SELECTION_TABLE_HEADER = "#|title|cal|prot|srv|cuisine|img|pantry|liked"
+
+SELECTION_SYSTEM_PROMPT = f"""You select recipes for a meal plan from numbered candidate lists.
+
+INPUT
+- Plan length, household size, daily targets (per person) and the calorie SPLIT
+  across meals (B=breakfast, S=snack, L=lunch, D=dinner, in % of daily calories)
+- BUDGET: yes when the user wants simpler/cheaper recipes
+- PANTRY: what the user already has, when known
+- One table per meal type, headed "<MEAL TYPE> pick <N>", with columns
+  {SELECTION_TABLE_HEADER}
+  #: candidate index (1-based); cal/prot: calories and protein grams per serving;
+  srv: servings; img: y if the recipe has a photo; pantry: % of its ingredients
+  already in the pantry; liked: y if the user liked it. Blank means unknown/no.
+
+RULES
+Pick EXACTLY the number requested for each meal type.
+
+=== PRIORITY 1: MAXIMIZE PANTRY USAGE ===
+1. Pick recipes with the HIGHEST pantry coverage — this is the #1 priority
+2. Choose recipe combos that share pantry ingredients to use up as much of the pantry as possible
+3. Without pantry data, skip pantry optimization
+
+=== PRIORITY 2: DIETARY & NUTRITION ===
+4. Pick recipes whose calories are closest to the per-meal target (daily calories x SPLIT)
+5. Balance daily nutrition (protein, carbs, fat) across meals
+
+=== PRIORITY 3: VARIETY & PREFERENCES ===
+6. Maximize cuisine variety — avoid repeating the same cuisine within a meal type
+7. Prefer liked recipes — the user has expressed interest in these
+8. Prefer recipes with images
+9. Dinners become next-day lunches, so pick dinners that reheat well
+10. Prefer recipes whose servings are close to the household size
+11. In budget mode, prefer simpler/cheaper recipes
+
+Respond with ONLY a JSON object mapping meal type to list of 1-based indices:
+{{"breakfast": [3], "snack": [1], "dinner": [2, 5], "lunch": [1]}}"""
+
+
+# Static part of the meal plan generation prompt.
+# The per-request values (days, counts, targets, user context) are in the
+# user message built by _build_meal_plan_prompt.
+MEAL_PLAN_SYSTEM_PROMPT = """Generate a BATCH COOKING meal plan where recipes repeat throughout the selected days.
+
+BATCH COOKING
+The user cooks only a few times, so CREATE FEWER UNIQUE RECIPES and REPEAT them
+across meals, using the exact recipe counts given in the request.
+REPEAT PATTERN EXAMPLE (adapt to the selected days):
+- Breakfast A appears on multiple days
+- One day's dinner becomes the next day's lunch (same recipe, same title)
+
+NUTRITION
+Each meal MUST hit the per-meal calorie targets in the request within 10%.
+
+BUDGET MODE (only when the request says it is enabled)
+1. MAXIMIZE pantry item usage - use as many items from the pantry list as possible
+2. Use CHEAP protein sources: eggs, canned beans, lentils, chicken thighs, ground turkey, tofu, canned tuna
+3. Use CHEAP staples: rice, pasta, potatoes, oats, bread, frozen vegetables
+4. AVOID expensive ingredients: salmon, steak, shrimp, fresh berries out of season, specialty cheeses
+5. Prefer BULK-FRIENDLY recipes: soups, stews, casseroles, rice bowls, pasta dishes
+6. Recipes should use overlapping ingredients to minimize grocery shopping
+7. Choose ingredients that are typically on sale or budget-friendly
+
+RESPONSE FORMAT
+1. Respond with ONLY valid JSON - no markdown, no explanations.
+2. INCLUDE full ingredients list and step-by-step instructions for EACH recipe.
+3. DO NOT use emojis or special unicode characters.
+4. REUSE recipes as specified - do NOT generate a unique recipe for every meal!
+
+JSON STRUCTURE (values illustrative; use the request's targets, servings and week_summary values):
+{
+    "week_summary": {
+        "total_unique_recipes": 6,
+        "estimated_total_calories": 14000,
+        "daily_calorie_target": 2000,
+        "cooking_sessions": 6,
+        "num_days": 7
+    },
+    "meals": {
+        "monday": {
+            "breakfast": {
+                "title": "Protein Oatmeal Bowl",
+                "description": "Hearty oatmeal with protein",
+                "prep_time": 5,
+                "cook_time": 10,
+                "servings": 2,
+                "calories": 400,
+                "protein_grams": 30,
+                "carbs_grams": 45,
+                "fat_grams": 12,
+                "cuisine_type": "American",
+                "difficulty": "Easy",
+                "meal_type": ["Breakfast"],
+                "dietary_tags": [],
+                "ingredients": [
+                    {"name": "rolled oats", "quantity": "1", "unit": "cup"},
+                    {"name": "milk", "quantity": "2", "unit": "cups"},
+                    {"name": "protein powder", "quantity": "1", "unit": "scoop"}
+                ],
+                "instructions": [
+                    {"step": 1, "instruction": "Bring milk to a boil in a saucepan."},
+                    {"step": 2, "instruction": "Add oats and reduce heat. Cook for 5 minutes."},
+                    {"step": 3, "instruction": "Stir in protein powder and serve."}
+                ]
+            },
+            "lunch": { ... same structure with ingredients and instructions ... },
+            "dinner": { ... same structure with ingredients and instructions ... }
+        },
+        ... include ONLY the selected days, keyed by lowercase day name
+    },
+    "grocery_list": []
+}
+
+CRITICAL RULES FOR RECIPE REUSE:
+1. Create exactly the requested number of breakfast recipes - REPEAT them to fill all days
+2. Create exactly the requested number of dinner recipes - each dinner REPEATS as the next day's lunch
+3. For lunch: use the EXACT SAME title as the previous day's dinner (it's a leftover)
+4. When repeating a recipe, use IDENTICAL title, calories, protein values
+5. Each meal MUST hit calorie targets within 10%
+6. difficulty must be EXACTLY "Easy", "Medium", or "Hard"
+7. Dinners should be "leftover-friendly" foods (stews, stir-fries, casseroles, grain bowls)
+8. ONLY include meals for the selected days"""
 
 
 class AIService:
     def __init__(self):
+        self.limiter = AIConcurrencyManager(
+            limits={
+                "sonnet": settings.ai_max_concurrent_sonnet,
+                "haiku": settings.ai_max_concurrent_haiku,
+            },
+            max_queue=settings.ai_max_queued_requests,
+            max_wait=settings.ai_max_queue_wait_seconds,
+        )
+        self.selection_budget = (
+            settings.ai_selection_budget_seconds
+            if settings.ai_selection_mode == "hedged"
+            else SELECTION_TIMEOUT
+        )
+        self.selection_stats = HedgeStats(self.selection_budget)
+        self.token_usage = PromptUsageStats()
         try:
-            self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-            self.executor = ThreadPoolExecutor(max_workers=2)
+            # One pooled connection set per worker; a single retry so upstream
+            # overload surfaces quickly instead of stacking backoff delays
+            self.client = anthropic.AsyncAnthropic(
+                api_key=settings.anthropic_api_key,
+                max_retries=1,
+                http_client=httpx.AsyncClient(
+                    timeout=httpx.Timeout(MEAL_PLAN_GENERATION_TIMEOUT, connect=10),
+                    limits=httpx.Limits(
+                        max_connections=settings.ai_max_connections,
+                        max_keepalive_connections=settings.ai_max_connections,
+                    ),
+                ),
+            )
         except Exception as e:
             logger.warning(f"Claude API not configured: {e}")
             self.client = None
-            self.executor = None
-
-    def _call_claude_sync(self, model: str, max_tokens: int, temperature: float, messages: list) -> str:
-        """Synchronous Claude API call for use in executor"""
-        response = self.client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            messages=messages
-        )
-        return response.content[0].text
 
-    async def _call_claude_with_timeout(
+    async def close(self) -> None:
+        """Close the pooled HTTP client (called on app shutdown)."""
+        if self.client:
+            await self.client.close()
+
+    async def call_claude(
         self,
         model: str,
         max_tokens: int,
         temperature: float,
         messages: list,
-        timeout: int
+        timeout: float,
+        system: Optional[str] = None,
+        prompt_name: Optional[str] = None,
     ) -> str:
-        """Call Claude API with timeout handling"""
-        loop = asyncio.get_event_loop()
+        """
+        Call Claude through the per-model concurrency limiter.
 
-        try:
-            # Run the synchronous API call in a thread pool with timeout
-            result = await asyncio.wait_for(
-                loop.run_in_executor(
-                    self.executor,
-                    self._call_claude_sync,
-                    model,
-                    max_tokens,
-                    temperature,
-                    messages
-                ),
-                timeout=timeout
+        `system` holds the static instructions; per-request values go in
+        `messages`. Token usage and latency are recorded under `prompt_name`.
+
+        Raises 503 (AIOverloadedError) right away when the model's queue is
+        full or upstream is overloaded, 429 when Anthropic rate-limits us,
+        and 504 if the call itself exceeds `timeout` seconds.
+        """
+        request = self._request_params(model, max_tokens, temperature, messages, system)
+        async with self.limiter.slot(model):
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self.client.messages.create(**request),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                raise self._timeout_error(timeout)
+            except anthropic.APIStatusError as e:
+                raise self._map_api_error(e, model)
+        self._record_usage(prompt_name or model_family(model), response.usage, started)
+        return response.content[0].text
+
+    async def stream_claude(
+        self,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        messages: list,
+        timeout: float,
+        system: Optional[str] = None,
+        prompt_name: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream Claude's response text as it is generated.
+
+        Same limiter, usage accounting and error mapping as
+        call_claude; `timeout` bounds the whole stream. The slot and the
+        upstream connection are released as soon as the consumer stops
+        iterating (e.g. the client disconnected).
+        """
+        request = self._request_params(model, max_tokens, temperature, messages, system)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with self.limiter.slot(model):
+            started = time.monotonic()
+            try:
+                async with self.client.messages.stream(**request) as stream:
+                    chunks = stream.text_stream.__aiter__()
+                    while True:
+                        # Deadline applies per chunk, not around the yield: time the
+                        # consumer spends between chunks must not cancel its task
+                        try:
+                            text = await asyncio.wait_for(
+                                chunks.__anext__(), timeout=max(0.0, deadline - loop.time())
+                            )
+                        except StopAsyncIteration:
+                            break
+                        yield text
+                    message = await stream.get_final_message()
+            except asyncio.TimeoutError:
+                raise self._timeout_error(timeout)
+            except anthropic.APIStatusError as e:
+                raise self._map_api_error(e, model)
+        self._record_usage(prompt_name or model_family(model), message.usage, started)
+
+    @staticmethod
+    def _request_params(
+        model: str, max_tokens: int, temperature: float, messages: list, system: Optional[str]
+    ) -> Dict[str, Any]:
+        params = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": messages,
+        }
+        if system:
+            params["system"] = system
+        return params
+
+    def _record_usage(self, prompt_name: str, usage, started: float) -> None:
+        latency = time.monotonic() - started
+        self.token_usage.record(prompt_name, usage, latency)
+        logger.info(
+            f"Claude {prompt_name}: {getattr(usage, 'input_tokens', 0)} input "
+            f"(+{getattr(usage, 'cache_read_input_tokens', 0) or 0} cached, "
+            f"{getattr(usage, 'cache_creation_input_tokens', 0) or 0} cache write), "
+            f"{getattr(usage, 'output_tokens', 0)} output tokens in {latency:.1f}s"
+        )
+
+    def _timeout_error(self, timeout: float) -> HTTPException:
+        logger.error(f"Claude API call timed out after {timeout} seconds")
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"AI generation timed out after {timeout} seconds. Please try again."
+        )
+
+    def _map_api_error(self, e: anthropic.APIStatusError, model: str) -> Exception:
+        """HTTP error for an upstream status (429/503/529), else the original error."""
+        if isinstance(e, anthropic.RateLimitError):
+            logger.warning(f"Claude rate limited ({model}): {e}")
+            return HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="AI service is rate limited. Please try again shortly.",
+                headers={"Retry-After": e.response.headers.get("retry-after", "10")},
             )
-            return result
-        except asyncio.TimeoutError:
-            logger.error(f"Claude API call timed out after {timeout} seconds")
-            raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                detail=f"AI generation timed out after {timeout} seconds. Please try again."
+        if e.status_code in (503, 529):
+            logger.warning(f"Claude overloaded ({model}): {e}")
+            return AIOverloadedError(
+                "AI service is overloaded. Please try again shortly.",
+                self.limiter.limiter(model).retry_after(),
             )
-    
+        return e
+
     async def generate_recipe(self, request: AIRecipeRequest, user_id: str) -> RecipeResponse:
         """Generate a recipe using Claude AI based on user preferences"""
         if not self.client:
@@ -84,7 +335,7 @@ class AIService:
         try:
             # Call Claude API with timeout
             logger.info(f"Calling Claude API for recipe generation (timeout: {RECIPE_GENERATION_TIMEOUT}s)")
-            response_text = await self._call_claude_with_timeout(
+            response_text = await self.call_claude(
                 model="claude-sonnet-4-5-20250929",
                 max_tokens=2000,
                 temperature=0.7,
@@ -94,61 +345,116 @@ class AIService:
                         "content": prompt
                     }
                 ],
-                timeout=RECIPE_GENERATION_TIMEOUT
+                timeout=RECIPE_GENERATION_TIMEOUT,
+                prompt_name="recipe",
             )
 
-            # Parse the response
+            # Parse the response and save it
             recipe_data = self._parse_recipe_response(response_text)
+            return await self._save_generated_recipe(recipe_data, request, user_id)
             
-            # Create recipe using the recipe service
-            from app.schemas.recipe import RecipeCreate
-            recipe_create = RecipeCreate(
-                title=recipe_data["title"],
-                description=recipe_data["description"],
-                ingredients=[Ingredient(**ing) for ing in recipe_data["ingredients"]],
-                instructions=[Instruction(**inst) for inst in recipe_data["instructions"]],
-                servings=recipe_data.get("servings", request.servings),
-                prep_time=recipe_data.get("prep_time"),
-                cook_time=recipe_data.get("cook_time"),
-                cuisine_type=recipe_data.get("cuisine_type"),
-                difficulty=DifficultyLevel(recipe_data.get("difficulty", "Medium")),
-                meal_type=recipe_data.get("meal_type", []),
-                dietary_tags=recipe_data.get("dietary_tags", [])
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to generate recipe with Claude: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate recipe. Please try again."
             )
+    
+    async def generate_recipe_stream(
+        self, request: AIRecipeRequest, user_id: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of generate_recipe.
 
-            # Save as AI-generated recipe
-            recipe_response = await recipe_service.create_recipe(recipe_create, user_id)
-
-            # Update with nutrition data
-            from app.database import get_database
-            db = get_database()
-            nutrition_data = {
-                "is_ai_generated": True,
-                "calories": recipe_data.get("calories"),
-                "protein_grams": recipe_data.get("protein_grams"),
-                "carbs_grams": recipe_data.get("carbs_grams"),
-                "fat_grams": recipe_data.get("fat_grams"),
-                "serving_size": recipe_data.get("serving_size")
-            }
-            db.table("recipes").update(nutrition_data).eq("id", recipe_response.id).execute()
+        Yields ("field", {"name": ..., "value": ...}) for each top-level recipe
+        field as soon as Claude finishes writing it, then ("done", RecipeResponse)
+        once the complete recipe is parsed and saved.
+        """
+        if not self.client:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="AI recipe generation service not configured"
+            )
 
-            # Update response object with nutrition data
-            recipe_response.is_ai_generated = True
-            recipe_response.calories = recipe_data.get("calories")
-            recipe_response.protein_grams = recipe_data.get("protein_grams")
-            recipe_response.carbs_grams = recipe_data.get("carbs_grams")
-            recipe_response.fat_grams = recipe_data.get("fat_grams")
-            recipe_response.serving_size = recipe_data.get("serving_size")
+        prompt = self._build_recipe_prompt(request)
+        parser = IncrementalJSONParser()
+        chunks: List[str] = []
 
-            return recipe_response
-            
+        try:
+            logger.info(f"Streaming Claude recipe generation (timeout: {RECIPE_GENERATION_TIMEOUT}s)")
+            async with aclosing(self.stream_claude(
+                model="claude-sonnet-4-5-20250929",
+                max_tokens=2000,
+                temperature=0.7,
+                messages=[{"role": "user", "content": prompt}],
+                timeout=RECIPE_GENERATION_TIMEOUT,
+                prompt_name="recipe",
+            )) as stream:
+                async for text in stream:
+                    chunks.append(text)
+                    for name, value in parser.feed(text):
+                        yield "field", {"name": name, "value": value}
+
+            recipe_data = self._parse_recipe_response("".join(chunks))
+            yield "done", await self._save_generated_recipe(recipe_data, request, user_id)
+
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Failed to generate recipe with Claude: {e}")
+            logger.error(f"Failed to stream recipe from Claude: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to generate recipe. Please try again."
             )
-    
+
+    async def _save_generated_recipe(
+        self, recipe_data: Dict[str, Any], request: AIRecipeRequest, user_id: str
+    ) -> RecipeResponse:
+        """Save a parsed AI recipe (with its nutrition estimate) as the user's recipe."""
+        # Create recipe using the recipe service
+        from app.schemas.recipe import RecipeCreate
+        recipe_create = RecipeCreate(
+            title=recipe_data["title"],
+            description=recipe_data["description"],
+            ingredients=[Ingredient(**ing) for ing in recipe_data["ingredients"]],
+            instructions=[Instruction(**inst) for inst in recipe_data["instructions"]],
+            servings=recipe_data.get("servings", request.servings),
+            prep_time=recipe_data.get("prep_time"),
+            cook_time=recipe_data.get("cook_time"),
+            cuisine_type=recipe_data.get("cuisine_type"),
+            difficulty=DifficultyLevel(recipe_data.get("difficulty", "Medium")),
+            meal_type=recipe_data.get("meal_type", []),
+            dietary_tags=recipe_data.get("dietary_tags", [])
+        )
+
+        # Save as AI-generated recipe
+        recipe_response = await recipe_service.create_recipe(recipe_create, user_id)
+
+        # Update with nutrition data
+        from app.database import get_database
+        db = get_database()
+        nutrition_data = {
+            "is_ai_generated": True,
+            "calories": recipe_data.get("calories"),
+            "protein_grams": recipe_data.get("protein_grams"),
+            "carbs_grams": recipe_data.get("carbs_grams"),
+            "fat_grams": recipe_data.get("fat_grams"),
+            "serving_size": recipe_data.get("serving_size")
+        }
+        await db.table("recipes").update(nutrition_data).eq("id", recipe_response.id).execute()
+
+        # Update response object with nutrition data
+        recipe_response.is_ai_generated = True
+        recipe_response.calories = recipe_data.get("calories")
+        recipe_response.protein_grams = recipe_data.get("protein_grams")
+        recipe_response.carbs_grams = recipe_data.get("carbs_grams")
+        recipe_response.fat_grams = recipe_data.get("fat_grams")
+        recipe_response.serving_size = recipe_data.get("serving_size")
+
+        return recipe_response
+
     async def generate_meal_plan(self, request: AIMealPlanRequest, user_id: str, user_preferences: dict = None) -> Dict[str, Any]:
         """Generate a weekly meal plan using Claude AI with macro-aware targets"""
         if not self.client:
@@ -168,7 +474,7 @@ class AIService:
         try:
             # Call Claude API for full meal plan with ingredients/instructions
             logger.info(f"Calling Claude API for meal plan generation (timeout: {MEAL_PLAN_GENERATION_TIMEOUT}s)")
-            raw_text = await self._call_claude_with_timeout(
+            raw_text = await self.call_claude(
                 model="claude-sonnet-4-5-20250929",
                 max_tokens=32000,  # Large enough for full meal plan with recipes
                 temperature=0.7,
@@ -178,7 +484,9 @@ class AIService:
                         "content": prompt
                     }
                 ],
-                timeout=MEAL_PLAN_GENERATION_TIMEOUT
+                timeout=MEAL_PLAN_GENERATION_TIMEOUT,
+                system=MEAL_PLAN_SYSTEM_PROMPT,
+                prompt_name="meal_plan",
             )
 
             # Parse the response
@@ -191,6 +499,8 @@ class AIService:
                 "tips": meal_plan_data.get("tips", [])
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to generate meal plan with Claude: {e}")
             raise HTTPException(
@@ -255,7 +565,11 @@ class AIService:
         return prompt
     
     def _build_meal_plan_prompt(self, request: AIMealPlanRequest, user_preferences: dict = None) -> str:
-        """Build a detailed prompt for meal plan generation with macro targets and batch cooking support"""
+        """
+        Per-request part of the meal plan prompt: days, recipe counts, macro
+        targets and user context. Instructions and the JSON structure are in
+        MEAL_PLAN_SYSTEM_PROMPT.
+        """
         meals_per_day = ', '.join([meal.value for meal in request.meals_per_day])
 
         # Get user's macro targets with sensible defaults
@@ -314,134 +628,37 @@ class AIService:
         weekly_calories = calorie_target * num_days
         total_meals = num_days * 4  # 4 meals per day (breakfast, snack, lunch, dinner)
 
-        prompt = f"""
-        Generate a BATCH COOKING meal plan where recipes repeat throughout the selected days.
-
-        ========== SELECTED DAYS ==========
-        Generate meals for these {num_days} days ONLY: {days_str}
-        DO NOT include any days outside this list.
-        ===================================
-
-        ========== BATCH COOKING REQUIREMENTS ==========
-        The user wants to cook only {scaled_cooking_sessions} times for this {num_days}-day plan.
-        This means you must CREATE FEWER UNIQUE RECIPES and REPEAT them across meals.
-
-        EXACT RECIPE COUNTS TO CREATE:
-        - Create exactly {unique_breakfasts} BREAKFAST recipes (these will repeat across {num_days} days)
-        - Create exactly {unique_dinners} DINNER recipes (each dinner becomes the next day's lunch)
-        - Create exactly {unique_lunches} standalone LUNCH recipe (for days without dinner leftovers)
-
-        TOTAL UNIQUE RECIPES TO CREATE: {total_unique}
-        DO NOT create {total_meals} different recipes. Create exactly {total_unique} recipes and repeat them.
-
-        REPEAT PATTERN EXAMPLE (adapt to your selected days):
-        - Breakfast A appears on multiple days
-        - One day's dinner becomes the next day's lunch (same recipe, same title)
-        =================================================
-
-        ========== NUTRITION TARGETS (NON-NEGOTIABLE) ==========
-        DAILY CALORIE TARGET: {calorie_target} calories
-        DAILY PROTEIN TARGET: {protein_target}g protein
-
-        PER-MEAL CALORIE TARGETS (User-configured distribution):
-        - Breakfast: {breakfast_cals} calories ({distribution.get("breakfast", 20)}% of daily)
-        - Snack: {snack_cals} calories ({distribution.get("snack", 10)}% of daily)
-        - Lunch: {lunch_cals} calories ({distribution.get("lunch", 30)}% of daily)
-        - Dinner: {dinner_cals} calories ({distribution.get("dinner", 40)}% of daily)
-
-        PER-MEAL PROTEIN TARGETS:
-        - Breakfast: ~{breakfast_protein}g protein
-        - Snack: ~{snack_protein}g protein
-        - Lunch: ~{lunch_protein}g protein
-        - Dinner: ~{dinner_protein}g protein
-
-        CRITICAL: Each meal MUST hit these calorie targets within 10%.
-        ==========================================================
-
-        User Context:
-        - Week starting: {request.week_start_date}
-        - Household size: {user_preferences.get('household_size', 2)} people
-        - Dietary preferences: {', '.join(request.dietary_preferences) if request.dietary_preferences else 'None'}
-        - Cuisine preferences: {', '.join(request.cuisine_preferences) if request.cuisine_preferences else 'Any'}
-        - Cooking skill: {request.cooking_skill or 'intermediate'}
-        - Pantry items available: {', '.join(request.pantry_items) if request.pantry_items else 'None'}
-        - Servings per meal: {user_preferences.get('household_size', request.servings_per_meal)}
-        - Budget mode: {'ENABLED - prioritize cheap ingredients!' if budget_friendly else 'Standard'}
-
-        {"=" * 50 if budget_friendly else ""}
-        {"BUDGET-FRIENDLY MODE ACTIVE" if budget_friendly else ""}
-        {"=" * 50 if budget_friendly else ""}
-        {'''
-        IMPORTANT COST-SAVING REQUIREMENTS:
-        1. MAXIMIZE pantry item usage - use as many items from the pantry list above as possible
-        2. Use CHEAP protein sources: eggs, canned beans, lentils, chicken thighs, ground turkey, tofu, canned tuna
-        3. Use CHEAP staples: rice, pasta, potatoes, oats, bread, frozen vegetables
-        4. AVOID expensive ingredients: salmon, steak, shrimp, fresh berries out of season, specialty cheeses
-        5. Prefer BULK-FRIENDLY recipes: soups, stews, casseroles, rice bowls, pasta dishes
-        6. Recipes should use overlapping ingredients to minimize grocery shopping
-        7. Choose ingredients that are typically on sale or budget-friendly
-        ''' if budget_friendly else ''}
-
-        RESPONSE FORMAT:
-        1. Respond with ONLY valid JSON - no markdown, no explanations.
-        2. INCLUDE full ingredients list and step-by-step instructions for EACH recipe.
-        3. DO NOT use emojis or special unicode characters.
-        4. REUSE recipes as specified above - do NOT generate 21 unique meals!
-
-        JSON STRUCTURE:
-        {{
-            "week_summary": {{
-                "total_unique_recipes": {total_unique},
-                "estimated_total_calories": {weekly_calories},
-                "daily_calorie_target": {calorie_target},
-                "cooking_sessions": {scaled_cooking_sessions},
-                "num_days": {num_days}
-            }},
-            "meals": {{
-                "{selected_days[0]}": {{
-                    "breakfast": {{
-                        "title": "Protein Oatmeal Bowl",
-                        "description": "Hearty oatmeal with protein",
-                        "prep_time": 5,
-                        "cook_time": 10,
-                        "servings": {request.servings_per_meal},
-                        "calories": {breakfast_cals},
-                        "protein_grams": {breakfast_protein},
-                        "carbs_grams": 45,
-                        "fat_grams": 12,
-                        "cuisine_type": "American",
-                        "difficulty": "Easy",
-                        "meal_type": ["Breakfast"],
-                        "dietary_tags": [],
-                        "ingredients": [
-                            {{"name": "rolled oats", "quantity": "1", "unit": "cup"}},
-                            {{"name": "milk", "quantity": "2", "unit": "cups"}},
-                            {{"name": "protein powder", "quantity": "1", "unit": "scoop"}}
-                        ],
-                        "instructions": [
-                            {{"step": 1, "instruction": "Bring milk to a boil in a saucepan."}},
-                            {{"step": 2, "instruction": "Add oats and reduce heat. Cook for 5 minutes."}},
-                            {{"step": 3, "instruction": "Stir in protein powder and serve."}}
-                        ]
-                    }},
-                    "lunch": {{ ... same structure with ingredients and instructions ... }},
-                    "dinner": {{ ... same structure with ingredients and instructions ... }}
-                }},
-                ... include ONLY the selected days: {days_str}
-            }},
-            "grocery_list": []
-        }}
+        budget_text = (
+            "ENABLED - prioritize cheap ingredients (apply the BUDGET MODE requirements)"
+            if budget_friendly else "Standard"
+        )
 
-        CRITICAL RULES FOR RECIPE REUSE:
-        1. Create exactly {unique_breakfasts} breakfast recipes - REPEAT them to fill all {num_days} days
-        2. Create exactly {unique_dinners} dinner recipes - each dinner REPEATS as the next day's lunch
-        3. For lunch: use the EXACT SAME title as the previous day's dinner (it's a leftover)
-        4. When repeating a recipe, use IDENTICAL title, calories, protein values
-        5. Each meal MUST hit calorie targets within 10%
-        6. difficulty must be EXACTLY "Easy", "Medium", or "Hard"
-        7. Dinners should be "leftover-friendly" foods (stews, stir-fries, casseroles, grain bowls)
-        8. ONLY include meals for the selected days: {days_str}
-        """
+        prompt = f"""SELECTED DAYS ({num_days}, generate ONLY these): {days_str}
+
+BATCH COOKING: the user cooks {scaled_cooking_sessions} times for this {num_days}-day plan.
+- Create exactly {unique_breakfasts} BREAKFAST recipes (repeat across the {num_days} days)
+- Create exactly {unique_dinners} DINNER recipes (each dinner becomes the next day's lunch)
+- Create exactly {unique_lunches} standalone LUNCH recipe (for days without dinner leftovers)
+TOTAL UNIQUE RECIPES: {total_unique} (NOT {total_meals})
+
+NUTRITION TARGETS (NON-NEGOTIABLE):
+- Daily: {calorie_target} calories, {protein_target}g protein
+- Breakfast: {breakfast_cals} cal ({distribution.get("breakfast", 20)}%), ~{breakfast_protein}g protein
+- Snack: {snack_cals} cal ({distribution.get("snack", 10)}%), ~{snack_protein}g protein
+- Lunch: {lunch_cals} cal ({distribution.get("lunch", 30)}%), ~{lunch_protein}g protein
+- Dinner: {dinner_cals} cal ({distribution.get("dinner", 40)}%), ~{dinner_protein}g protein
+
+USER CONTEXT:
+- Week starting: {request.week_start_date}
+- Household size: {user_preferences.get('household_size', 2)} people
+- Dietary preferences: {', '.join(request.dietary_preferences) if request.dietary_preferences else 'None'}
+- Cuisine preferences: {', '.join(request.cuisine_preferences) if request.cuisine_preferences else 'Any'}
+- Cooking skill: {request.cooking_skill or 'intermediate'}
+- Pantry items available: {', '.join(request.pantry_items) if request.pantry_items else 'None'}
+- Servings per meal: {user_preferences.get('household_size', request.servings_per_meal)}
+- Budget mode: {budget_text}
+
+week_summary values: total_unique_recipes={total_unique}, estimated_total_calories={weekly_calories}, daily_calorie_target={calorie_target}, cooking_sessions={scaled_cooking_sessions}, num_days={num_days}"""
 
         return prompt
     
@@ -557,38 +774,94 @@ class AIService:
         Ask Claude to select the best recipe combination from shortlisted candidates.
 
         Returns dict of meal_type -> list of recipe IDs.
-        Falls back to algorithmic selection if Claude fails.
+
+        The algorithmic selection is computed up front. In hedged mode
+        (settings.ai_selection_mode) Claude gets ai_selection_budget_seconds;
+        if it hasn't returned a complete selection by then, the algorithmic
+        one is used and the Claude call is cancelled. In "claude" mode Claude
+        gets the full SELECTION_TIMEOUT. Outcomes are recorded in
+        selection_stats.
         """
+        started = time.monotonic()
+        fallback = self._algorithmic_selection(candidates, unique_recipe_counts)
+
+        def use_fallback(reason: str, claude_latency: Optional[float] = None):
+            self.selection_stats.record(
+                "fallback", time.monotonic() - started, claude_latency, reason=reason
+            )
+            return fallback
+
         if not self.client:
             logger.warning("Claude not configured, using algorithmic fallback")
-            return self._algorithmic_selection(candidates, unique_recipe_counts)
+            return use_fallback("not_configured")
 
         prompt = self._build_selection_prompt(
             candidates, preferences, selected_days, unique_recipe_counts, pantry_items
         )
+        budget = self.selection_budget
 
+        claude_started = time.monotonic()
         try:
-            loop = asyncio.get_event_loop()
             response_text = await asyncio.wait_for(
-                loop.run_in_executor(
-                    self.executor,
-                    self._call_claude_sync,
+                self.call_claude(
                     "claude-sonnet-4-5-20250929",
                     500,
                     0.4,
-                    [{"role": "user", "content": prompt}]
+                    [{"role": "user", "content": prompt}],
+                    timeout=SELECTION_TIMEOUT,
+                    system=SELECTION_SYSTEM_PROMPT,
+                    prompt_name="meal_plan_selection",
                 ),
-                timeout=15
+                timeout=budget,
             )
-
-            return self._parse_selection_response(response_text, candidates)
+            claude_latency = time.monotonic() - claude_started
+            selection = self._parse_selection_response(response_text, candidates)
 
         except asyncio.TimeoutError:
-            logger.warning("Claude selection timed out, using algorithmic fallback")
-            return self._algorithmic_selection(candidates, unique_recipe_counts)
+            logger.info(f"Claude selection exceeded {budget}s budget, using algorithmic selection")
+            return use_fallback("budget")
+        except HTTPException as e:
+            # Busy, rate limited or timed out: the algorithm is instant
+            logger.warning(f"Claude selection unavailable ({e.status_code}), using algorithmic fallback")
+            return use_fallback("unavailable")
         except Exception as e:
             logger.warning(f"Claude selection failed: {e}, using algorithmic fallback")
-            return self._algorithmic_selection(candidates, unique_recipe_counts)
+            return use_fallback("error", time.monotonic() - claude_started)
+
+        if not self._selection_is_complete(selection, candidates, unique_recipe_counts):
+            logger.warning(f"Claude selection incomplete ({selection}), using algorithmic fallback")
+            return use_fallback("incomplete", claude_latency)
+
+        self.selection_stats.record(
+            "claude",
+            time.monotonic() - started,
+            claude_latency,
+            agreement=self._selection_agreement(selection, fallback),
+        )
+        logger.info(f"Claude selection won in {claude_latency:.1f}s")
+        return selection
+
+    @staticmethod
+    def _selection_is_complete(
+        selection: Dict[str, List[str]],
+        candidates: Dict[str, List[Dict[str, Any]]],
+        unique_recipe_counts: Dict[str, int],
+    ) -> bool:
+        """Every meal type has as many distinct recipes as needed (or as exist)."""
+        for meal_type, count in unique_recipe_counts.items():
+            needed = min(count, len(candidates.get(meal_type, [])))
+            if len(set(selection.get(meal_type, []))) < needed:
+                return False
+        return True
+
+    @staticmethod
+    def _selection_agreement(selection: Dict[str, List[str]], fallback: Dict[str, List[str]]) -> float:
+        """Share of Claude's picks the algorithm also picked (quality/divergence signal)."""
+        picked = {rid for ids in selection.values() for rid in ids}
+        if not picked:
+            return 1.0
+        fallback_ids = {rid for ids in fallback.values() for rid in ids}
+        return len(picked & fallback_ids) / len(picked)
 
     def _build_selection_prompt(
         self,
@@ -598,7 +871,12 @@ class AIService:
         unique_recipe_counts: Dict[str, int],
         pantry_items: Optional[List[dict]] = None,
     ) -> str:
-        """Build compact prompt for Claude recipe selection."""
+        """
+        Per-request part of the selection prompt (rules are in SELECTION_SYSTEM_PROMPT).
+
+        Candidates go in one pipe-separated table per meal type; the column
+        legend lives in the system prompt, so each row costs only its values.
+        """
         calorie_target = preferences.get("calorie_target") or 2000
         protein_target = preferences.get("protein_target_grams") or 150
         distribution = preferences.get("meal_calorie_distribution", {
@@ -610,80 +888,50 @@ class AIService:
                 "breakfast": 20, "snack": 10, "lunch": 30, "dinner": 40
             }
         budget = preferences.get("budget_friendly", False)
+        household_size = preferences.get("household_size", 2)
         num_days = len(selected_days)
 
-        # Build pantry context
-        pantry_section = ""
+        lines = [
+            f"{num_days}-day meal plan",
+            f"HOUSEHOLD: {household_size}",
+            f"DAILY: {calorie_target} cal, {protein_target}g protein",
+            "SPLIT: " + " ".join(
+                f"{meal_type[0].upper()}{distribution.get(meal_type, default)}"
+                for meal_type, default in (("breakfast", 20), ("snack", 10), ("lunch", 30), ("dinner", 40))
+            ),
+        ]
+        if budget:
+            lines.append("BUDGET: yes")
+
         if pantry_items:
             pantry_names = [item.get("item_name", "") for item in pantry_items if item.get("item_name")]
             if pantry_names:
-                pantry_section = f"\nUSER'S PANTRY: {', '.join(pantry_names[:40])}\n"
+                lines.append(f"PANTRY: {', '.join(pantry_names[:40])}")
+
+        def cell(value) -> str:
+            return "" if value is None else str(value).replace("|", "/")
 
-        sections = []
         for meal_type in ["breakfast", "snack", "lunch", "dinner"]:
             items = candidates.get(meal_type, [])
             if not items:
                 continue
-            count_needed = unique_recipe_counts.get(meal_type, 1)
-            lines = []
+            lines.append("")
+            lines.append(f"{meal_type.upper()} pick {unique_recipe_counts.get(meal_type, 1)}")
+            lines.append(SELECTION_TABLE_HEADER)
             for i, r in enumerate(items):
-                cal = r.get("calories", "?")
-                prot = r.get("protein_grams", "?")
-                servings = r.get("servings", "?")
-                cuisine = r.get("cuisine_type", "?")
-                has_img = "IMG" if r.get("image_url") else "no-img"
-                pantry_pct = r.get("_pantry_coverage")
-                pantry_tag = f" | {pantry_pct}% pantry" if pantry_pct else ""
-                liked_tag = " | LIKED" if r.get("_liked") else ""
-                lines.append(f"  {i+1}. {r['title']} | {cal}cal {prot}g protein | {servings} servings | {cuisine} | {has_img}{pantry_tag}{liked_tag}")
-
-            sections.append(
-                f"=== {meal_type.upper()} (pick {count_needed}) ===\n" + "\n".join(lines)
-            )
-
-        candidate_text = "\n\n".join(sections)
-
-        rules = ["Pick EXACTLY the number requested for each meal type"]
-
-        # Priority-ordered rules — pantry first, then dietary, then nutrition
-        rules.append("")
-        rules.append("=== PRIORITY 1: MAXIMIZE PANTRY USAGE ===")
-        if pantry_items:
-            rules.append("Pick recipes with the HIGHEST pantry coverage (% pantry) — this is the #1 priority")
-            rules.append("Choose recipe combos that share pantry ingredients to use up as much of the pantry as possible")
-        else:
-            rules.append("No pantry data available — skip pantry optimization")
-
-        rules.append("")
-        rules.append("=== PRIORITY 2: DIETARY & NUTRITION ===")
-        rules.append("Pick recipes whose calories are closest to the per-meal target")
-        rules.append("Balance daily nutrition (protein, carbs, fat) across meals")
-
-        rules.append("")
-        rules.append("=== PRIORITY 3: VARIETY & PREFERENCES ===")
-        rules.append("Maximize cuisine variety — avoid repeating the same cuisine within a meal type")
-        rules.append("Prefer recipes marked LIKED — the user has expressed interest in these")
-        rules.append("Prefer recipes with images (IMG)")
-        rules.append("Dinners become next-day lunches, so pick dinners that reheat well")
-
-        rules_text = "\n".join(f"{i+1}. {rule}" if rule and not rule.startswith("===") else rule for i, rule in enumerate(rules))
-
-        household_size = preferences.get("household_size", 2)
-
-        return f"""Select recipes for a {num_days}-day meal plan.
-
-HOUSEHOLD SIZE: {household_size} people — prefer recipes whose servings are close to {household_size}
-DAILY TARGETS: {calorie_target} cal, {protein_target}g protein (per person)
-DISTRIBUTION: Breakfast {distribution.get('breakfast', 20)}%, Snack {distribution.get('snack', 10)}%, Lunch {distribution.get('lunch', 30)}%, Dinner {distribution.get('dinner', 40)}%
-{"BUDGET MODE: prefer simpler/cheaper recipes" if budget else ""}
-{pantry_section}
-{candidate_text}
-
-RULES:
-{rules_text}
-
-Respond with ONLY a JSON object mapping meal type to list of 1-based indices:
-{{"breakfast": [3], "snack": [1], "dinner": [2, 5], "lunch": [1]}}"""
+                lines.append("|".join((
+                    str(i + 1),
+                    cell(r.get("title")),
+                    cell(r.get("calories")),
+                    cell(r.get("protein_grams")),
+                    cell(r.get("servings")),
+                    cell(r.get("cuisine_type")),
+                    "y" if r.get("image_url") else "",
+                    cell(r.get("_pantry_coverage") or None),
+                    "y" if r.get("_liked") else "",
+                )))
+
+        return "\n".join(lines)
 
     def _parse_selection_response(
         self,
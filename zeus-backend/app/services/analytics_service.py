@@ -57,7 +57,7 @@ class AnalyticsService:
             # Insert in batches of 50
             for i in range(0, len(events_to_flush), 50):
                 batch = events_to_flush[i:i + 50]
-                db.table("analytics_events").insert(batch).execute()
+                await db.table("analytics_events").insert(batch).execute()
         except Exception as e:
             logger.warning(f"Failed to flush analytics: {e}")
             # Events are lost — acceptable for analytics
@@ -71,7 +71,7 @@ class AnalyticsService:
         try:
             db = get_database()
             since = (datetime.utcnow() - timedelta(days=days)).isoformat()
-            result = db.table("analytics_events").select(
+            result = await db.table("analytics_events").select(
                 "event_name"
             ).gte("created_at", since).execute()
 
@@ -98,7 +98,7 @@ class AnalyticsService:
         try:
             db = get_database()
             since = (datetime.utcnow() - timedelta(days=days)).isoformat()
-            result = db.table("analytics_events").select(
+            result = await db.table("analytics_events").select(
                 "event_name, created_at"
             ).eq("user_id", user_id).gte("created_at", since).execute()
 
@@ -14,7 +14,7 @@ class AuthService:
 
     async def register_user(self, user_data: UserRegister) -> Token:
         # Check if user already exists
-        existing_user = self.db.table("users").select("*").eq("email", user_data.email).execute()
+        existing_user = await self.db.table("users").select("*").eq("email", user_data.email).execute()
         if existing_user.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -22,7 +22,7 @@ class AuthService:
             )
 
         # Check if username is taken
-        existing_username = self.db.table("users").select("*").eq("username", user_data.username).execute()
+        existing_username = await self.db.table("users").select("*").eq("username", user_data.username).execute()
         if existing_username.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -39,7 +39,7 @@ class AuthService:
             "profile_data": {}
         }
 
-        result = self.db.table("users").insert(user_record).execute()
+        result = await self.db.table("users").insert(user_record).execute()
 
         if not result.data:
             raise HTTPException(
@@ -63,7 +63,7 @@ class AuthService:
 
     async def login_user(self, user_data: UserLogin) -> Token:
         # Find user by email
-        user_result = self.db.table("users").select("*").eq("email", user_data.email).execute()
+        user_result = await self.db.table("users").select("*").eq("email", user_data.email).execute()
 
         if not user_result.data:
             raise HTTPException(
@@ -121,7 +121,7 @@ class AuthService:
         )
 
     async def get_user_by_id(self, user_id: str) -> Optional[UserResponse]:
-        user_result = self.db.table("users").select("*").eq("id", user_id).execute()
+        user_result = await self.db.table("users").select("*").eq("id", user_id).execute()
 
         if not user_result.data:
             return None
@@ -132,7 +132,7 @@ class AuthService:
     async def update_user_profile(self, user_id: str, profile_data: dict) -> UserResponse:
         update_data = {"profile_data": profile_data}
 
-        result = self.db.table("users").update(update_data).eq("id", user_id).execute()
+        result = await self.db.table("users").update(update_data).eq("id", user_id).execute()
 
         if not result.data:
             raise HTTPException(
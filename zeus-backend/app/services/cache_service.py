@@ -1,20 +1,41 @@
 """
 Caching layer for Zeus backend.
 
-Uses in-memory TTLCache for development. Can be swapped to Redis for production
-by setting REDIS_URL in environment and updating this module.
+CacheService is the API the app uses; storage is a pluggable CacheBackend:
+- MemoryCacheBackend: per-process TTLCache (default, and for development)
+- RedisCacheBackend: shared across all gunicorn workers. Enabled by setting
+  REDIS_URL.
+- NearCacheBackend: small per-process L1 in front of Redis (on by default
+  with REDIS_URL). Hot keys are served without a network hop; deletes and
+  prefix invalidations are broadcast over Redis pub/sub so every worker drops
+  its L1 copy. L1 entries also expire after CACHE_L1_TTL_SECONDS, which
+  bounds staleness if a broadcast is missed.
+
+get_or_compute() is the read-through entry point for expensive values (feed
+pages, Claude responses): concurrent misses for a key share one computation
+per process (and, on Redis, one per deployment via a short lock key), and
+recently expired values keep being served while a single refresher
+recomputes them in the background (stale-while-revalidate).
 
 Cache keys follow the pattern: {namespace}:{identifier}
 TTLs are in seconds.
+
+The cache is best-effort: backend errors are logged and treated as misses so
+a Redis outage degrades to uncached requests instead of failing them.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
-from typing import Any, Optional
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from cachetools import TTLCache
 from threading import Lock
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 # Cache TTLs (seconds)
@@ -26,15 +47,65 @@ TTL_MACRO_SUMMARY = 300     # 5 minutes
 TTL_SHORT = 60              # 1 minute (for rapidly changing data)
 
 
-class CacheService:
-    """In-memory cache with TTL support. Thread-safe."""
+class CacheBackend:
+    """Storage interface behind CacheService.
+
+    `ttl` on reads selects the TTL bucket for backends that partition by TTL
+    (memory); backends that store expiry per key ignore it.
+    """
+
+    name = "base"
+
+    async def get_many(self, keys: List[str], ttl: int) -> List[Optional[Any]]:
+        raise NotImplementedError
+
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """Drop every key starting with prefix. Returns removed count where known."""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        """Number of cached entries, if cheap to know."""
+        return None
+
+    def stats(self) -> dict:
+        """Backend-specific counters merged into CacheService.stats."""
+        return {}
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """Cross-worker compute lock for key. Returns a token, or None if held elsewhere.
+
+        Per-process backends have no other workers to coordinate with.
+        """
+        return "local"
+
+    async def release_lock(self, key: str, token: str) -> None:
+        pass
+
+    async def start(self) -> None:
+        """Start background work (called on app startup)."""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-memory cache with TTL support. Thread-safe. Per process."""
+
+    name = "memory"
 
     def __init__(self, maxsize: int = 2048):
         self._caches: dict[int, TTLCache] = {}
         self._lock = Lock()
         self._maxsize = maxsize
-        self._hits = 0
-        self._misses = 0
 
     def _get_cache(self, ttl: int) -> TTLCache:
         """Get or create a TTLCache for the given TTL."""
@@ -44,29 +115,22 @@ class CacheService:
                     self._caches[ttl] = TTLCache(maxsize=self._maxsize, ttl=ttl)
         return self._caches[ttl]
 
-    def get(self, key: str, ttl: int = TTL_RECIPE_FEED) -> Optional[Any]:
-        """Get a cached value. Returns None if not found or expired."""
+    async def get_many(self, keys: List[str], ttl: int) -> List[Optional[Any]]:
         cache = self._get_cache(ttl)
-        value = cache.get(key)
-        if value is not None:
-            self._hits += 1
-            return value
-        self._misses += 1
-        return None
+        return [cache.get(key) for key in keys]
 
-    def set(self, key: str, value: Any, ttl: int = TTL_RECIPE_FEED) -> None:
-        """Set a cached value with the specified TTL."""
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
         cache = self._get_cache(ttl)
-        cache[key] = value
+        for key, value in items.items():
+            cache[key] = value
 
-    def delete(self, key: str) -> None:
+    async def delete(self, key: str) -> None:
         """Delete a key from all TTL caches."""
         with self._lock:
             for cache in self._caches.values():
                 cache.pop(key, None)
 
-    def invalidate_pattern(self, prefix: str) -> int:
-        """Invalidate all keys matching a prefix. Returns count of removed keys."""
+    async def invalidate_prefix(self, prefix: str) -> int:
         removed = 0
         with self._lock:
             for cache in self._caches.values():
@@ -76,20 +140,615 @@ class CacheService:
                     removed += 1
         return removed
 
-    def clear(self) -> None:
-        """Clear all caches."""
+    async def clear(self) -> None:
         with self._lock:
             for cache in self._caches.values():
                 cache.clear()
 
+    def size(self) -> Optional[int]:
+        return sum(len(c) for c in self._caches.values())
+
+
+# Redis keys are {prefix}:{namespace}:{generation}:{identifier}. Invalidating a
+# whole namespace ("feed:") just increments {prefix}:gen:{namespace}; entries
+# under the old generation are never read again and age out via their TTL.
+# Generation lookup and data access happen in one server-side script, so a
+# batch of gets or sets is a single round trip.
+#
+# Each namespace generation also keeps two indexes of its identifiers: one
+# scored by expiry ({prefix}:index:{namespace}:{generation}) and one with every
+# score 0 ({prefix}:lexindex:{namespace}:{generation}), so a narrower prefix
+# ("feed:user1") is a ZRANGEBYLEX range over just the matching members rather
+# than a walk of the namespace or a keyspace scan. Expired members are pruned
+# from both on write (found through the expiry index); the indexes themselves
+# expire with the longest-lived key they track.
+_REDIS_PRUNE_EXPIRED = """
+local function prune(index, lexindex, now)
+    for _, identifier in ipairs(redis.call('ZRANGEBYSCORE', index, '-inf', now)) do
+        redis.call('ZREM', lexindex, identifier)
+    end
+    redis.call('ZREMRANGEBYSCORE', index, '-inf', now)
+end
+"""
+
+_REDIS_GET_SCRIPT = """
+local out = {}
+for i = 1, #ARGV, 2 do
+    local gen = redis.call('GET', KEYS[1] .. 'gen:' .. ARGV[i]) or '0'
+    out[#out + 1] = redis.call('GET', KEYS[1] .. ARGV[i] .. ':' .. gen .. ':' .. ARGV[i + 1])
+end
+return out
+"""
+
+_REDIS_SET_SCRIPT = _REDIS_PRUNE_EXPIRED + """
+local ttl = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+for i = 3, #ARGV, 3 do
+    local gen = redis.call('GET', KEYS[1] .. 'gen:' .. ARGV[i]) or '0'
+    local index = KEYS[1] .. 'index:' .. ARGV[i] .. ':' .. gen
+    local lexindex = KEYS[1] .. 'lexindex:' .. ARGV[i] .. ':' .. gen
+    redis.call('SET', KEYS[1] .. ARGV[i] .. ':' .. gen .. ':' .. ARGV[i + 1], ARGV[i + 2], 'EX', ttl)
+    prune(index, lexindex, now)
+    redis.call('ZADD', index, now + ttl, ARGV[i + 1])
+    redis.call('ZADD', lexindex, 0, ARGV[i + 1])
+    if redis.call('TTL', index) < ttl then
+        redis.call('EXPIRE', index, ttl)
+        redis.call('EXPIRE', lexindex, ttl)
+    end
+end
+return 1
+"""
+
+_REDIS_DELETE_SCRIPT = """
+local gen = redis.call('GET', KEYS[1] .. 'gen:' .. ARGV[1]) or '0'
+redis.call('ZREM', KEYS[1] .. 'index:' .. ARGV[1] .. ':' .. gen, ARGV[2])
+redis.call('ZREM', KEYS[1] .. 'lexindex:' .. ARGV[1] .. ':' .. gen, ARGV[2])
+return redis.call('DEL', KEYS[1] .. ARGV[1] .. ':' .. gen .. ':' .. ARGV[2])
+"""
+
+# Plain string prefix match (no glob): [prefix .. [prefix\xff covers every
+# identifier starting with prefix, since no UTF-8 byte is 0xff
+_REDIS_INVALIDATE_PREFIX_SCRIPT = _REDIS_PRUNE_EXPIRED + """
+local gen = redis.call('GET', KEYS[1] .. 'gen:' .. ARGV[1]) or '0'
+local index = KEYS[1] .. 'index:' .. ARGV[1] .. ':' .. gen
+local lexindex = KEYS[1] .. 'lexindex:' .. ARGV[1] .. ':' .. gen
+prune(index, lexindex, tonumber(ARGV[3]))
+local prefix = ARGV[2]
+local removed = 0
+for _, identifier in ipairs(redis.call('ZRANGEBYLEX', lexindex, '[' .. prefix, '[' .. prefix .. '\\255')) do
+    removed = removed + redis.call('DEL', KEYS[1] .. ARGV[1] .. ':' .. gen .. ':' .. identifier)
+    redis.call('ZREM', index, identifier)
+    redis.call('ZREM', lexindex, identifier)
+end
+return removed
+"""
+
+
+# Only the holder may release a lock (it may have expired and been re-acquired)
+_REDIS_UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _split_key(key: str) -> tuple:
+    namespace, _, identifier = key.partition(":")
+    return namespace, identifier
+
+
+def _escape_glob(text: str) -> str:
+    """Escape Redis MATCH pattern metacharacters so text matches literally."""
+    return "".join("\\" + ch if ch in "\\*?[]" else ch for ch in text)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache on Redis (or any RESP server with Lua scripting).
+
+    Values are serialized with orjson (pydantic models are dumped to JSON-mode
+    dicts, so cached models come back as plain dicts; FastAPI response models
+    re-validate them). Scripts build key names at runtime, so this targets a
+    single Redis instance, not Redis Cluster.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "zeus"):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._prefix = f"{prefix}:"
+        self._get_script = self._client.register_script(_REDIS_GET_SCRIPT)
+        self._set_script = self._client.register_script(_REDIS_SET_SCRIPT)
+        self._delete_script = self._client.register_script(_REDIS_DELETE_SCRIPT)
+        self._invalidate_prefix_script = self._client.register_script(_REDIS_INVALIDATE_PREFIX_SCRIPT)
+        self._unlock_script = self._client.register_script(_REDIS_UNLOCK_SCRIPT)
+
+    async def get_many(self, keys: List[str], ttl: int) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        args = []
+        for key in keys:
+            args.extend(_split_key(key))
+        raw = await self._get_script(keys=[self._prefix], args=args)
+        return [loads(value) if value is not None else None for value in raw]
+
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        if not items:
+            return
+        args: List[Any] = [ttl, time.time()]
+        for key, value in items.items():
+            args.extend(_split_key(key))
+            args.append(dumps(value))
+        await self._set_script(keys=[self._prefix], args=args)
+
+    async def delete(self, key: str) -> None:
+        await self._delete_script(keys=[self._prefix], args=list(_split_key(key)))
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        namespace, identifier_prefix = _split_key(prefix)
+        if not identifier_prefix:
+            # Whole namespace: O(1), no key scan
+            await self._client.incr(f"{self._prefix}gen:{namespace}")
+            return 0
+
+        # Narrower prefix: lex range over the current generation's key index
+        return await self._invalidate_prefix_script(
+            keys=[self._prefix], args=[namespace, identifier_prefix, time.time()]
+        )
+
+    async def clear(self) -> None:
+        # Rare (admin/tests): everything under this app's prefix, deleted a batch at a time
+        batch = []
+        async for redis_key in self._client.scan_iter(match=f"{_escape_glob(self._prefix)}*", count=500):
+            batch.append(redis_key)
+            if len(batch) >= 500:
+                await self._client.unlink(*batch)
+                batch = []
+        if batch:
+            await self._client.unlink(*batch)
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        token = uuid.uuid4().hex
+        acquired = await self._client.set(f"{self._prefix}lock:{key}", token, nx=True, ex=ttl)
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self._unlock_script(keys=[f"{self._prefix}lock:{key}"], args=[token])
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self._client.publish(f"{self._prefix}{channel}", dumps(message))
+
+    async def subscribe(self, channel: str):
+        """Async iterator of decoded messages on a channel (until cancelled)."""
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(f"{self._prefix}{channel}")
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield loads(message["data"])
+        finally:
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+INVALIDATION_CHANNEL = "cache-invalidate"
+
+
+class NearCacheBackend(CacheBackend):
+    """Per-process L1 LRU in front of a shared L2 with broadcast invalidation."""
+
+    def __init__(self, shared: RedisCacheBackend, maxsize: int = 512, ttl: int = 30):
+        self.shared = shared
+        self.name = f"near+{shared.name}"
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._l1_hits = 0
+        self._broadcasts_received = 0
+
+    async def get_many(self, keys: List[str], ttl: int) -> List[Optional[Any]]:
+        values: List[Optional[Any]] = [self._local.get(key) for key in keys]
+        missing = [key for key, value in zip(keys, values) if value is None]
+        self._l1_hits += len(keys) - len(missing)
+        if not missing:
+            return values
+
+        fetched = dict(zip(missing, await self.shared.get_many(missing, ttl)))
+        with self._lock:
+            for key, value in fetched.items():
+                if value is not None:
+                    self._local[key] = value
+        return [value if value is not None else fetched.get(key) for key, value in zip(keys, values)]
+
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        await self.shared.set_many(items, ttl)
+        with self._lock:
+            for key, value in items.items():
+                self._local[key] = value
+
+    async def delete(self, key: str) -> None:
+        self._drop_local({"op": "delete", "key": key})
+        await self.shared.delete(key)
+        await self._broadcast({"op": "delete", "key": key})
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        removed = self._drop_local({"op": "prefix", "prefix": prefix})
+        removed += await self.shared.invalidate_prefix(prefix)
+        await self._broadcast({"op": "prefix", "prefix": prefix})
+        return removed
+
+    async def clear(self) -> None:
+        self._drop_local({"op": "clear"})
+        await self.shared.clear()
+        await self._broadcast({"op": "clear"})
+
+    def size(self) -> Optional[int]:
+        return len(self._local)
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        return await self.shared.acquire_lock(key, ttl)
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self.shared.release_lock(key, token)
+
+    def stats(self) -> dict:
+        return {
+            "l1_hits": self._l1_hits,
+            "l1_size": len(self._local),
+            "invalidations_received": self._broadcasts_received,
+        }
+
+    async def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.shared.close()
+
+    async def _broadcast(self, message: dict) -> None:
+        await self.shared.publish(INVALIDATION_CHANNEL, {**message, "origin": self._origin})
+
+    def _drop_local(self, message: dict) -> int:
+        op = message.get("op")
+        with self._lock:
+            if op == "delete":
+                return 1 if self._local.pop(message.get("key"), None) is not None else 0
+            if op == "prefix":
+                prefix = message.get("prefix") or ""
+                keys = [k for k in self._local if k.startswith(prefix)]
+            else:
+                keys = list(self._local)
+            for key in keys:
+                self._local.pop(key, None)
+            return len(keys)
+
+    async def _listen(self) -> None:
+        """Apply other workers' invalidations to this worker's L1; reconnect on failure."""
+        while True:
+            try:
+                # Anything could have been invalidated while we weren't listening
+                self._drop_local({"op": "clear"})
+                async for message in self.shared.subscribe(INVALIDATION_CHANNEL):
+                    if message.get("origin") != self._origin:
+                        self._broadcasts_received += 1
+                        self._drop_local(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}")
+            await asyncio.sleep(1)
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__} for cache")
+
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_json_default)
+
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+except ImportError:  # stdlib fallback keeps the shared cache usable without orjson
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_json_default).encode()
+
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+# Marks values written by get_or_compute (value + freshness deadline)
+_ENTRY_MARKER = "__swr__"
+
+# Cross-worker compute lock lifetime; bounds how long a crashed holder blocks others
+COMPUTE_LOCK_SECONDS = 30
+
+# How long a miss waits for another worker's computation before doing its own
+COMPUTE_WAIT_SECONDS = 5.0
+COMPUTE_POLL_SECONDS = 0.1
+
+
+class CacheService:
+    """Cache API used by the app. Delegates storage to a CacheBackend."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or MemoryCacheBackend()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._coalesced = 0
+        self._stale_served = 0
+        # Bumped by delete()/invalidate_pattern() so a computation that started
+        # before an invalidation doesn't write its (now stale) result back.
+        # Key epochs are only kept while a computation for the key is running
+        # (_running counts them, including ones an invalidation detached).
+        self._key_epochs: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self._prefix_epochs: Dict[str, int] = {}
+        self._discarded = 0
+
+    async def get(self, key: str, ttl: int = TTL_RECIPE_FEED) -> Optional[Any]:
+        """Get a cached value. Returns None if not found or expired."""
+        return (await self.get_many([key], ttl)).get(key)
+
+    async def get_many(self, keys: List[str], ttl: int = TTL_RECIPE_FEED) -> Dict[str, Any]:
+        """Get several keys in one backend round trip. Missing keys are omitted."""
+        try:
+            values = await self.backend.get_many(keys, ttl)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Cache get failed ({self.backend.name}): {e}")
+            values = [None] * len(keys)
+
+        found = {}
+        for key, value in zip(keys, values):
+            if value is not None:
+                self._hits += 1
+                found[key] = value
+            else:
+                self._misses += 1
+        return found
+
+    async def set(self, key: str, value: Any, ttl: int = TTL_RECIPE_FEED) -> None:
+        """Set a cached value with the specified TTL."""
+        await self.set_many({key: value}, ttl)
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = TTL_RECIPE_FEED) -> None:
+        """Set several keys (same TTL) in one backend round trip."""
+        try:
+            await self.backend.set_many(items, ttl)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Cache set failed ({self.backend.name}): {e}")
+
+    async def delete(self, key: str) -> None:
+        """Delete a key from all TTL caches."""
+        if key in self._running:
+            self._key_epochs[key] = self._key_epochs.get(key, 0) + 1
+            self._inflight.pop(key, None)
+        try:
+            await self.backend.delete(key)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Cache delete failed ({self.backend.name}): {e}")
+
+    async def invalidate_pattern(self, prefix: str) -> int:
+        """Invalidate all keys matching a prefix. Returns count of removed keys (where known)."""
+        self._prefix_epochs[prefix] = self._prefix_epochs.get(prefix, 0) + 1
+        for key in [k for k in self._inflight if k.startswith(prefix)]:
+            del self._inflight[key]
+        try:
+            return await self.backend.invalidate_prefix(prefix)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Cache invalidation failed ({self.backend.name}): {e}")
+            return 0
+
+    async def clear(self) -> None:
+        """Clear all caches."""
+        try:
+            await self.backend.clear()
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Cache clear failed ({self.backend.name}): {e}")
+
+    # --- Read-through ---
+
+    async def get_or_compute(
+        self,
+        key: str,
+        ttl: int,
+        coro_factory: Callable[[], Awaitable[Any]],
+        stale_ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        Cached value for key, computing it with coro_factory() on a miss.
+
+        - Concurrent misses in this process await one shared computation; on
+          a shared backend other workers wait for the lock holder's result
+          (up to COMPUTE_WAIT_SECONDS) instead of computing it again.
+        - For stale_ttl seconds after the value goes stale (default: ttl) it
+          is still returned immediately while one background task refreshes it.
+        - Errors from coro_factory propagate to every waiter and are not cached.
+          None results are returned but not cached.
+        - delete()/invalidate_pattern() detach computations already running
+          for the key: their callers still get the result, but it isn't
+          written back and later callers start a fresh computation.
+
+        Keys written here hold an envelope, so read them only through this method.
+        """
+        stale_ttl = ttl if stale_ttl is None else stale_ttl
+        storage_ttl = ttl + stale_ttl
+
+        entry = await self.get(key, storage_ttl)
+        if isinstance(entry, dict) and _ENTRY_MARKER in entry:
+            if entry["fresh_until"] > time.time():
+                return entry["value"]
+            self._stale_served += 1
+            if key not in self._inflight:
+                self._start_compute(key, ttl, storage_ttl, coro_factory, background=True)
+            return entry["value"]
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._start_compute(key, ttl, storage_ttl, coro_factory, background=False)
+        else:
+            self._coalesced += 1
+        # Shielded: a cancelled request must not cancel the computation other callers await
+        return await asyncio.shield(future)
+
+    def _start_compute(
+        self,
+        key: str,
+        ttl: int,
+        storage_ttl: int,
+        coro_factory: Callable[[], Awaitable[Any]],
+        background: bool,
+    ) -> asyncio.Future:
+        future = asyncio.ensure_future(
+            self._compute(key, ttl, storage_ttl, coro_factory, background, self._epoch(key))
+        )
+        self._inflight[key] = future
+        self._running[key] = self._running.get(key, 0) + 1
+
+        def _done(f: asyncio.Future) -> None:
+            # An invalidation may already have replaced this computation
+            if self._inflight.get(key) is f:
+                del self._inflight[key]
+            self._running[key] -= 1
+            if not self._running[key]:
+                del self._running[key]
+                self._key_epochs.pop(key, None)
+            if not f.cancelled() and f.exception() is not None and background:
+                logger.warning(f"Cache refresh failed for {key}: {f.exception()}")
+
+        future.add_done_callback(_done)
+        return future
+
+    async def _compute(
+        self,
+        key: str,
+        ttl: int,
+        storage_ttl: int,
+        coro_factory: Callable[[], Awaitable[Any]],
+        background: bool,
+        epoch: tuple,
+    ) -> Any:
+        token = await self._acquire_lock(key)
+        if token is None and self._running[key] > 1:
+            # The holder is this process's own computation, detached by an
+            # invalidation; its result won't be written, so don't wait for it
+            pass
+        elif token is None:
+            if background:
+                # Another worker is refreshing; keep serving the stale value
+                return None
+            entry, token = await self._wait_for_entry(key, storage_ttl)
+            if entry is not None:
+                return entry["value"]
+            # Lock freed without a value (holder failed or was invalidated), or
+            # holder is slow or gone: compute anyway rather than fail the request
+
+        try:
+            value = await coro_factory()
+            if value is not None and self._epoch(key) != epoch:
+                # Invalidated while computing: the value may predate the change
+                self._discarded += 1
+            elif value is not None:
+                await self.set(
+                    key,
+                    {_ENTRY_MARKER: 1, "value": value, "fresh_until": time.time() + ttl},
+                    storage_ttl,
+                )
+            return value
+        finally:
+            if token is not None:
+                await self._release_lock(key, token)
+
+    def _epoch(self, key: str) -> tuple:
+        """Changes whenever key is deleted or a prefix covering it is invalidated."""
+        return (
+            self._key_epochs.get(key, 0),
+            sum(n for prefix, n in self._prefix_epochs.items() if key.startswith(prefix)),
+        )
+
+    async def _wait_for_entry(self, key: str, storage_ttl: int) -> Tuple[Optional[dict], Optional[str]]:
+        """Poll for the lock holder's entry. Returns (entry, None), or (None, token)
+        if the lock came free without an entry being written, else (None, None)."""
+        deadline = time.monotonic() + COMPUTE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(COMPUTE_POLL_SECONDS)
+            entry = await self.get(key, storage_ttl)
+            if (
+                isinstance(entry, dict)
+                and _ENTRY_MARKER in entry
+                and entry["fresh_until"] > time.time()
+            ):
+                return entry, None
+            token = await self._acquire_lock(key)
+            if token is not None:
+                return None, token
+        return None, None
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        """Lock token, or None if another worker holds it. Lock errors count as acquired."""
+        try:
+            return await self.backend.acquire_lock(key, COMPUTE_LOCK_SECONDS)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Cache lock failed ({self.backend.name}): {e}")
+            return ""
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        if not token:
+            return
+        try:
+            await self.backend.release_lock(key, token)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Cache unlock failed ({self.backend.name}): {e}")
+
+    async def start(self) -> None:
+        await self.backend.start()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
     @property
     def stats(self) -> dict:
         total = self._hits + self._misses
         return {
+            "backend": self.backend.name,
             "hits": self._hits,
             "misses": self._misses,
+            "errors": self._errors,
             "hit_rate": f"{(self._hits / total * 100):.1f}%" if total > 0 else "0%",
-            "total_cached": sum(len(c) for c in self._caches.values()),
+            "total_cached": self.backend.size(),
+            "inflight": len(self._inflight),
+            "coalesced": self._coalesced,
+            "stale_served": self._stale_served,
+            "discarded_after_invalidation": self._discarded,
+            **self.backend.stats(),
         }
 
 
@@ -105,5 +764,23 @@ def hash_dict(d: dict) -> str:
     return hashlib.md5(serialized.encode()).hexdigest()[:12]
 
 
+def _create_backend() -> CacheBackend:
+    if settings.redis_url:
+        try:
+            backend = RedisCacheBackend(settings.redis_url)
+            if settings.cache_l1_enabled:
+                logger.info("Cache: using Redis backend with per-process L1")
+                return NearCacheBackend(
+                    backend,
+                    maxsize=settings.cache_l1_maxsize,
+                    ttl=settings.cache_l1_ttl_seconds,
+                )
+            logger.info("Cache: using shared Redis backend")
+            return backend
+        except Exception as e:
+            logger.warning(f"Failed to initialize Redis cache, falling back to memory: {e}")
+    return MemoryCacheBackend()
+
+
 # Global cache instance
-cache = CacheService()
+cache = CacheService(_create_backend())
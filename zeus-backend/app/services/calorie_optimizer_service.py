@@ -0,0 +1,210 @@
+"""
+Calorie Optimizer Service
+
+Suggests recipe swaps that bring a meal plan's off-target days closer to the
+user's daily calorie (and protein) targets.
+
+Candidates are fetched once per meal type (in-process catalog, else one
+concurrent PostgREST query each) instead of once per day. Swaps are then
+solved for all days together, in memory:
+
+1. For every off-target day, each swappable slot x candidate recipe is an
+   option, costed by the resulting day's distance from target. Keeping the
+   day as is is always an option too.
+2. Branch and bound over days picks the combination with the lowest total
+   cost. A day's bound is its best option ignoring the other days, so
+   branches that can't beat the best combination found so far are cut
+   before they're expanded; with at most 7 days this stays small.
+
+A candidate recipe is used at most once and never duplicates a recipe
+already in the plan. One swap per day, so the endpoint's per-day analysis
+keeps its shape.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from app.database import get_database
+from app.services.recipe_catalog_service import recipe_catalog
+from app.utils.exclusion_matching import get_exclusion_matcher
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_FIELDS = (
+    "id", "title", "calories", "protein_grams", "meal_type", "ingredients", "ingredient_signature",
+)
+
+# Candidate calories within this fraction of the slot's target
+CALORIE_WINDOW = 0.35
+CANDIDATES_PER_MEAL_TYPE = 60
+
+# Cost of a day = |calories - target| + PROTEIN_WEIGHT * grams below protein target
+PROTEIN_WEIGHT = 2.0
+
+# A swap must lower the day's cost by at least this much to be worth suggesting
+MIN_IMPROVEMENT = 50
+
+
+@dataclass
+class DaySlot:
+    """A swappable slot on an off-target day."""
+    meal_type: str
+    recipe_id: str
+    calories: int
+    protein: float
+
+
+@dataclass
+class SwapOption:
+    day: str
+    slot: DaySlot
+    recipe: Dict[str, Any]
+    cost: float
+
+
+class CalorieOptimizer:
+    def __init__(self):
+        self.db = get_database()
+
+    async def fetch_candidate_pools(
+        self,
+        meal_targets: Dict[str, int],
+        preferences: dict,
+        exclude_recipe_ids: Set[str],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Swap candidates near each meal type's calorie target, one query per meal type."""
+        meal_types = list(meal_targets)
+        results = await asyncio.gather(*(
+            self._query_candidates(meal_type, meal_targets[meal_type], preferences)
+            for meal_type in meal_types
+        ))
+
+        matcher = get_exclusion_matcher(
+            preferences.get("allergies", []) + preferences.get("disliked_ingredients", [])
+        )
+        pools = {}
+        for meal_type, candidates in zip(meal_types, results):
+            pools[meal_type] = [
+                r for r in candidates
+                if r["id"] not in exclude_recipe_ids
+                and r.get("calories")
+                and not (matcher and matcher.excludes(r))
+            ]
+        return pools
+
+    async def _query_candidates(
+        self, meal_type: str, target_calories: int, preferences: dict
+    ) -> List[Dict[str, Any]]:
+        cal_min = max(50, int(target_calories * (1 - CALORIE_WINDOW)))
+        cal_max = int(target_calories * (1 + CALORIE_WINDOW))
+        dietary = preferences.get("dietary_restrictions", [])
+
+        if recipe_catalog.is_ready:
+            return recipe_catalog.query(
+                meal_type=meal_type.capitalize(),
+                dietary_tags=dietary or None,
+                min_calories=cal_min,
+                max_calories=cal_max,
+                require_image=True,
+                fields=CANDIDATE_FIELDS,
+                limit=CANDIDATES_PER_MEAL_TYPE,
+            )
+
+        query = self.db.table("recipes").select(", ".join(CANDIDATE_FIELDS))
+        query = query.contains("meal_type", [meal_type.capitalize()])
+        query = query.gte("calories", cal_min)
+        query = query.lte("calories", cal_max)
+        query = query.not_.is_("image_url", "null")
+        if dietary:
+            query = query.contains("dietary_tags", dietary)
+        query = query.order("likes_count", desc=True).limit(CANDIDATES_PER_MEAL_TYPE)
+        result = await query.execute()
+        return result.data or []
+
+    def solve(
+        self,
+        days: Dict[str, dict],
+        pools: Dict[str, List[Dict[str, Any]]],
+        calorie_target: int,
+        protein_target: Optional[float] = None,
+    ) -> Dict[str, Optional[SwapOption]]:
+        """
+        Pick at most one swap per day, each candidate used at most once.
+
+        `days` maps day -> {"calories", "protein", "slots": [DaySlot]}.
+        Returns day -> chosen option (None: no swap improves the day enough).
+        """
+        def day_cost(calories: float, protein: float) -> float:
+            cost = abs(calories - calorie_target)
+            if protein_target:
+                cost += PROTEIN_WEIGHT * max(0.0, protein_target - protein)
+            return cost
+
+        # Each day's options that beat keeping the day as is, best first
+        options: Dict[str, List[SwapOption]] = {}
+        baselines: Dict[str, float] = {}
+        for day, info in days.items():
+            baseline = baselines[day] = day_cost(info["calories"], info["protein"])
+            day_options = []
+            for slot in info["slots"]:
+                for recipe in pools.get(slot.meal_type, []):
+                    cost = day_cost(
+                        info["calories"] - slot.calories + (recipe.get("calories") or 0),
+                        info["protein"] - slot.protein + (recipe.get("protein_grams") or 0),
+                    )
+                    if baseline - cost >= MIN_IMPROVEMENT:
+                        day_options.append(SwapOption(day, slot, recipe, cost))
+            day_options.sort(key=lambda o: o.cost)
+            options[day] = day_options
+
+        # Most promising days first, so a good combination is found early
+        order = sorted(
+            days,
+            key=lambda d: baselines[d] - options[d][0].cost if options[d] else 0.0,
+            reverse=True,
+        )
+        # bounds[i]: lowest possible cost of order[i:], ignoring shared recipes
+        bounds = [0.0] * (len(order) + 1)
+        for i in range(len(order) - 1, -1, -1):
+            day = order[i]
+            bounds[i] = bounds[i + 1] + (options[day][0].cost if options[day] else baselines[day])
+
+        best_total = sum(baselines.values())
+        best_picks: List[Optional[SwapOption]] = [None] * len(order)
+        picks: List[Optional[SwapOption]] = [None] * len(order)
+        used: Set[str] = set()
+
+        def search(i: int, total: float) -> None:
+            nonlocal best_total, best_picks
+            if i == len(order):
+                if total < best_total - 1e-6:
+                    best_total, best_picks = total, list(picks)
+                return
+            day = order[i]
+            rest = bounds[i + 1]
+            for option in options[day]:
+                # Options are sorted by cost, so no later one can do better
+                if total + option.cost + rest >= best_total - 1e-6:
+                    break
+                recipe_id = option.recipe["id"]
+                if recipe_id in used:
+                    continue
+                used.add(recipe_id)
+                picks[i] = option
+                search(i + 1, total + option.cost)
+                used.discard(recipe_id)
+            picks[i] = None
+            if total + baselines[day] + rest < best_total - 1e-6:
+                search(i + 1, total + baselines[day])
+
+        search(0, 0.0)
+        chosen: Dict[str, Optional[SwapOption]] = {day: None for day in days}
+        for day, option in zip(order, best_picks):
+            chosen[day] = option
+        return chosen
+
+
+# Global instance
+calorie_optimizer = CalorieOptimizer()
@@ -0,0 +1,130 @@
+"""
+Materialized daily feed orderings.
+
+The non-pantry feed order is a pure function of (filters, day): the top
+recipes by likes, shuffled with random.Random(YYYYMMDD) and optionally
+interleaved 2:1 with preferred cuisines. Instead of rebuilding that order for
+every page, the ordered id list is computed once per filter signature per day
+and cached; a page is then a slice of ids hydrated in one batch.
+
+Search feeds keep the relevance order from the search subsystem instead.
+
+The order is built in tiers of FEED_TIER_SIZE recipes (the original 500-row
+pool). The first tier is shuffled exactly as before, so existing offsets keep
+their results; later tiers continue with the same rng so clients can page
+past the first 500 recipes, up to FEED_MAX_TIERS tiers.
+
+Pagination state is an opaque cursor (filter signature, day, offset). It pins
+the day, so a client paging across midnight keeps yesterday's order instead
+of seeing repeats or gaps.
+"""
+
+import base64
+import json
+import random
+from datetime import date
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.schemas.recipe import RecipeFeedFilter
+from app.services.cache_service import cache, hash_dict, make_cache_key, TTL_RECIPE
+
+# Rows per shuffle tier (the size of the original feed pool)
+FEED_TIER_SIZE = 500
+
+# Tiers materialized per ordering (caps how deep a feed can be paged)
+FEED_MAX_TIERS = 4
+
+# Filter fields that don't change the order
+_PAGING_FIELDS = {"limit", "offset", "use_pantry_items"}
+
+
+def filter_signature(filters: RecipeFeedFilter) -> str:
+    """Stable hash of the filters that determine a feed ordering."""
+    return hash_dict({k: v for k, v in filters.dict().items() if k not in _PAGING_FIELDS})
+
+
+def encode_cursor(filters: RecipeFeedFilter, day: date, offset: int) -> str:
+    payload = {"s": filter_signature(filters), "d": day.isoformat(), "o": offset}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, filters: RecipeFeedFilter) -> Tuple[date, int]:
+    """(day, offset) from a cursor issued for the same filters. 400 if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        day = date.fromisoformat(payload["d"])
+        offset = int(payload["o"])
+        signature = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if signature != filter_signature(filters) or offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested filters",
+        )
+    return day, offset
+
+
+class FeedMaterializer:
+    """Builds and caches the ordered recipe id list for a feed filter and day."""
+
+    async def get_ordering(self, filters: RecipeFeedFilter, day: Optional[date] = None) -> List[str]:
+        day = day or date.today()
+        key = make_cache_key("feedorder", filter_signature(filters), day.isoformat())
+        return await cache.get_or_compute(key, TTL_RECIPE, lambda: self._materialize(filters, day))
+
+    async def _materialize(self, filters: RecipeFeedFilter, day: date) -> List[str]:
+        # Imported here: recipe_service imports this module lazily too
+        from app.services.recipe_service import recipe_service
+
+        pool = await recipe_service._fetch_feed_pool(
+            filters,
+            pool_size=FEED_TIER_SIZE * FEED_MAX_TIERS,
+            fields=("id", "cuisine_type"),
+        )
+
+        # Search results are already ranked by relevance; don't shuffle them
+        if filters.search:
+            return [r["id"] for r in pool]
+
+        # Deterministic daily shuffle so pagination stays consistent
+        rng = random.Random(int(day.strftime("%Y%m%d")))
+        ordering: List[str] = []
+        for start in range(0, len(pool), FEED_TIER_SIZE):
+            tier = pool[start:start + FEED_TIER_SIZE]
+            ordering.extend(r["id"] for r in self._order_tier(tier, filters, rng))
+        return ordering
+
+    @staticmethod
+    def _order_tier(tier: List[dict], filters: RecipeFeedFilter, rng: random.Random) -> List[dict]:
+        if not filters.cuisine_preferences:
+            tier = list(tier)
+            rng.shuffle(tier)
+            return tier
+
+        # Boost preferred cuisines: put them first, then mix in others
+        preferred_lower = [c.lower() for c in filters.cuisine_preferences]
+        preferred = [r for r in tier if (r.get("cuisine_type") or "").lower() in preferred_lower]
+        others = [r for r in tier if (r.get("cuisine_type") or "").lower() not in preferred_lower]
+        rng.shuffle(preferred)
+        rng.shuffle(others)
+        # Interleave: 2 preferred, 1 other for variety
+        ordered = []
+        pi, oi = 0, 0
+        while pi < len(preferred) or oi < len(others):
+            for _ in range(2):
+                if pi < len(preferred):
+                    ordered.append(preferred[pi])
+                    pi += 1
+            if oi < len(others):
+                ordered.append(others[oi])
+                oi += 1
+        return ordered
+
+
+# Global instance
+feed_materializer = FeedMaterializer()
@@ -12,14 +12,11 @@ from typing import List, Dict, Optional, Tuple
 from datetime import datetime, date
 from collections import defaultdict
 import re
-import json
 import math
 import logging
 
-import anthropic
-
 from app.database import get_database
-from app.config import settings
+from app.services.ingredient_category_service import ingredient_categories
 from app.utils.ingredient_matching import (
     normalize_ingredient_name as shared_normalize,
     match_ingredient_to_pantry,
@@ -47,19 +44,8 @@ from app.schemas.pantry import PantryItemResponse
 class GroceryListService:
     """Service for managing grocery lists."""
 
-    # Valid grocery categories for Claude validation
-    VALID_CATEGORIES = {
-        'Produce', 'Dairy', 'Protein', 'Grains', 'Spices',
-        'Condiments', 'Beverages', 'Frozen', 'Pantry', 'Other'
-    }
-
     def __init__(self):
         self.db = get_database()
-        try:
-            self.claude_client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-        except Exception:
-            self.claude_client = None
-            logger.warning("Claude client not available for ingredient categorization")
 
     # ========================================================================
     # PUBLIC METHODS
@@ -95,7 +81,7 @@ class GroceryListService:
         """
         try:
             # 1. Fetch meal plan
-            meal_plan_result = self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
+            meal_plan_result = await self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
             if not meal_plan_result.data:
                 raise ValueError(f"Meal plan {meal_plan_id} not found or doesn't belong to user")
 
@@ -110,7 +96,7 @@ class GroceryListService:
                 raise ValueError("Meal plan has no recipes")
 
             # 3. Fetch all recipes
-            recipes_result = self.db.table("recipes").select("*").in_("id", recipe_ids).execute()
+            recipes_result = await self.db.table("recipes").select("*").in_("id", recipe_ids).execute()
             recipes = recipes_result.data
 
             if household_size:
@@ -127,8 +113,8 @@ class GroceryListService:
             logger.error(f"Error in generate_grocery_list: {e}", exc_info=True)
             raise
 
-        # 5. Use Claude to clean names and categorize ingredients
-        ai_results = self._ai_clean_and_categorize(aggregated_ingredients)
+        # 5. Clean names and categorize ingredients (stored results, Claude for new names)
+        ai_results = await self._ai_clean_and_categorize(aggregated_ingredients)
         if ai_results:
             for norm_name, ai_data in ai_results.items():
                 if norm_name in aggregated_ingredients:
@@ -140,7 +126,7 @@ class GroceryListService:
             logger.info("Using rule-based categorization (Claude unavailable)")
 
         # 6. Fetch user's pantry items
-        pantry_result = self.db.table("pantry_items").select("*").eq("user_id", user_id).execute()
+        pantry_result = await self.db.table("pantry_items").select("*").eq("user_id", user_id).execute()
         pantry_items = pantry_result.data
 
         # 7. Match aggregated ingredients to pantry
@@ -155,24 +141,24 @@ class GroceryListService:
         )
 
         # Check if grocery list already exists for this meal plan
-        existing_list = self.db.table("grocery_lists").select("id").eq("user_id", user_id).eq("meal_plan_id", meal_plan_id).execute()
+        existing_list = await self.db.table("grocery_lists").select("id").eq("user_id", user_id).eq("meal_plan_id", meal_plan_id).execute()
 
         if existing_list.data:
             # Update existing list
             grocery_list_id = existing_list.data[0]["id"]
 
             # Delete old items
-            self.db.table("grocery_list_items").delete().eq("grocery_list_id", grocery_list_id).execute()
+            await self.db.table("grocery_list_items").delete().eq("grocery_list_id", grocery_list_id).execute()
 
             # Update grocery list metadata
-            self.db.table("grocery_lists").update({
+            await self.db.table("grocery_lists").update({
                 "updated_at": datetime.now().isoformat(),
                 "is_purchased": False,
                 "purchased_at": None
             }).eq("id", grocery_list_id).execute()
         else:
             # Create new grocery list
-            grocery_list_result = self.db.table("grocery_lists").insert({
+            grocery_list_result = await self.db.table("grocery_lists").insert({
                 "user_id": user_id,
                 "meal_plan_id": meal_plan_id,
                 "name": grocery_list_data.name,
@@ -232,7 +218,7 @@ class GroceryListService:
             for item in grocery_items:
                 item["grocery_list_id"] = grocery_list_id
 
-            self.db.table("grocery_list_items").insert(grocery_items).execute()
+            await self.db.table("grocery_list_items").insert(grocery_items).execute()
 
         # 10. Fetch and return complete grocery list with warnings
         return await self.get_grocery_list(user_id, grocery_list_id, warnings=recipe_warnings)
@@ -258,7 +244,7 @@ class GroceryListService:
             ValueError: If grocery list not found or doesn't belong to user
         """
         # Fetch grocery list
-        list_result = self.db.table("grocery_lists").select("*").eq("id", grocery_list_id).eq("user_id", user_id).execute()
+        list_result = await self.db.table("grocery_lists").select("*").eq("id", grocery_list_id).eq("user_id", user_id).execute()
 
         if not list_result.data:
             raise ValueError(f"Grocery list {grocery_list_id} not found or doesn't belong to user")
@@ -266,7 +252,7 @@ class GroceryListService:
         grocery_list = list_result.data[0]
 
         # Fetch all items
-        items_result = self.db.table("grocery_list_items").select("*").eq("grocery_list_id", grocery_list_id).execute()
+        items_result = await self.db.table("grocery_list_items").select("*").eq("grocery_list_id", grocery_list_id).execute()
         items = items_result.data
 
         # Convert to response objects
@@ -316,7 +302,7 @@ class GroceryListService:
             GroceryListResponse if found, None otherwise
         """
         # Find grocery list for this meal plan
-        list_result = self.db.table("grocery_lists").select("id").eq("user_id", user_id).eq("meal_plan_id", meal_plan_id).execute()
+        list_result = await self.db.table("grocery_lists").select("id").eq("user_id", user_id).eq("meal_plan_id", meal_plan_id).execute()
 
         if not list_result.data:
             return None
@@ -345,7 +331,7 @@ class GroceryListService:
             ValueError: If item not found or user doesn't own the grocery list
         """
         # Verify ownership
-        item_result = self.db.table("grocery_list_items").select("grocery_list_id").eq("id", item_id).execute()
+        item_result = await self.db.table("grocery_list_items").select("grocery_list_id").eq("id", item_id).execute()
 
         if not item_result.data:
             raise ValueError(f"Grocery list item {item_id} not found")
@@ -353,13 +339,13 @@ class GroceryListService:
         grocery_list_id = item_result.data[0]["grocery_list_id"]
 
         # Verify user owns the grocery list
-        list_result = self.db.table("grocery_lists").select("id").eq("id", grocery_list_id).eq("user_id", user_id).execute()
+        list_result = await self.db.table("grocery_lists").select("id").eq("id", grocery_list_id).eq("user_id", user_id).execute()
 
         if not list_result.data:
             raise ValueError("Unauthorized to update this item")
 
         # Update item
-        update_result = self.db.table("grocery_list_items").update({
+        update_result = await self.db.table("grocery_list_items").update({
             "is_purchased": is_purchased,
             "updated_at": datetime.now().isoformat()
         }).eq("id", item_id).execute()
@@ -385,19 +371,19 @@ class GroceryListService:
             ValueError: If list not found or doesn't belong to user
         """
         # Verify ownership
-        list_result = self.db.table("grocery_lists").select("id").eq("id", grocery_list_id).eq("user_id", user_id).execute()
+        list_result = await self.db.table("grocery_lists").select("id").eq("id", grocery_list_id).eq("user_id", user_id).execute()
 
         if not list_result.data:
             raise ValueError(f"Grocery list {grocery_list_id} not found or doesn't belong to user")
 
         # Mark all items as purchased
-        self.db.table("grocery_list_items").update({
+        await self.db.table("grocery_list_items").update({
             "is_purchased": True,
             "updated_at": datetime.now().isoformat()
         }).eq("grocery_list_id", grocery_list_id).execute()
 
         # Mark list as purchased
-        self.db.table("grocery_lists").update({
+        await self.db.table("grocery_lists").update({
             "is_purchased": True,
             "purchased_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat()
@@ -424,13 +410,13 @@ class GroceryListService:
             ValueError: If list not found or doesn't belong to user
         """
         # Verify ownership
-        list_result = self.db.table("grocery_lists").select("id").eq("id", grocery_list_id).eq("user_id", user_id).execute()
+        list_result = await self.db.table("grocery_lists").select("id").eq("id", grocery_list_id).eq("user_id", user_id).execute()
 
         if not list_result.data:
             raise ValueError(f"Grocery list {grocery_list_id} not found or doesn't belong to user")
 
         # Delete grocery list (items will cascade delete)
-        self.db.table("grocery_lists").delete().eq("id", grocery_list_id).execute()
+        await self.db.table("grocery_lists").delete().eq("id", grocery_list_id).execute()
 
         return {"message": "Grocery list deleted successfully"}
 
@@ -890,106 +876,22 @@ class GroceryListService:
 
         return merged
 
-    def _ai_clean_and_categorize(
+    async def _ai_clean_and_categorize(
         self,
         ingredients: Dict[str, 'IngredientAggregate']
     ) -> Dict[str, Dict[str, str]]:
         """
-        Use Claude to clean ingredient names and assign grocery categories.
+        Clean ingredient names and assign grocery categories.
 
-        Sends all ingredient names in one batch call. Returns a dict mapping
-        normalized_name -> {"clean_name": "...", "category": "..."}.
+        Returns a dict mapping normalized_name -> {"clean_name": "...", "category": "..."}.
+        Known names come from the persistent ingredient category store; only
+        names never seen before go to Claude (see ingredient_category_service).
 
-        Falls back to rule-based categorization if Claude is unavailable.
+        Names missing from the result keep their rule-based categorization.
         """
-        if not self.claude_client or not ingredients:
-            return {}
-
-        # Build the list of raw display names
-        name_list = []
-        for norm_name, agg in ingredients.items():
-            name_list.append(f"- {agg.display_name}")
-
-        names_text = "\n".join(name_list)
-
-        prompt = f"""You are a grocery list assistant. For each ingredient below, return:
-1. A clean display name — what you'd see on a grocery shopping list:
-   - Remove brand names ("Eggland's Best Eggs" → "Eggs")
-   - Remove recipe instructions ("minced", "diced", "or to taste", "divided")
-   - Remove size descriptors ("small", "large", "medium")
-   - Remove cooking state prefixes ("Uncooked Jasmine Rice" → "Jasmine Rice")
-   - Remove any emoji characters
-   - Fix truncated words ("larg" → infer it was "large" and remove it)
-   - Fix typos and formatting issues
-   - Capitalize properly (title case)
-   - Keep it simple: just the ingredient name a shopper needs
-2. The correct grocery store category
-
-Valid categories (use EXACTLY one of these):
-Produce, Dairy, Protein, Grains, Spices, Condiments, Beverages, Frozen, Pantry, Other
-
-Category rules:
-- Peanut butter, nut butters → Condiments (NOT Dairy)
-- Shallots, scallions, fresh herbs → Produce
-- Sauces (soy, fish, oyster, hot sauce, etc.) → Condiments
-- Oils and vinegars → Condiments
-- Flour, sugar, cornstarch, baking supplies → Pantry
-- Salt, pepper, dried herbs/spices, seasoning → Spices
-- Eggs → Protein
-- Rice, pasta, bread, noodles → Grains
-- Broth/stock → Beverages
-- Nuts, seeds, dried beans → Pantry
-- Honey, maple syrup → Condiments
-- Mirin, cooking wine → Condiments
-
-Ingredients:
-{names_text}
-
-Respond with ONLY a JSON array, no other text. Each element:
-{{"original": "exact original name from list above", "clean_name": "cleaned name", "category": "Category"}}"""
-
-        try:
-            response = self.claude_client.messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            response_text = response.content[0].text.strip()
-
-            # Extract JSON from response (handle markdown code blocks)
-            if response_text.startswith("```"):
-                response_text = response_text.split("\n", 1)[1]
-                response_text = response_text.rsplit("```", 1)[0].strip()
-
-            parsed = json.loads(response_text)
-
-            # Build lookup by original name -> result
-            result = {}
-            for item in parsed:
-                original = item.get("original", "")
-                clean_name = item.get("clean_name", original)
-                category = item.get("category", "Other")
-
-                # Validate category
-                if category not in self.VALID_CATEGORIES:
-                    category = "Other"
-
-                # Match back to our normalized names
-                for norm_name, agg in ingredients.items():
-                    if agg.display_name == original:
-                        result[norm_name] = {
-                            "clean_name": clean_name,
-                            "category": category
-                        }
-                        break
-
-            logger.info(f"Claude categorized {len(result)}/{len(ingredients)} ingredients")
-            return result
-
-        except Exception as e:
-            logger.warning(f"Claude categorization failed, falling back to rules: {e}")
-            return {}
+        return await ingredient_categories.categorize(
+            {norm_name: agg.display_name for norm_name, agg in ingredients.items()}
+        )
 
     def _clean_ingredient_name(self, name: str) -> str:
         """
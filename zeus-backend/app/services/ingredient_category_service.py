@@ -0,0 +1,299 @@
+"""
+Persistent ingredient name -> (clean name, grocery category) store.
+
+Grocery list generation used to send every ingredient of every list to Claude
+for cleaning and categorization, synchronously, even though the same names
+("garlic cloves, minced", "olive oil") come up week after week for every
+user. Results are now kept in the ingredient_categories table (migration 009)
+keyed by normalized name, and mirrored in a per-worker dict loaded at startup.
+
+For a list, names are resolved in order:
+
+1. the in-memory map
+2. the table (picks up names another worker categorized since startup)
+3. Claude (Haiku), for names never seen before, in batches through
+   ai_service's concurrency limiter, without blocking the event loop
+
+New results are written back to the table, so a repeat grocery list needs no
+AI call at all. Names Claude can't categorize are left to the caller's
+rule-based fallback and not stored.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.database import get_database
+from app.schemas.grocery_list import GroceryCategory
+
+logger = logging.getLogger(__name__)
+
+CATEGORIZE_MODEL = "claude-haiku-4-5-20251001"
+
+# Names per Claude call (keeps each response well under max_tokens)
+CATEGORIZE_BATCH_SIZE = 60
+
+# Seconds before a categorization call is abandoned (rules take over)
+CATEGORIZE_TIMEOUT_SECONDS = 30
+
+# Rows per request when loading the table / names per in_() lookup
+PAGE_SIZE = 1000
+LOOKUP_CHUNK_SIZE = 100
+
+VALID_CATEGORIES = {category.value for category in GroceryCategory}
+
+CATEGORIZE_PROMPT = """You are a grocery list assistant. For each ingredient below, return:
+1. A clean display name — what you'd see on a grocery shopping list:
+   - Remove brand names ("Eggland's Best Eggs" → "Eggs")
+   - Remove recipe instructions ("minced", "diced", "or to taste", "divided")
+   - Remove size descriptors ("small", "large", "medium")
+   - Remove cooking state prefixes ("Uncooked Jasmine Rice" → "Jasmine Rice")
+   - Remove any emoji characters
+   - Fix truncated words ("larg" → infer it was "large" and remove it)
+   - Fix typos and formatting issues
+   - Capitalize properly (title case)
+   - Keep it simple: just the ingredient name a shopper needs
+2. The correct grocery store category
+
+Valid categories (use EXACTLY one of these):
+Produce, Dairy, Protein, Grains, Spices, Condiments, Beverages, Frozen, Pantry, Other
+
+Category rules:
+- Peanut butter, nut butters → Condiments (NOT Dairy)
+- Shallots, scallions, fresh herbs → Produce
+- Sauces (soy, fish, oyster, hot sauce, etc.) → Condiments
+- Oils and vinegars → Condiments
+- Flour, sugar, cornstarch, baking supplies → Pantry
+- Salt, pepper, dried herbs/spices, seasoning → Spices
+- Eggs → Protein
+- Rice, pasta, bread, noodles → Grains
+- Broth/stock → Beverages
+- Nuts, seeds, dried beans → Pantry
+- Honey, maple syrup → Condiments
+- Mirin, cooking wine → Condiments
+
+Ingredients:
+{names_text}
+
+Respond with ONLY a JSON array, no other text. Each element:
+{{"original": "exact original name from list above", "clean_name": "cleaned name", "category": "Category"}}"""
+
+
+class IngredientCategoryStore:
+    """normalized_name -> (clean_name, category), backed by ingredient_categories."""
+
+    def __init__(self):
+        self.db = get_database()
+        self._entries: Dict[str, Tuple[str, str]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._load_task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.db_hits = 0
+        self.ai_categorized = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "ai_categorized": self.ai_categorized,
+        }
+
+    # --- Loading ---
+
+    def start(self) -> None:
+        """Begin loading in the background; the first grocery list waits for it if needed."""
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self.load())
+
+    async def load(self) -> None:
+        """Load the whole table into memory (once per worker)."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            entries: Dict[str, Tuple[str, str]] = {}
+            start = 0
+            try:
+                while True:
+                    result = await (
+                        self.db.table("ingredient_categories")
+                        .select("normalized_name, clean_name, category")
+                        .order("normalized_name")
+                        .range(start, start + PAGE_SIZE - 1)
+                        .execute()
+                    )
+                    rows = result.data or []
+                    for row in rows:
+                        entries[row["normalized_name"]] = (row["clean_name"], row["category"])
+                    if len(rows) < PAGE_SIZE:
+                        break
+                    start += PAGE_SIZE
+            except Exception as e:
+                # Table missing (migration 009 not applied) or DB down: run uncached
+                # and retry on the next grocery list
+                logger.warning(f"Could not load ingredient categories: {e}")
+                return
+
+            # Keep anything categorized while the load was running
+            entries.update(self._entries)
+            self._entries = entries
+            self._loaded = True
+            logger.info(f"Loaded {len(entries)} ingredient categories")
+
+    # --- Lookups ---
+
+    async def categorize(self, names: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+        """
+        Clean names and categories for {normalized_name: display_name}.
+
+        Returns normalized_name -> {"clean_name": ..., "category": ...} for
+        every name that could be resolved; missing names are left to the
+        caller's rule-based categorization.
+        """
+        if not names:
+            return {}
+        if not self._loaded:
+            await self.load()
+
+        result: Dict[str, Dict[str, str]] = {}
+        missing: Dict[str, str] = {}
+        for norm_name, display_name in names.items():
+            entry = self._entries.get(norm_name)
+            if entry:
+                result[norm_name] = {"clean_name": entry[0], "category": entry[1]}
+            else:
+                missing[norm_name] = display_name
+        self.hits += len(result)
+        if not missing:
+            return result
+
+        for norm_name, entry in (await self._fetch_stored(list(missing))).items():
+            self._entries[norm_name] = entry
+            result[norm_name] = {"clean_name": entry[0], "category": entry[1]}
+            self.db_hits += 1
+            del missing[norm_name]
+        if not missing:
+            return result
+
+        categorized = await self._ai_categorize(missing)
+        if categorized:
+            self._entries.update(categorized)
+            self.ai_categorized += len(categorized)
+            for norm_name, (clean_name, category) in categorized.items():
+                result[norm_name] = {"clean_name": clean_name, "category": category}
+            await self._store(categorized)
+
+        logger.info(
+            f"Ingredient categories: {len(names) - len(missing)} known, "
+            f"{len(categorized)}/{len(missing)} new from Claude"
+        )
+        return result
+
+    async def _fetch_stored(self, norm_names: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Rows other workers wrote since this one loaded."""
+        chunks = [
+            norm_names[i:i + LOOKUP_CHUNK_SIZE]
+            for i in range(0, len(norm_names), LOOKUP_CHUNK_SIZE)
+        ]
+        try:
+            results = await asyncio.gather(*(
+                self.db.table("ingredient_categories")
+                .select("normalized_name, clean_name, category")
+                .in_("normalized_name", chunk)
+                .execute()
+                for chunk in chunks
+            ))
+        except Exception as e:
+            logger.warning(f"Ingredient category lookup failed: {e}")
+            return {}
+        return {
+            row["normalized_name"]: (row["clean_name"], row["category"])
+            for result in results
+            for row in result.data or []
+        }
+
+    async def _store(self, entries: Dict[str, Tuple[str, str]]) -> None:
+        rows = [
+            {"normalized_name": norm_name, "clean_name": clean_name, "category": category}
+            for norm_name, (clean_name, category) in entries.items()
+        ]
+        try:
+            await (
+                self.db.table("ingredient_categories")
+                .upsert(rows, on_conflict="normalized_name")
+                .execute()
+            )
+        except Exception as e:
+            # Still cached in memory for this worker
+            logger.warning(f"Could not store ingredient categories: {e}")
+
+    # --- Claude ---
+
+    async def _ai_categorize(self, names: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+        """Categorize unseen names with Claude, batches in parallel."""
+        items = list(names.items())
+        batches = [
+            dict(items[i:i + CATEGORIZE_BATCH_SIZE])
+            for i in range(0, len(items), CATEGORIZE_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(self._ai_categorize_batch(batch) for batch in batches))
+        merged: Dict[str, Tuple[str, str]] = {}
+        for batch_result in results:
+            merged.update(batch_result)
+        return merged
+
+    async def _ai_categorize_batch(self, names: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+        from app.services.ai_service import ai_service
+
+        names_text = "\n".join(f"- {display_name}" for display_name in names.values())
+        try:
+            response_text = await ai_service.call_claude(
+                CATEGORIZE_MODEL,
+                max_tokens=4000,
+                temperature=0.0,
+                messages=[{"role": "user", "content": CATEGORIZE_PROMPT.format(names_text=names_text)}],
+                timeout=CATEGORIZE_TIMEOUT_SECONDS,
+                prompt_name="ingredient_categories",
+            )
+            return self._parse_response(response_text, names)
+        except Exception as e:
+            logger.warning(f"Claude categorization failed, falling back to rules: {e}")
+            return {}
+
+    @staticmethod
+    def _parse_response(response_text: str, names: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+        response_text = response_text.strip()
+
+        # Extract JSON from response (handle markdown code blocks)
+        if response_text.startswith("```"):
+            response_text = response_text.split("\n", 1)[1]
+            response_text = response_text.rsplit("```", 1)[0].strip()
+
+        parsed = json.loads(response_text)
+
+        # Match back to our normalized names
+        by_display_name: Dict[str, str] = {}
+        for norm_name, display_name in names.items():
+            by_display_name.setdefault(display_name, norm_name)
+
+        result: Dict[str, Tuple[str, str]] = {}
+        for item in parsed:
+            original = item.get("original", "")
+            norm_name: Optional[str] = by_display_name.get(original)
+            if norm_name is None:
+                continue
+            clean_name = (item.get("clean_name") or original).strip()[:200]
+            category = item.get("category", "Other")
+            if category not in VALID_CATEGORIES:
+                category = "Other"
+            result[norm_name] = (clean_name, category)
+        return result
+
+
+# Global instance
+ingredient_categories = IngredientCategoryStore()
@@ -126,7 +126,7 @@ class InstacartService:
 
     async def get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user's Instacart preferences."""
-        result = self.db.table("user_instacart_preferences")\
+        result = await self.db.table("user_instacart_preferences")\
             .select("*")\
             .eq("user_id", user_id)\
             .execute()
@@ -142,19 +142,19 @@ class InstacartService:
         zip_code: str
     ) -> None:
         """Save user's preferred retailer."""
-        existing = self.db.table("user_instacart_preferences")\
+        existing = await self.db.table("user_instacart_preferences")\
             .select("id")\
             .eq("user_id", user_id)\
             .execute()
 
         if existing.data:
-            self.db.table("user_instacart_preferences").update({
+            await self.db.table("user_instacart_preferences").update({
                 "default_retailer_id": retailer_id,
                 "zip_code": zip_code,
                 "updated_at": datetime.utcnow().isoformat()
             }).eq("user_id", user_id).execute()
         else:
-            self.db.table("user_instacart_preferences").insert({
+            await self.db.table("user_instacart_preferences").insert({
                 "user_id": user_id,
                 "default_retailer_id": retailer_id,
                 "zip_code": zip_code
@@ -401,7 +401,7 @@ class InstacartService:
             data = response.json()
 
             # Save cart to database
-            cart_record = self.db.table("instacart_carts").insert({
+            cart_record = await self.db.table("instacart_carts").insert({
                 "user_id": user_id,
                 "grocery_list_id": grocery_list_id,
                 "instacart_cart_id": data.get("cart_id"),
@@ -418,7 +418,7 @@ class InstacartService:
 
             # Save individual cart items
             for match in matched_items:
-                self.db.table("instacart_cart_items").insert({
+                await self.db.table("instacart_cart_items").insert({
                     "instacart_cart_id": cart_id,
                     "grocery_list_item_id": match.grocery_item_id if match.grocery_item_id else None,
                     "original_item_name": match.original_name,
@@ -454,7 +454,7 @@ class InstacartService:
         cart_id: str
     ) -> Optional[Dict[str, Any]]:
         """Get current status of an Instacart cart."""
-        result = self.db.table("instacart_carts")\
+        result = await self.db.table("instacart_carts")\
             .select("*")\
             .eq("id", cart_id)\
             .eq("user_id", user_id)\
@@ -467,7 +467,7 @@ class InstacartService:
 
     async def get_cart_items(self, cart_id: str) -> List[Dict[str, Any]]:
         """Get items in a cart."""
-        result = self.db.table("instacart_cart_items")\
+        result = await self.db.table("instacart_cart_items")\
             .select("*")\
             .eq("instacart_cart_id", cart_id)\
             .execute()
@@ -498,7 +498,7 @@ class InstacartService:
             return
 
         # Find cart by Instacart cart ID
-        result = self.db.table("instacart_carts")\
+        result = await self.db.table("instacart_carts")\
             .select("id")\
             .eq("instacart_cart_id", instacart_cart_id)\
             .execute()
@@ -533,7 +533,7 @@ class InstacartService:
             update_data["order_status"] = "cancelled"
             update_data["status"] = "failed"
 
-        self.db.table("instacart_carts")\
+        await self.db.table("instacart_carts")\
             .update(update_data)\
             .eq("id", cart_db_id)\
             .execute()
@@ -596,7 +596,7 @@ class InstacartService:
         retailer_id: str
     ) -> Optional[ProductSearchResult]:
         """Get cached product search result."""
-        result = self.db.table("instacart_product_cache")\
+        result = await self.db.table("instacart_product_cache")\
             .select("*")\
             .eq("normalized_name", normalized_name)\
             .eq("retailer_id", retailer_id)\
@@ -626,7 +626,7 @@ class InstacartService:
         expires_at = datetime.utcnow() + timedelta(hours=PRODUCT_CACHE_TTL_HOURS)
 
         # Upsert cache entry
-        self.db.table("instacart_product_cache").upsert({
+        await self.db.table("instacart_product_cache").upsert({
             "normalized_name": normalized_name,
             "retailer_id": retailer_id,
             "instacart_product_id": product.product_id,
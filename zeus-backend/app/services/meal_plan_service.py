@@ -24,7 +24,7 @@ class MealPlanService:
             "meals": self._serialize_meals(meal_plan_data.meals)
         }
         
-        result = self.db.table("meal_plans").insert(meal_plan_record).execute()
+        result = await self.db.table("meal_plans").insert(meal_plan_record).execute()
         
         if not result.data:
             raise HTTPException(
@@ -37,7 +37,7 @@ class MealPlanService:
     
     async def get_meal_plan_by_id(self, meal_plan_id: str, user_id: str) -> MealPlanResponse:
         """Get a meal plan by ID (user must own it)"""
-        result = self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
+        result = await self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
         
         if not result.data:
             raise HTTPException(
@@ -51,7 +51,7 @@ class MealPlanService:
     async def update_meal_plan(self, meal_plan_id: str, meal_plan_data: MealPlanUpdate, user_id: str) -> MealPlanResponse:
         """Update a meal plan (only by owner)"""
         # Check if meal plan exists and user owns it
-        existing_plan = self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
+        existing_plan = await self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
         
         if not existing_plan.data:
             raise HTTPException(
@@ -74,7 +74,7 @@ class MealPlanService:
                 detail="No valid fields to update"
             )
         
-        result = self.db.table("meal_plans").update(update_data).eq("id", meal_plan_id).execute()
+        result = await self.db.table("meal_plans").update(update_data).eq("id", meal_plan_id).execute()
         
         if not result.data:
             raise HTTPException(
@@ -88,7 +88,7 @@ class MealPlanService:
     async def delete_meal_plan(self, meal_plan_id: str, user_id: str) -> bool:
         """Delete a meal plan (only by owner)"""
         # Check if meal plan exists and user owns it
-        existing_plan = self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
+        existing_plan = await self.db.table("meal_plans").select("*").eq("id", meal_plan_id).eq("user_id", user_id).execute()
         
         if not existing_plan.data:
             raise HTTPException(
@@ -96,7 +96,7 @@ class MealPlanService:
                 detail="Meal plan not found or you don't have permission to delete it"
             )
         
-        result = self.db.table("meal_plans").delete().eq("id", meal_plan_id).execute()
+        result = await self.db.table("meal_plans").delete().eq("id", meal_plan_id).execute()
         return True
     
     async def get_user_meal_plans(self, user_id: str, limit: int = 20, offset: int = 0) -> List[MealPlanResponse]:
@@ -104,7 +104,7 @@ class MealPlanService:
         query = self.db.table("meal_plans").select("*").eq("user_id", user_id).order("created_at", desc=True)
         query = query.range(offset, offset + limit - 1)
         
-        result = query.execute()
+        result = await query.execute()
         
         meal_plans = []
         for meal_plan_data in result.data:
@@ -139,7 +139,7 @@ class MealPlanService:
             )
         
         # Get all recipes
-        recipes_result = self.db.table("recipes").select("*").in_("id", list(recipe_ids)).execute()
+        recipes_result = await self.db.table("recipes").select("*").in_("id", list(recipe_ids)).execute()
         
         # Aggregate ingredients
         ingredient_totals = {}
@@ -162,7 +162,7 @@ class MealPlanService:
                 # In a real app, you'd want to parse and sum quantities properly
         
         # Check user's pantry for items they already have
-        pantry_result = self.db.table("pantry_items").select("item_name").eq("user_id", user_id).execute()
+        pantry_result = await self.db.table("pantry_items").select("item_name").eq("user_id", user_id).execute()
         pantry_items = {item["item_name"].lower() for item in pantry_result.data}
         
         # Create grocery items
@@ -200,7 +200,7 @@ class MealPlanService:
         meal_plan = await self.get_meal_plan_by_id(meal_plan_id, user_id)
         
         # Get recipe details
-        recipe_result = self.db.table("recipes").select("id, title").eq("id", recipe_id).execute()
+        recipe_result = await self.db.table("recipes").select("id, title").eq("id", recipe_id).execute()
         if not recipe_result.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -7,60 +7,10 @@ Provides validation for AI-generated nutrition data and dietary compliance check
 from typing import List, Dict, Any, Optional
 import logging
 
-logger = logging.getLogger(__name__)
-
+from app.data.dietary_restrictions import FORBIDDEN_INGREDIENTS
+from app.utils.exclusion_matching import forbidden_automaton
 
-# Forbidden ingredients by dietary restriction
-FORBIDDEN_INGREDIENTS = {
-    'vegan': [
-        'butter', 'milk', 'eggs', 'egg', 'chicken', 'beef', 'pork', 'fish',
-        'honey', 'cheese', 'cream', 'yogurt', 'bacon', 'ham', 'turkey',
-        'lamb', 'duck', 'shrimp', 'salmon', 'tuna', 'crab', 'lobster',
-        'scallop', 'mussel', 'oyster', 'anchovy', 'gelatin', 'lard',
-        'whey', 'casein', 'ghee', 'mayonnaise', 'mayo'
-    ],
-    'vegetarian': [
-        'chicken', 'beef', 'pork', 'fish', 'bacon', 'ham', 'turkey',
-        'lamb', 'duck', 'shrimp', 'salmon', 'tuna', 'crab', 'lobster',
-        'scallop', 'mussel', 'oyster', 'anchovy', 'meat', 'seafood',
-        'prosciutto', 'pepperoni', 'sausage', 'steak', 'ribs'
-    ],
-    'gluten-free': [
-        'wheat', 'flour', 'bread', 'pasta', 'barley', 'rye', 'couscous',
-        'semolina', 'spelt', 'farro', 'bulgur', 'seitan', 'breadcrumbs',
-        'panko', 'croutons', 'noodles', 'tortilla', 'pita', 'naan',
-        'soy sauce', 'teriyaki'
-    ],
-    'dairy-free': [
-        'milk', 'butter', 'cheese', 'cream', 'yogurt', 'whey', 'casein',
-        'ghee', 'parmesan', 'mozzarella', 'cheddar', 'feta', 'ricotta',
-        'cottage cheese', 'sour cream', 'ice cream', 'half and half',
-        'condensed milk', 'evaporated milk'
-    ],
-    'nut-free': [
-        'peanut', 'almond', 'cashew', 'walnut', 'pecan', 'pistachio',
-        'hazelnut', 'macadamia', 'brazil nut', 'pine nut', 'chestnut',
-        'nut butter', 'peanut butter', 'almond butter', 'nutella',
-        'marzipan', 'praline', 'nougat'
-    ],
-    'keto': [
-        # Foods that are typically too high in carbs for keto
-        'sugar', 'flour', 'bread', 'pasta', 'rice', 'potato', 'corn',
-        'banana', 'grape', 'mango', 'apple', 'orange', 'honey',
-        'maple syrup', 'agave', 'oatmeal', 'cereal', 'beans', 'lentils',
-        'quinoa', 'couscous'
-    ],
-    'paleo': [
-        'bread', 'pasta', 'rice', 'beans', 'lentils', 'peanut', 'tofu',
-        'soy', 'dairy', 'milk', 'cheese', 'yogurt', 'sugar', 'corn',
-        'potato', 'cereal', 'oatmeal', 'canola oil', 'vegetable oil'
-    ],
-    'pescatarian': [
-        'chicken', 'beef', 'pork', 'bacon', 'ham', 'turkey', 'lamb',
-        'duck', 'meat', 'prosciutto', 'pepperoni', 'sausage', 'steak',
-        'ribs', 'veal', 'venison'
-    ]
-}
+logger = logging.getLogger(__name__)
 
 
 class NutritionValidationResult:
@@ -191,12 +141,15 @@ class NutritionService:
 
         ingredient_text = " ".join(ingredient_names)
 
-        # Check each restriction
+        # Check each restriction: one automaton pass finds every forbidden
+        # item present, then report them in FORBIDDEN_INGREDIENTS order
         for restriction in restrictions:
             forbidden = FORBIDDEN_INGREDIENTS.get(restriction, [])
+            if not forbidden:
+                continue
+            present = forbidden_automaton(restriction).find_all(ingredient_text)
             for forbidden_item in forbidden:
-                # Check if forbidden item appears in any ingredient
-                if forbidden_item.lower() in ingredient_text:
+                if forbidden_item.lower() in present:
                     # Find which specific ingredient contains it
                     found_in = None
                     for ing_name in ingredient_names:
@@ -8,6 +8,7 @@ import asyncio
 from concurrent.futures import ThreadPoolExecutor
 from app.database import get_database
 from app.config import settings
+from app.utils.ingredient_matching import normalize_ingredient_name
 from app.schemas.pantry import (
     PantryItemCreate, PantryItemUpdate, PantryItemResponse,
     PantryFilter, BulkPantryAdd, PantryCategory, IngredientLibraryItem,
@@ -63,7 +64,7 @@ class PantryService:
             "expires_at": item_data.expires_at.isoformat() if item_data.expires_at else None
         }
 
-        result = self.db.table("pantry_items").insert(item_record).execute()
+        result = await self.db.table("pantry_items").insert(item_record).execute()
 
         if not result.data:
             raise HTTPException(
@@ -94,7 +95,7 @@ class PantryService:
                 query = query.lt("expires_at", date.today().isoformat())
 
         query = query.order("category").order("item_name")
-        result = query.execute()
+        result = await query.execute()
 
         items = []
         for item_data in result.data:
@@ -105,7 +106,7 @@ class PantryService:
 
     async def get_pantry_item_by_id(self, item_id: str, user_id: str) -> PantryItemResponse:
         """Get a specific pantry item (with ownership check)"""
-        result = self.db.table("pantry_items").select("*").eq("id", item_id).eq("user_id", user_id).execute()
+        result = await self.db.table("pantry_items").select("*").eq("id", item_id).eq("user_id", user_id).execute()
 
         if not result.data:
             raise HTTPException(
@@ -117,7 +118,7 @@ class PantryService:
 
     async def update_pantry_item(self, item_id: str, item_data: PantryItemUpdate, user_id: str) -> PantryItemResponse:
         """Update a pantry item (only by owner)"""
-        existing_item = self.db.table("pantry_items").select("*").eq("id", item_id).eq("user_id", user_id).execute()
+        existing_item = await self.db.table("pantry_items").select("*").eq("id", item_id).eq("user_id", user_id).execute()
 
         if not existing_item.data:
             raise HTTPException(
@@ -145,7 +146,7 @@ class PantryService:
                 detail="No valid fields to update"
             )
 
-        result = self.db.table("pantry_items").update(update_data).eq("id", item_id).execute()
+        result = await self.db.table("pantry_items").update(update_data).eq("id", item_id).execute()
 
         if not result.data:
             raise HTTPException(
@@ -157,7 +158,7 @@ class PantryService:
 
     async def delete_pantry_item(self, item_id: str, user_id: str) -> bool:
         """Delete a pantry item (only by owner)"""
-        existing_item = self.db.table("pantry_items").select("*").eq("id", item_id).eq("user_id", user_id).execute()
+        existing_item = await self.db.table("pantry_items").select("*").eq("id", item_id).eq("user_id", user_id).execute()
 
         if not existing_item.data:
             raise HTTPException(
@@ -165,17 +166,17 @@ class PantryService:
                 detail="Pantry item not found or you don't have permission to delete it"
             )
 
-        self.db.table("pantry_items").delete().eq("id", item_id).execute()
+        await self.db.table("pantry_items").delete().eq("id", item_id).execute()
         return True
 
     async def bulk_delete_pantry_items(self, item_ids: List[str], user_id: str) -> int:
         """Delete multiple pantry items by ID (only by owner)"""
-        result = self.db.table("pantry_items").delete().in_("id", item_ids).eq("user_id", user_id).execute()
+        result = await self.db.table("pantry_items").delete().in_("id", item_ids).eq("user_id", user_id).execute()
         return len(result.data) if result.data else 0
 
     async def clear_all_pantry_items(self, user_id: str) -> int:
         """Delete all pantry items for a user"""
-        result = self.db.table("pantry_items").delete().eq("user_id", user_id).execute()
+        result = await self.db.table("pantry_items").delete().eq("user_id", user_id).execute()
         return len(result.data) if result.data else 0
 
     async def bulk_add_pantry_items(self, bulk_data: BulkPantryAdd, user_id: str) -> List[PantryItemResponse]:
@@ -192,7 +193,7 @@ class PantryService:
             }
             items_to_insert.append(item_record)
 
-        result = self.db.table("pantry_items").insert(items_to_insert).execute()
+        result = await self.db.table("pantry_items").insert(items_to_insert).execute()
 
         if not result.data:
             raise HTTPException(
@@ -214,7 +215,7 @@ class PantryService:
 
         search_query = search_query.order("name").limit(limit)
 
-        result = search_query.execute()
+        result = await search_query.execute()
         return result.data if result.data else []
 
     async def get_expiring_items(self, user_id: str, days_threshold: int = 7) -> List[PantryItemResponse]:
@@ -222,7 +223,7 @@ class PantryService:
         threshold_date = (date.today() + timedelta(days=days_threshold)).isoformat()
         today = date.today().isoformat()
 
-        result = self.db.table("pantry_items").select("*").eq("user_id", user_id).gte("expires_at", today).lte("expires_at", threshold_date).order("expires_at").execute()
+        result = await self.db.table("pantry_items").select("*").eq("user_id", user_id).gte("expires_at", today).lte("expires_at", threshold_date).order("expires_at").execute()
 
         items = []
         for item_data in result.data:
@@ -241,8 +242,11 @@ class PantryService:
 
         # Get user's existing pantry items for duplicate detection
         existing_items = await self.get_user_pantry_items(user_id)
-        existing_names = {item.item_name.lower().strip() for item in existing_items}
-        existing_items_map = {item.item_name.lower().strip(): item for item in existing_items}
+        existing_items_map = {
+            (normalize_ingredient_name(item.item_name) or item.item_name.lower().strip()): item
+            for item in existing_items
+        }
+        existing_names = set(existing_items_map)
 
         # Pre-compute base ingredients for existing items for faster lookup
         existing_base_ingredients = set()
@@ -255,7 +259,9 @@ class PantryService:
                     existing_base_ingredients.add(base)
 
         # Build prompt for Claude Vision
-        prompt = self._build_image_analysis_prompt(list(existing_names))
+        prompt = self._build_image_analysis_prompt(
+            [item.item_name.lower().strip() for item in existing_items]
+        )
 
         try:
             # Call Claude Vision API with timeout
@@ -281,7 +287,7 @@ class PantryService:
             existing_items_count = 0
 
             for item in detected_items:
-                item_name_lower = item.item_name.lower().strip()
+                item_name_lower = normalize_ingredient_name(item.item_name) or item.item_name.lower().strip()
 
                 # Check for duplicates (exact match or similar)
                 is_duplicate = self._check_item_duplicate_optimized(
@@ -485,8 +491,8 @@ If no food items are visible, return an empty array: []"""
 
     def _items_are_similar(self, name1: str, name2: str) -> bool:
         """Check if two item names are similar (accounting for variations)"""
-        name1 = name1.lower().strip()
-        name2 = name2.lower().strip()
+        name1 = normalize_ingredient_name(name1) or name1.lower().strip()
+        name2 = normalize_ingredient_name(name2) or name2.lower().strip()
 
         # Exact match
         if name1 == name2:
@@ -0,0 +1,529 @@
+"""
+In-process recipe catalog snapshot.
+
+The recipe table changes rarely (seed/import scripts plus the occasional user
+recipe), but the feed and the meal plan shortlist read hundreds of rows from it
+on every request. This module keeps a per-worker copy of the table in memory
+and answers those filter queries locally:
+
+- inverted indexes on meal_type, dietary_tags, cuisine_type and difficulty
+  (value -> set of recipe ids)
+- ids sorted by likes_count (the order every caller wants) and by calories
+  (for range filters via bisect)
+- a full-text SearchIndex over title, description and ingredient names,
+  maintained per row (only rows whose text changed are re-indexed)
+
+A background loop refreshes the snapshot incrementally by pulling rows whose
+updated_at (or created_at, before migration 005 is applied) moved past the
+last watermark, plus the table's id column: known ids missing from it were
+deleted (by another worker, a script or SQL) and are dropped. The whole table
+is still reloaded every recipe_catalog_full_refresh_seconds; deletes made
+through this worker are applied immediately.
+
+Callers must check `is_ready` and fall back to PostgREST when it's False
+(catalog disabled, first load still running, or refreshes failing).
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from app.config import settings
+from app.database import get_database
+from app.utils.ingredient_matching import (
+    INGREDIENT_SIGNATURE_VERSION,
+    build_ingredient_signature,
+)
+from app.utils.text_search import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Rows per request when paging through the table (PostgREST max-rows default)
+PAGE_SIZE = 1000
+
+# Catalog is treated as unusable if no refresh succeeded for this many intervals
+STALE_AFTER_INTERVALS = 5
+
+# Catalog rows carry the creator's username, like the API's recipe selects
+ROW_COLUMNS = """
+    *,
+    users!recipes_user_id_fkey(username)
+"""
+
+# Incremental pulls larger than this rebuild the indexes instead of
+# patching them row by row
+INCREMENTAL_INDEX_MAX_ROWS = 500
+
+# Relative weight of each searchable field (same A/B/C order as migration 008)
+SEARCH_FIELD_WEIGHTS = {"title": 3.0, "ingredients": 2.0, "description": 1.0}
+
+
+class RecipeCatalog:
+    """Indexed, periodically refreshed snapshot of the recipes table."""
+
+    def __init__(
+        self,
+        refresh_seconds: int = 60,
+        full_refresh_seconds: int = 3600,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+
+        self._rows: Dict[str, dict] = {}
+        self._by_meal_type: Dict[str, Set[str]] = {}
+        self._by_dietary_tag: Dict[str, Set[str]] = {}
+        self._by_cuisine: Dict[str, Set[str]] = {}
+        self._by_difficulty: Dict[str, Set[str]] = {}
+        self._by_likes: List[str] = []          # ids, likes_count desc
+        self._likes_rank: Dict[str, tuple] = {} # id -> sort key of _by_likes
+        self._calorie_keys: List[int] = []      # sorted calories (non-null only)
+        self._calorie_ids: List[str] = []       # ids aligned with _calorie_keys
+        self._search = SearchIndex(SEARCH_FIELD_WEIGHTS)
+        self._search_pending: Optional[Set[str]] = None  # ids written during a full load
+
+        self._watermark: Optional[str] = None
+        self._watermark_column = "updated_at"
+        self._last_full_load: Optional[float] = None
+        self._last_refresh: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+    # --- State ---
+
+    @property
+    def is_ready(self) -> bool:
+        """True when the snapshot is loaded and recently refreshed."""
+        if self._last_refresh is None:
+            return False
+        age = time.monotonic() - self._last_refresh
+        return age < self.refresh_seconds * STALE_AFTER_INTERVALS
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "ready": self.is_ready,
+            "recipes": len(self._rows),
+            "watermark": self._watermark,
+            "watermark_column": self._watermark_column,
+            "seconds_since_refresh": (
+                round(time.monotonic() - self._last_refresh, 1)
+                if self._last_refresh is not None else None
+            ),
+        }
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        """Start the background refresh loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Recipe catalog refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    # --- Loading ---
+
+    async def refresh(self) -> None:
+        """Full reload when due, otherwise pull rows changed since the watermark."""
+        async with self._refresh_lock:
+            now = time.monotonic()
+            if (
+                self._last_full_load is None
+                or now - self._last_full_load >= self.full_refresh_seconds
+            ):
+                await self._full_load()
+            else:
+                await self._incremental_load()
+            self._last_refresh = time.monotonic()
+
+    async def _full_load(self) -> None:
+        started = time.monotonic()
+        rows = await self._fetch_pages()
+
+        watermark_column = "updated_at" if rows and "updated_at" in rows[0] else "created_at"
+        new_rows = {r["id"]: self._with_signature(r) for r in rows}
+
+        # Indexing every recipe's text takes seconds at 100k rows; build it off
+        # the event loop and keep serving the previous snapshot until it's done.
+        # Rows written meanwhile land in the previous snapshot and are carried
+        # over, then rows, indexes and search index are swapped together so a
+        # query never sees search hits for rows it doesn't have.
+        self._search_pending = set()
+        try:
+            search = await asyncio.to_thread(self._build_search, list(new_rows.items()))
+            for rid in self._search_pending:
+                if rid in self._rows:
+                    new_rows[rid] = self._rows[rid]
+                    search.add(rid, self._search_fields(new_rows[rid]))
+                else:
+                    new_rows.pop(rid, None)
+                    search.remove(rid)
+        finally:
+            self._search_pending = None
+
+        self._watermark_column = watermark_column
+        self._rows = new_rows
+        self._watermark = self._max_watermark(rows)
+        self._rebuild_indexes()
+        self._search = search
+        self._last_full_load = time.monotonic()
+
+        logger.info(
+            f"Recipe catalog loaded {len(self._rows)} recipes "
+            f"in {(time.monotonic() - started) * 1000:.0f}ms"
+        )
+
+    async def _incremental_load(self) -> None:
+        if self._watermark is None:
+            await self._full_load()
+            return
+
+        # Only rows known before the id pull can be judged deleted; rows this
+        # worker writes while the pulls are in flight aren't in it yet
+        known = set(self._rows)
+        current_ids = {r["id"] for r in await self._fetch_pages(columns="id")}
+
+        # gte rather than gt: rows sharing the watermark timestamp may have
+        # committed after the previous pull. Re-applying a row is harmless.
+        changed = await self._fetch_pages(since=self._watermark)
+        changed = [self._with_signature(r) for r in changed]
+        deleted = known - current_ids - {r["id"] for r in changed}
+        changed = [r for r in changed if self._rows.get(r["id"]) != r]
+        if not changed and not deleted:
+            return
+
+        if len(changed) + len(deleted) > INCREMENTAL_INDEX_MAX_ROWS:
+            for rid in deleted:
+                self._rows.pop(rid, None)
+                self._search.remove(rid)
+            for row in changed:
+                self._rows[row["id"]] = row
+                self._search.add(row["id"], self._search_fields(row))
+            self._rebuild_indexes()
+        else:
+            for rid in deleted:
+                self._drop_row(rid)
+            for row in changed:
+                self._put_row(row)
+        if changed:
+            self._watermark = max(self._watermark, self._max_watermark(changed) or self._watermark)
+        logger.info(
+            f"Recipe catalog applied {len(changed)} changed and {len(deleted)} deleted recipes"
+        )
+
+    async def _fetch_pages(self, since: Optional[str] = None, columns: str = ROW_COLUMNS) -> List[dict]:
+        db = get_database()
+        rows: List[dict] = []
+        start = 0
+        while True:
+            query = db.table("recipes").select(columns)
+            if since is not None:
+                query = query.gte(self._watermark_column, since)
+            query = query.order("id").range(start, start + PAGE_SIZE - 1)
+            result = await query.execute()
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    def _max_watermark(self, rows: Iterable[dict]) -> Optional[str]:
+        # Timestamps come back as ISO-8601 strings in UTC, which sort lexically
+        values = [r.get(self._watermark_column) for r in rows]
+        values = [v for v in values if v]
+        return max(values) if values else None
+
+    @staticmethod
+    def _with_signature(row: dict) -> dict:
+        """Fill in ingredient_signature for rows not yet backfilled."""
+        signature = row.get("ingredient_signature")
+        if isinstance(signature, dict) and signature.get("version") == INGREDIENT_SIGNATURE_VERSION:
+            return row
+        return {**row, "ingredient_signature": build_ingredient_signature(row.get("ingredients"))}
+
+    # --- Local writes (keep this worker consistent between refreshes) ---
+
+    def upsert(self, row: dict) -> None:
+        """Apply a recipe row written by this worker."""
+        if self._last_refresh is None or not row.get("id"):
+            return
+        previous = self._rows.get(row["id"])
+        if previous and "users" not in row and "users" in previous:
+            row = {**row, "users": previous["users"]}
+        self._put_row(self._with_signature(row))
+        if self._search_pending is not None:
+            self._search_pending.add(row["id"])
+
+    def remove(self, recipe_id: str) -> None:
+        """Drop a recipe deleted by this worker."""
+        self._drop_row(recipe_id)
+        if self._search_pending is not None:
+            self._search_pending.add(recipe_id)
+
+    def _drop_row(self, rid: str) -> None:
+        """Remove one row, patching the indexes in place."""
+        previous = self._rows.pop(rid, None)
+        if previous is not None:
+            self._unindex_row(rid, previous)
+            self._search.remove(rid)
+
+    def _put_row(self, row: dict) -> None:
+        """Insert or replace one row, patching the indexes in place."""
+        rid = row["id"]
+        previous = self._rows.get(rid)
+        if previous is not None:
+            self._unindex_row(rid, previous)
+        self._rows[rid] = row
+        self._index_row(rid, row)
+        self._search.add(rid, self._search_fields(row))
+
+    # --- Indexes ---
+
+    @classmethod
+    def _build_search(cls, rows: List[tuple]) -> SearchIndex:
+        search = SearchIndex(SEARCH_FIELD_WEIGHTS)
+        for rid, row in rows:
+            search.add(rid, cls._search_fields(row))
+        return search
+
+    @staticmethod
+    def _search_fields(row: dict) -> Dict[str, str]:
+        return {
+            "title": row.get("title"),
+            "description": row.get("description"),
+            "ingredients": " ".join(
+                ing.get("name", "") if isinstance(ing, dict) else str(ing)
+                for ing in row.get("ingredients") or []
+            ),
+        }
+
+    def _rebuild_indexes(self) -> None:
+        """Rebuild every index from self._rows (full loads and large pulls).
+
+        Single-row writes go through _index_row/_unindex_row instead, so a
+        user saving a recipe doesn't re-sort the whole catalog.
+        """
+        by_meal_type: Dict[str, Set[str]] = {}
+        by_dietary_tag: Dict[str, Set[str]] = {}
+        by_cuisine: Dict[str, Set[str]] = {}
+        by_difficulty: Dict[str, Set[str]] = {}
+        calorie_pairs = []
+
+        for rid, row in self._rows.items():
+            for mt in row.get("meal_type") or []:
+                by_meal_type.setdefault(mt, set()).add(rid)
+            for tag in row.get("dietary_tags") or []:
+                by_dietary_tag.setdefault(tag, set()).add(rid)
+            if row.get("cuisine_type") is not None:
+                by_cuisine.setdefault(row["cuisine_type"], set()).add(rid)
+            if row.get("difficulty") is not None:
+                by_difficulty.setdefault(row["difficulty"], set()).add(rid)
+            if row.get("calories") is not None:
+                calorie_pairs.append((row["calories"], rid))
+
+        likes_rank = {rid: self._likes_key(rid, row) for rid, row in self._rows.items()}
+        by_likes = sorted(self._rows, key=likes_rank.__getitem__)
+        calorie_pairs.sort()
+
+        self._by_meal_type = by_meal_type
+        self._by_dietary_tag = by_dietary_tag
+        self._by_cuisine = by_cuisine
+        self._by_difficulty = by_difficulty
+        self._by_likes = by_likes
+        self._likes_rank = likes_rank
+        self._calorie_keys = [c for c, _ in calorie_pairs]
+        self._calorie_ids = [rid for _, rid in calorie_pairs]
+
+    @staticmethod
+    def _likes_key(rid: str, row: dict) -> tuple:
+        return (-(row.get("likes_count") or 0), rid)
+
+    def _calorie_position(self, calories: int, rid: str) -> int:
+        """Index of (calories, rid) in the sorted calorie pairs."""
+        lo = bisect.bisect_left(self._calorie_keys, calories)
+        hi = bisect.bisect_right(self._calorie_keys, calories, lo)
+        return bisect.bisect_left(self._calorie_ids, rid, lo, hi)
+
+    def _index_row(self, rid: str, row: dict) -> None:
+        for mt in row.get("meal_type") or []:
+            self._by_meal_type.setdefault(mt, set()).add(rid)
+        for tag in row.get("dietary_tags") or []:
+            self._by_dietary_tag.setdefault(tag, set()).add(rid)
+        if row.get("cuisine_type") is not None:
+            self._by_cuisine.setdefault(row["cuisine_type"], set()).add(rid)
+        if row.get("difficulty") is not None:
+            self._by_difficulty.setdefault(row["difficulty"], set()).add(rid)
+        if row.get("calories") is not None:
+            i = self._calorie_position(row["calories"], rid)
+            self._calorie_keys.insert(i, row["calories"])
+            self._calorie_ids.insert(i, rid)
+        self._likes_rank[rid] = self._likes_key(rid, row)
+        bisect.insort(self._by_likes, rid, key=self._likes_rank.__getitem__)
+
+    def _unindex_row(self, rid: str, row: dict) -> None:
+        self._discard(self._by_meal_type, row.get("meal_type") or [], rid)
+        self._discard(self._by_dietary_tag, row.get("dietary_tags") or [], rid)
+        if row.get("cuisine_type") is not None:
+            self._discard(self._by_cuisine, [row["cuisine_type"]], rid)
+        if row.get("difficulty") is not None:
+            self._discard(self._by_difficulty, [row["difficulty"]], rid)
+        if row.get("calories") is not None:
+            i = self._calorie_position(row["calories"], rid)
+            if i < len(self._calorie_ids) and self._calorie_ids[i] == rid:
+                del self._calorie_keys[i]
+                del self._calorie_ids[i]
+        rank = self._likes_rank.get(rid)
+        if rank is not None:
+            i = bisect.bisect_left(self._by_likes, rank, key=self._likes_rank.__getitem__)
+            del self._by_likes[i]
+            del self._likes_rank[rid]
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], keys: Iterable[str], rid: str) -> None:
+        for key in keys:
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(rid)
+                if not ids:
+                    del index[key]
+
+    # --- Queries ---
+
+    def query(
+        self,
+        *,
+        meal_type: Optional[str] = None,
+        dietary_tags: Optional[Sequence[str]] = None,
+        cuisine_types: Optional[Sequence[str]] = None,
+        difficulties: Optional[Sequence[str]] = None,
+        min_calories: Optional[int] = None,
+        max_calories: Optional[int] = None,
+        max_prep_time: Optional[int] = None,
+        is_ai_generated: Optional[bool] = None,
+        require_image: bool = False,
+        search: Optional[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Filter the snapshot, ordered by likes_count desc.
+
+        Filters mirror the PostgREST calls they replace: array filters are
+        "contains all" (case-sensitive), cuisine/difficulty are exact "in",
+        and null prep_time/calories never satisfy a range. `search` is a
+        full-text query (see app/utils/text_search.py); when given, results
+        are ordered by relevance, then likes. Returns shallow copies so
+        callers can annotate rows without touching the snapshot.
+        """
+        candidates: Optional[Set[str]] = None
+        relevance: Optional[Dict[str, float]] = None
+
+        def narrow(ids: Set[str]) -> None:
+            nonlocal candidates
+            candidates = set(ids) if candidates is None else candidates & ids
+
+        if meal_type:
+            narrow(self._by_meal_type.get(meal_type, set()))
+        for tag in dietary_tags or []:
+            narrow(self._by_dietary_tag.get(tag, set()))
+        if cuisine_types is not None:
+            narrow(self._union(self._by_cuisine, cuisine_types))
+        if difficulties is not None:
+            narrow(self._union(self._by_difficulty, difficulties))
+        if min_calories is not None or max_calories is not None:
+            lo = 0 if min_calories is None else bisect.bisect_left(self._calorie_keys, min_calories)
+            hi = (
+                len(self._calorie_keys) if max_calories is None
+                else bisect.bisect_right(self._calorie_keys, max_calories)
+            )
+            narrow(set(self._calorie_ids[lo:hi]))
+        if search:
+            relevance = dict(self._search.search(search))
+            narrow(set(relevance))
+
+        if candidates is None:
+            ordered = self._by_likes
+        elif relevance is not None:
+            ordered = sorted(candidates, key=lambda rid: (-relevance[rid], self._likes_rank[rid]))
+        else:
+            ordered = sorted(candidates, key=self._likes_rank.__getitem__)
+
+        excluded = set(exclude_ids or [])
+
+        results = []
+        for rid in ordered:
+            if rid in excluded:
+                continue
+            row = self._rows[rid]
+            if max_prep_time is not None:
+                prep = row.get("prep_time")
+                if prep is None or prep > max_prep_time:
+                    continue
+            if is_ai_generated is not None and row.get("is_ai_generated") != is_ai_generated:
+                continue
+            if require_image and row.get("image_url") is None:
+                continue
+
+            if fields is None:
+                results.append(dict(row))
+            else:
+                results.append({f: row.get(f) for f in fields})
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def search(
+        self,
+        text: str,
+        owner_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """Recipe ids matching a full-text query, most relevant first."""
+        ranked = sorted(
+            self._search.search(text),
+            key=lambda item: (-item[1], self._likes_rank.get(item[0], ())),
+        )
+        ids = []
+        for rid, _ in ranked:
+            if owner_id is not None and self._rows[rid].get("user_id") != owner_id:
+                continue
+            ids.append(rid)
+            if limit is not None and len(ids) >= limit:
+                break
+        return ids
+
+    def get_many(self, recipe_ids: Iterable[str]) -> Dict[str, dict]:
+        """Rows for the given ids (shallow copies); unknown ids are omitted."""
+        return {rid: dict(self._rows[rid]) for rid in recipe_ids if rid in self._rows}
+
+    @staticmethod
+    def _union(index: Dict[str, Set[str]], keys: Iterable[str]) -> Set[str]:
+        ids: Set[str] = set()
+        for key in keys:
+            ids |= index.get(key, set())
+        return ids
+
+
+# Global catalog instance
+recipe_catalog = RecipeCatalog(
+    refresh_seconds=settings.recipe_catalog_refresh_seconds,
+    full_refresh_seconds=settings.recipe_catalog_full_refresh_seconds,
+)
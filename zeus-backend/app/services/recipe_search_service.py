@@ -0,0 +1,55 @@
+"""
+Recipe search.
+
+Ranked recipe ids for a free-text query, from the first source available:
+
+1. the in-process catalog's inverted index (app/utils/text_search.py), when
+   the catalog is warm
+2. the search_recipes() function from migration 008 (tsvector + pg_trgm)
+
+If neither is available (catalog cold and migration not applied) search_ids
+returns None and callers fall back to the old ILIKE title filter.
+"""
+
+import logging
+from typing import List, Optional
+
+from app.database import get_database
+from app.services.recipe_catalog_service import recipe_catalog
+
+logger = logging.getLogger(__name__)
+
+# Most results a search returns (relevance falls off long before this)
+SEARCH_RESULT_LIMIT = 500
+
+
+class RecipeSearchService:
+    def __init__(self):
+        self.db = get_database()
+
+    async def search_ids(
+        self,
+        query: str,
+        limit: Optional[int] = SEARCH_RESULT_LIMIT,
+        owner_id: Optional[str] = None,
+    ) -> Optional[List[str]]:
+        """Recipe ids matching query, most relevant first. None if search is unavailable.
+
+        limit=None returns every match (meant for owner-scoped searches).
+        """
+        if recipe_catalog.is_ready:
+            return recipe_catalog.search(query, owner_id=owner_id, limit=limit)
+
+        params = {"search_query": query, "result_limit": limit}
+        if owner_id:
+            params["owner_id"] = owner_id
+        try:
+            result = await self.db.rpc("search_recipes", params).execute()
+        except Exception as e:
+            logger.warning(f"search_recipes unavailable, falling back to ILIKE: {e}")
+            return None
+        return [row["recipe_id"] for row in result.data or []]
+
+
+# Global instance
+recipe_search_service = RecipeSearchService()
@@ -1,14 +1,25 @@
-from typing import List, Optional
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
 from fastapi import HTTPException, status
 import logging
 from app.database import get_database
+from app.services.recipe_catalog_service import recipe_catalog
+from app.services.recipe_search_service import recipe_search_service
+from app.utils.ingredient_matching import build_ingredient_signature
+from app.utils.pagination import apply_keyset_page, next_keyset_cursor
 
 logger = logging.getLogger(__name__)
 from app.schemas.recipe import (
     RecipeCreate, RecipeUpdate, RecipeResponse, RecipeFeedFilter, 
     RecipeInteraction, Ingredient, Instruction
 )
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+
+# Rows per PostgREST request when paging (the server's max-rows default)
+FETCH_PAGE_SIZE = 1000
+
+# Ids per `in` filter when loading rows by id (keeps the URL short)
+LOAD_CHUNK_SIZE = 100
 
 
 class RecipeService:
@@ -34,8 +45,9 @@ class RecipeService:
             "is_ai_generated": False,
             "likes_count": 0
         }
+        recipe_record["ingredient_signature"] = build_ingredient_signature(recipe_record["ingredients"])
         
-        result = self.db.table("recipes").insert(recipe_record).execute()
+        result = await self.db.table("recipes").insert(recipe_record).execute()
         
         if not result.data:
             raise HTTPException(
@@ -44,6 +56,7 @@ class RecipeService:
             )
         
         created_recipe = result.data[0]
+        recipe_catalog.upsert(created_recipe)
         return await self._format_recipe_response(created_recipe)
     
     async def get_recipe_by_id(self, recipe_id: str, user_id: Optional[str] = None) -> RecipeResponse:
@@ -53,7 +66,7 @@ class RecipeService:
             users!recipes_user_id_fkey(username)
         """).eq("id", recipe_id)
         
-        result = recipe_query.execute()
+        result = await recipe_query.execute()
         
         if not result.data:
             raise HTTPException(
@@ -88,28 +101,19 @@ class RecipeService:
                 seen.add(rid)
                 unique_ids.append(rid)
 
-        # Fetch all recipes in one query
-        result = self.db.table("recipes").select("""
-            *,
-            users!recipes_user_id_fkey(username)
-        """).in_("id", unique_ids).execute()
-
-        if not result.data:
+        # Fetch all recipes in one batch
+        recipes_map = await self._load_recipe_rows(unique_ids)
+        if not recipes_map:
             return []
 
-        # Build a map for quick lookup
-        recipes_map = {}
-        for recipe_data in result.data:
-            recipes_map[recipe_data["id"]] = recipe_data
-
         # Get user likes/saves in batch if user_id provided
         liked_ids = set()
         saved_ids = set()
         if user_id:
-            likes_result = self.db.table("recipe_likes").select("recipe_id").eq("user_id", user_id).in_("recipe_id", unique_ids).execute()
+            likes_result = await self.db.table("recipe_likes").select("recipe_id").eq("user_id", user_id).in_("recipe_id", unique_ids).execute()
             liked_ids = {like["recipe_id"] for like in likes_result.data}
 
-            saves_result = self.db.table("recipe_saves").select("recipe_id").eq("user_id", user_id).in_("recipe_id", unique_ids).execute()
+            saves_result = await self.db.table("recipe_saves").select("recipe_id").eq("user_id", user_id).in_("recipe_id", unique_ids).execute()
             saved_ids = {save["recipe_id"] for save in saves_result.data}
 
         # Format responses in the original order
@@ -127,7 +131,7 @@ class RecipeService:
     async def update_recipe(self, recipe_id: str, recipe_data: RecipeUpdate, user_id: str) -> RecipeResponse:
         """Update a recipe (only by owner)"""
         # Check if recipe exists and user owns it
-        existing_recipe = self.db.table("recipes").select("*").eq("id", recipe_id).eq("user_id", user_id).execute()
+        existing_recipe = await self.db.table("recipes").select("*").eq("id", recipe_id).eq("user_id", user_id).execute()
         
         if not existing_recipe.data:
             raise HTTPException(
@@ -143,6 +147,7 @@ class RecipeService:
             update_data["description"] = recipe_data.description
         if recipe_data.ingredients is not None:
             update_data["ingredients"] = [ing.dict() for ing in recipe_data.ingredients]
+            update_data["ingredient_signature"] = build_ingredient_signature(update_data["ingredients"])
         if recipe_data.instructions is not None:
             update_data["instructions"] = [inst.dict() for inst in recipe_data.instructions]
         if recipe_data.servings is not None:
@@ -168,7 +173,7 @@ class RecipeService:
                 detail="No valid fields to update"
             )
         
-        result = self.db.table("recipes").update(update_data).eq("id", recipe_id).execute()
+        result = await self.db.table("recipes").update(update_data).eq("id", recipe_id).execute()
         
         if not result.data:
             raise HTTPException(
@@ -177,12 +182,13 @@ class RecipeService:
             )
         
         updated_recipe = result.data[0]
+        recipe_catalog.upsert(updated_recipe)
         return await self._format_recipe_response(updated_recipe)
     
     async def delete_recipe(self, recipe_id: str, user_id: str) -> bool:
         """Delete a recipe (only by owner)"""
         # Check if recipe exists and user owns it
-        existing_recipe = self.db.table("recipes").select("*").eq("id", recipe_id).eq("user_id", user_id).execute()
+        existing_recipe = await self.db.table("recipes").select("*").eq("id", recipe_id).eq("user_id", user_id).execute()
         
         if not existing_recipe.data:
             raise HTTPException(
@@ -190,11 +196,21 @@ class RecipeService:
                 detail="Recipe not found or you don't have permission to delete it"
             )
         
-        result = self.db.table("recipes").delete().eq("id", recipe_id).execute()
+        result = await self.db.table("recipes").delete().eq("id", recipe_id).execute()
+        recipe_catalog.remove(recipe_id)
         return True
     
-    async def get_recipe_feed(self, filters: RecipeFeedFilter, user_id: Optional[str] = None) -> List[RecipeResponse]:
-        """Get paginated recipe feed with filters"""
+    async def get_recipe_feed(
+        self,
+        filters: RecipeFeedFilter,
+        user_id: Optional[str] = None,
+        day: Optional[date] = None,
+    ) -> List[RecipeResponse]:
+        """Get paginated recipe feed with filters.
+
+        `day` selects which daily ordering to page through (defaults to today;
+        feed cursors pin it).
+        """
 
         # Pantry mode: fetch user's pantry and filter recipes by ingredient match
         # pantry_lookup = None means pantry mode is OFF
@@ -202,40 +218,15 @@ class RecipeService:
         # pantry_lookup = {...} means pantry mode is ON with items
         pantry_lookup = None
         if filters.use_pantry_items and user_id:
-            from app.utils.ingredient_matching import prepare_pantry_lookup, calculate_pantry_coverage
-            pantry_result = self.db.table("pantry_items").select(
+            from app.utils.ingredient_matching import prepare_pantry_lookup
+            from app.utils.candidate_scoring import pantry_coverage_batch
+            pantry_result = await self.db.table("pantry_items").select(
                 "item_name, quantity, unit, category"
             ).eq("user_id", user_id).execute()
             pantry_items = pantry_result.data or []
             pantry_lookup = prepare_pantry_lookup(pantry_items)
             logger.info(f"Pantry mode: {len(pantry_lookup)} pantry items for filtering")
 
-        query = self.db.table("recipes").select("""
-            *,
-            users!recipes_user_id_fkey(username)
-        """)
-
-        # Apply filters
-        if filters.cuisine_type:
-            query = query.eq("cuisine_type", filters.cuisine_type)
-        if filters.difficulty:
-            query = query.eq("difficulty", filters.difficulty.value)
-        if filters.max_difficulty:
-            # Filter to recipes at or below the max difficulty level
-            difficulty_order = {"Easy": 1, "Medium": 2, "Hard": 3}
-            max_level = difficulty_order.get(filters.max_difficulty.value, 3)
-            allowed = [d for d, level in difficulty_order.items() if level <= max_level]
-            query = query.in_("difficulty", allowed)
-        if filters.max_prep_time:
-            query = query.lte("prep_time", filters.max_prep_time)
-        if filters.meal_type:
-            query = query.contains("meal_type", [filters.meal_type.value])
-        if filters.dietary_tags:
-            # Use contains (ALL tags must match) for dietary restriction filtering
-            query = query.contains("dietary_tags", filters.dietary_tags)
-        if filters.search:
-            query = query.ilike("title", f"%{filters.search}%")
-
         if pantry_lookup is not None:
             # Pantry mode active — if pantry is empty, return nothing
             if len(pantry_lookup) == 0:
@@ -243,23 +234,15 @@ class RecipeService:
                 return []
 
             # Fetch a large pool to filter down from
-            query = query.order("likes_count", desc=True)
-            query = query.range(0, 499)
-            result = query.execute()
-            data = result.data or []
+            data = await self._fetch_feed_pool(filters, pool_size=500)
 
             # Filter to recipes where at least 60% of non-trivial ingredients are in pantry
             PANTRY_THRESHOLD = 0.6
+            coverage, _, total = (a.tolist() for a in pantry_coverage_batch(data, pantry_lookup))
             pantry_matched = []
-            for recipe_data in data:
-                ingredients = recipe_data.get("ingredients") or []
-                if not ingredients:
-                    continue
-                coverage, matched, total = calculate_pantry_coverage(
-                    ingredients, pantry_lookup
-                )
-                if total > 0 and coverage >= PANTRY_THRESHOLD:
-                    recipe_data["_pantry_coverage"] = round(coverage * 100)
+            for i, recipe_data in enumerate(data):
+                if total[i] > 0 and coverage[i] >= PANTRY_THRESHOLD:
+                    recipe_data["_pantry_coverage"] = round(coverage[i] * 100)
                     pantry_matched.append(recipe_data)
 
             # Sort by coverage descending — best matches first
@@ -273,67 +256,206 @@ class RecipeService:
                 random.shuffle(pantry_matched)
             data = pantry_matched[filters.offset:filters.offset + filters.limit]
         else:
-            # Normal mode: fetch full pool once, use date-seeded shuffle for
-            # consistent ordering across paginated requests within the same day.
-            import random
-            from datetime import date
-
-            pool_size = 500
-            query = query.order("likes_count", desc=True)
-            query = query.range(0, pool_size - 1)
-            result = query.execute()
-            data = result.data or []
-
-            # Deterministic daily shuffle so pagination stays consistent
-            daily_seed = int(date.today().strftime("%Y%m%d"))
-            rng = random.Random(daily_seed)
-
-            # Boost preferred cuisines: put them first, then mix in others
-            if filters.cuisine_preferences:
-                preferred_lower = [c.lower() for c in filters.cuisine_preferences]
-                preferred = [r for r in data if (r.get("cuisine_type") or "").lower() in preferred_lower]
-                others = [r for r in data if (r.get("cuisine_type") or "").lower() not in preferred_lower]
-                rng.shuffle(preferred)
-                rng.shuffle(others)
-                # Interleave: 2 preferred, 1 other for variety
-                data = []
-                pi, oi = 0, 0
-                while pi < len(preferred) or oi < len(others):
-                    for _ in range(2):
-                        if pi < len(preferred):
-                            data.append(preferred[pi])
-                            pi += 1
-                    if oi < len(others):
-                        data.append(others[oi])
-                        oi += 1
-            else:
-                rng.shuffle(data)
+            # Normal mode: the day's ordering is materialized once per filter
+            # signature; a page is a slice of ids hydrated in one batch.
+            from app.services.feed_service import feed_materializer
 
-            # Apply pagination to the consistently-ordered pool
-            data = data[filters.offset:filters.offset + filters.limit]
+            ordering = await feed_materializer.get_ordering(filters, day)
+            page_ids = ordering[filters.offset:filters.offset + filters.limit]
+            rows = await self._load_recipe_rows(page_ids)
+            data = [rows[rid] for rid in page_ids if rid in rows]
 
         recipes = []
         for recipe_data in data:
             recipe_response = await self._format_recipe_response(recipe_data)
             recipes.append(recipe_response)
 
-        # Batch fetch liked/saved status instead of N+1 queries
         if user_id and recipes:
-            recipe_ids = [r.id for r in recipes]
-            liked_result = self.db.table("recipe_likes").select("recipe_id").eq("user_id", user_id).in_("recipe_id", recipe_ids).execute()
-            saved_result = self.db.table("recipe_saves").select("recipe_id").eq("user_id", user_id).in_("recipe_id", recipe_ids).execute()
-            liked_ids = {r["recipe_id"] for r in liked_result.data}
-            saved_ids = {r["recipe_id"] for r in saved_result.data}
-            for recipe in recipes:
-                recipe.is_liked = recipe.id in liked_ids
-                recipe.is_saved = recipe.id in saved_ids
+            return await self.with_user_interactions(recipes, user_id)
 
         return recipes
-    
+
+    async def with_user_interactions(self, recipes: List, user_id: str) -> List[RecipeResponse]:
+        """Copies of shared feed rows with the user's is_liked/is_saved applied.
+
+        Rows may be RecipeResponse models or their dict form (shared cache);
+        the inputs are never modified, so cached pages can be passed in.
+        """
+        interactions = await self.get_user_interactions(user_id)
+        liked_ids = set(interactions["liked"])
+        saved_ids = set(interactions["saved"])
+
+        overlaid = []
+        for recipe in recipes:
+            if isinstance(recipe, dict):
+                overlaid.append(RecipeResponse(**{
+                    **recipe,
+                    "is_liked": recipe["id"] in liked_ids,
+                    "is_saved": recipe["id"] in saved_ids,
+                }))
+            else:
+                overlaid.append(recipe.model_copy(update={
+                    "is_liked": recipe.id in liked_ids,
+                    "is_saved": recipe.id in saved_ids,
+                }))
+        return overlaid
+
+    async def get_user_interactions(self, user_id: str) -> dict:
+        """Ids of every recipe the user has liked and saved: {"liked": [...], "saved": [...]}.
+
+        Cached per user; like/unlike/save/unsave drop the entry.
+        """
+        from app.services.cache_service import cache, make_cache_key, TTL_USER_PREFS
+
+        return await cache.get_or_compute(
+            make_cache_key("interactions", user_id),
+            TTL_USER_PREFS,
+            lambda: self._fetch_user_interactions(user_id),
+            stale_ttl=0,
+        )
+
+    async def _fetch_user_interactions(self, user_id: str) -> dict:
+        liked, saved = await asyncio.gather(
+            self._fetch_recipe_ids("recipe_likes", user_id),
+            self._fetch_recipe_ids("recipe_saves", user_id),
+        )
+        return {"liked": liked, "saved": saved}
+
+    async def _fetch_recipe_ids(self, table: str, user_id: str, page_size: int = 1000) -> List[str]:
+        ids: List[str] = []
+        start = 0
+        while True:
+            result = await self.db.table(table).select("recipe_id").eq(
+                "user_id", user_id
+            ).order("recipe_id").range(start, start + page_size - 1).execute()
+            page = result.data or []
+            ids.extend(r["recipe_id"] for r in page)
+            if len(page) < page_size:
+                return ids
+            start += page_size
+
+    async def _invalidate_user_interactions(self, user_id: str) -> None:
+        from app.services.cache_service import cache, make_cache_key
+
+        await cache.delete(make_cache_key("interactions", user_id))
+
+    async def _fetch_feed_pool(
+        self,
+        filters: RecipeFeedFilter,
+        pool_size: int,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        """Top `pool_size` recipes by likes matching the feed filters.
+
+        Answered from the in-process catalog when it's warm, otherwise from
+        PostgREST with the equivalent query (paged past the max-rows limit).
+        `fields` restricts the columns returned (default: full rows + creator).
+        """
+        allowed_difficulties = None
+        if filters.difficulty:
+            allowed_difficulties = [filters.difficulty.value]
+        if filters.max_difficulty:
+            # Filter to recipes at or below the max difficulty level
+            difficulty_order = {"Easy": 1, "Medium": 2, "Hard": 3}
+            max_level = difficulty_order.get(filters.max_difficulty.value, 3)
+            allowed = [d for d, level in difficulty_order.items() if level <= max_level]
+            if allowed_difficulties is not None:
+                allowed = [d for d in allowed if d in allowed_difficulties]
+            allowed_difficulties = allowed
+
+        if recipe_catalog.is_ready:
+            return recipe_catalog.query(
+                meal_type=filters.meal_type.value if filters.meal_type else None,
+                dietary_tags=filters.dietary_tags or None,
+                cuisine_types=[filters.cuisine_type] if filters.cuisine_type else None,
+                difficulties=allowed_difficulties,
+                max_prep_time=filters.max_prep_time or None,
+                search=filters.search,
+                fields=fields,
+                limit=pool_size,
+            )
+
+        # Search goes through the ranked search subsystem; ILIKE only if it's unavailable
+        ranked_ids = None
+        if filters.search:
+            ranked_ids = await recipe_search_service.search_ids(filters.search, limit=pool_size)
+
+        def build_query():
+            if fields is not None:
+                query = self.db.table("recipes").select(", ".join(fields))
+            else:
+                query = self.db.table("recipes").select("""
+                    *,
+                    users!recipes_user_id_fkey(username)
+                """)
+
+            # Apply filters
+            if filters.cuisine_type:
+                query = query.eq("cuisine_type", filters.cuisine_type)
+            if allowed_difficulties is not None:
+                query = query.in_("difficulty", allowed_difficulties)
+            if filters.max_prep_time:
+                query = query.lte("prep_time", filters.max_prep_time)
+            if filters.meal_type:
+                query = query.contains("meal_type", [filters.meal_type.value])
+            if filters.dietary_tags:
+                # Use contains (ALL tags must match) for dietary restriction filtering
+                query = query.contains("dietary_tags", filters.dietary_tags)
+            if filters.search and ranked_ids is None:
+                query = query.ilike("title", f"%{filters.search}%")
+            return query.order("likes_count", desc=True)
+
+        if ranked_ids is not None:
+            # Apply the other filters to the matches chunk by chunk, keep relevance order
+            chunks = [
+                ranked_ids[i:i + LOAD_CHUNK_SIZE]
+                for i in range(0, len(ranked_ids), LOAD_CHUNK_SIZE)
+            ]
+            results = await asyncio.gather(*(
+                build_query().in_("id", chunk).execute() for chunk in chunks
+            ))
+            by_id = {row["id"]: row for result in results for row in result.data or []}
+            return [by_id[rid] for rid in ranked_ids if rid in by_id]
+
+        rows: List[dict] = []
+        while len(rows) < pool_size:
+            page_size = min(FETCH_PAGE_SIZE, pool_size - len(rows))
+            result = await build_query().range(len(rows), len(rows) + page_size - 1).execute()
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+        return rows
+
+    async def _load_recipe_rows(self, recipe_ids: List[str]) -> Dict[str, dict]:
+        """Raw recipe rows (with creator username) by id, in one batch.
+
+        Served from the in-process catalog when it's warm; otherwise chunked
+        `in` queries run concurrently. Missing ids are omitted.
+        """
+        if not recipe_ids:
+            return {}
+        if recipe_catalog.is_ready:
+            return recipe_catalog.get_many(recipe_ids)
+
+        unique_ids = list(dict.fromkeys(recipe_ids))
+        chunks = [
+            unique_ids[i:i + LOAD_CHUNK_SIZE]
+            for i in range(0, len(unique_ids), LOAD_CHUNK_SIZE)
+        ]
+        results = await asyncio.gather(*(
+            self.db.table("recipes").select("""
+                *,
+                users!recipes_user_id_fkey(username)
+            """).in_("id", chunk).execute()
+            for chunk in chunks
+        ))
+        return {row["id"]: row for result in results for row in result.data or []}
+
     async def like_recipe(self, recipe_id: str, user_id: str) -> bool:
         """Like a recipe"""
         # Check if recipe exists
-        recipe_exists = self.db.table("recipes").select("id").eq("id", recipe_id).execute()
+        recipe_exists = await self.db.table("recipes").select("id").eq("id", recipe_id).execute()
         if not recipe_exists.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -341,7 +463,7 @@ class RecipeService:
             )
         
         # Check if already liked
-        existing_like = self.db.table("recipe_likes").select("*").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        existing_like = await self.db.table("recipe_likes").select("*").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
         if existing_like.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -350,19 +472,21 @@ class RecipeService:
         
         # Add like
         like_data = {"user_id": user_id, "recipe_id": recipe_id}
-        result = self.db.table("recipe_likes").insert(like_data).execute()
+        result = await self.db.table("recipe_likes").insert(like_data).execute()
+        await self._invalidate_user_interactions(user_id)
         
         return bool(result.data)
     
     async def unlike_recipe(self, recipe_id: str, user_id: str) -> bool:
         """Unlike a recipe"""
-        result = self.db.table("recipe_likes").delete().eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        result = await self.db.table("recipe_likes").delete().eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        await self._invalidate_user_interactions(user_id)
         return True
     
     async def save_recipe(self, recipe_id: str, user_id: str) -> bool:
         """Save a recipe"""
         # Check if recipe exists
-        recipe_exists = self.db.table("recipes").select("id").eq("id", recipe_id).execute()
+        recipe_exists = await self.db.table("recipes").select("id").eq("id", recipe_id).execute()
         if not recipe_exists.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -370,7 +494,7 @@ class RecipeService:
             )
         
         # Check if already saved
-        existing_save = self.db.table("recipe_saves").select("*").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        existing_save = await self.db.table("recipe_saves").select("*").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
         if existing_save.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -379,13 +503,15 @@ class RecipeService:
         
         # Add save
         save_data = {"user_id": user_id, "recipe_id": recipe_id}
-        result = self.db.table("recipe_saves").insert(save_data).execute()
+        result = await self.db.table("recipe_saves").insert(save_data).execute()
+        await self._invalidate_user_interactions(user_id)
         
         return bool(result.data)
     
     async def unsave_recipe(self, recipe_id: str, user_id: str) -> bool:
         """Unsave a recipe"""
-        result = self.db.table("recipe_saves").delete().eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        result = await self.db.table("recipe_saves").delete().eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        await self._invalidate_user_interactions(user_id)
         return True
     
     async def get_user_recipes(
@@ -394,53 +520,93 @@ class RecipeService:
         limit: int = 20,
         offset: int = 0,
         search: Optional[str] = None,
-        meal_type: Optional[str] = None
-    ) -> List[RecipeResponse]:
+        meal_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[RecipeResponse], Optional[str]]:
         """
         Get recipes created by a user with optional search and filtering.
 
         Args:
             user_id: The user ID to get recipes for
             limit: Maximum number of recipes to return
-            offset: Number of recipes to skip
+            offset: Number of recipes to skip (ignored when cursor is given)
             search: Search term to filter by title (case-insensitive)
             meal_type: Filter by meal type (breakfast, lunch, dinner)
-        """
-        query = self.db.table("recipes").select("""
-            *,
-            users!recipes_user_id_fkey(username)
-        """).eq("user_id", user_id)
+            cursor: Keyset cursor from a previous page
 
-        # Apply search filter (case-insensitive title search)
+        Returns:
+            (recipes, next_cursor); next_cursor is None on the last page.
+        """
+        def build_query():
+            query = self.db.table("recipes").select("""
+                *,
+                users!recipes_user_id_fkey(username)
+            """).eq("user_id", user_id)
+            if meal_type:
+                # meal_type is stored as an array, use contains to check if the array contains the value
+                query = query.contains("meal_type", [meal_type.capitalize()])
+            return query
+
+        # Apply search filter. Matches keep the created_at order (so keyset
+        # cursors stay valid); ILIKE only if search is unavailable.
+        matching_ids = None
         if search:
-            query = query.ilike("title", f"%{search}%")
-
-        # Apply meal type filter
-        if meal_type:
-            # meal_type is stored as an array, use contains to check if the array contains the value
-            query = query.contains("meal_type", [meal_type.capitalize()])
-
-        query = query.order("created_at", desc=True)
-        query = query.range(offset, offset + limit - 1)
-        result = query.execute()
+            # Every match: any of them can fall on this page in created_at order
+            matching_ids = await recipe_search_service.search_ids(
+                search, limit=None, owner_id=user_id
+            )
+            if matching_ids is not None and not matching_ids:
+                return [], None
+
+        if matching_ids is None:
+            query = build_query()
+            if search:
+                query = query.ilike("title", f"%{search}%")
+            rows = (await apply_keyset_page(query, limit, offset, cursor).execute()).data
+        else:
+            # Page each chunk of matches, then merge: the page is the first
+            # `limit` rows (after `offset` or the cursor) across all chunks
+            chunks = [
+                matching_ids[i:i + LOAD_CHUNK_SIZE]
+                for i in range(0, len(matching_ids), LOAD_CHUNK_SIZE)
+            ]
+            chunk_limit = limit if cursor else offset + limit
+            results = await asyncio.gather(*(
+                apply_keyset_page(build_query().in_("id", chunk), chunk_limit, 0, cursor).execute()
+                for chunk in chunks
+            ))
+            rows = sorted(
+                (row for result in results for row in result.data or []),
+                key=lambda row: (row["created_at"], row["id"]),
+                reverse=True,
+            )
+            start = 0 if cursor else offset
+            rows = rows[start:start + limit]
 
         recipes = []
-        for recipe_data in result.data:
+        for recipe_data in rows:
             recipe_response = await self._format_recipe_response(recipe_data)
             recipes.append(recipe_response)
 
-        return recipes
+        return recipes, next_keyset_cursor(rows, limit)
     
-    async def get_saved_recipes(self, user_id: str, limit: int = 20, offset: int = 0) -> List[RecipeResponse]:
-        """Get recipes saved by a user"""
+    async def get_saved_recipes(
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[RecipeResponse], Optional[str]]:
+        """Get recipes saved by a user, most recent first. Returns (recipes, next_cursor)."""
         query = self.db.table("recipe_saves").select("""
+            id, created_at,
             recipes!recipe_saves_recipe_id_fkey(*,
                 users!recipes_user_id_fkey(username)
             )
-        """).eq("user_id", user_id).order("created_at", desc=True)
+        """).eq("user_id", user_id)
 
-        query = query.range(offset, offset + limit - 1)
-        result = query.execute()
+        query = apply_keyset_page(query, limit, offset, cursor)
+        result = await query.execute()
 
         recipes = []
         for save_data in result.data:
@@ -449,18 +615,25 @@ class RecipeService:
             recipe_response.is_saved = True
             recipes.append(recipe_response)
 
-        return recipes
+        return recipes, next_keyset_cursor(result.data, limit)
 
-    async def get_liked_recipes(self, user_id: str, limit: int = 20, offset: int = 0) -> List[RecipeResponse]:
-        """Get recipes liked by a user"""
+    async def get_liked_recipes(
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[RecipeResponse], Optional[str]]:
+        """Get recipes liked by a user, most recent first. Returns (recipes, next_cursor)."""
         query = self.db.table("recipe_likes").select("""
+            id, created_at,
             recipes!recipe_likes_recipe_id_fkey(*,
                 users!recipes_user_id_fkey(username)
             )
-        """).eq("user_id", user_id).order("created_at", desc=True)
+        """).eq("user_id", user_id)
 
-        query = query.range(offset, offset + limit - 1)
-        result = query.execute()
+        query = apply_keyset_page(query, limit, offset, cursor)
+        result = await query.execute()
 
         recipes = []
         for like_data in result.data:
@@ -469,7 +642,7 @@ class RecipeService:
             recipe_response.is_liked = True
             recipes.append(recipe_response)
 
-        return recipes
+        return recipes, next_keyset_cursor(result.data, limit)
 
     async def _format_recipe_response(self, recipe_data: dict) -> RecipeResponse:
         """Format raw recipe data into RecipeResponse"""
@@ -510,12 +683,12 @@ class RecipeService:
     
     async def _is_recipe_liked(self, recipe_id: str, user_id: str) -> bool:
         """Check if user has liked a recipe"""
-        result = self.db.table("recipe_likes").select("id").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        result = await self.db.table("recipe_likes").select("id").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
         return bool(result.data)
     
     async def _is_recipe_saved(self, recipe_id: str, user_id: str) -> bool:
         """Check if user has saved a recipe"""
-        result = self.db.table("recipe_saves").select("id").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
+        result = await self.db.table("recipe_saves").select("id").eq("user_id", user_id).eq("recipe_id", recipe_id).execute()
         return bool(result.data)
 
 
@@ -6,13 +6,17 @@ filters out allergens/disliked ingredients, and scores/ranks results
 for meal plan generation.
 """
 
-import math
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import random
+from typing import Dict, List, Optional, Any, Tuple
 
 from app.database import get_database
+from app.services.cache_service import cache, hash_dict, make_cache_key, TTL_USER_PREFS
+from app.services.recipe_catalog_service import recipe_catalog
+from app.utils.candidate_scoring import score_candidates_batch
+from app.utils.exclusion_matching import get_exclusion_matcher
 from app.utils.ingredient_matching import (
-    calculate_pantry_coverage,
     is_trivial_ingredient,
     normalize_ingredient_name,
     prepare_pantry_lookup,
@@ -20,6 +24,20 @@ from app.utils.ingredient_matching import (
 
 logger = logging.getLogger(__name__)
 
+# Columns the scorer and the AI selection prompt need
+CANDIDATE_FIELDS = (
+    "id", "title", "description", "calories", "protein_grams", "carbs_grams", "fat_grams",
+    "cuisine_type", "difficulty", "meal_type", "dietary_tags", "ingredients",
+    "likes_count", "image_url", "is_ai_generated", "prep_time", "cook_time", "servings",
+    "ingredient_signature",
+)
+
+# Single-slot picking (fill-remaining, regenerate-meal): ranked candidates kept
+# per meal type, the fields kept for each, and how many top picks to choose from
+SLOT_POOL_SIZE = 40
+SLOT_POOL_FIELDS = ("id", "title", "cuisine_type", "_score")
+SLOT_PICK_TOP_N = 5
+
 
 class RecipeShortlistService:
     def __init__(self):
@@ -62,6 +80,11 @@ class RecipeShortlistService:
         if pantry_lookup:
             logger.info(f"Pantry-aware scoring enabled with {len(pantry_lookup)} pantry items")
 
+        # Query DB for every meal type concurrently
+        raw_by_meal_type = await self._query_all_meal_types(
+            meal_types, preferences, exclude_recipe_ids
+        )
+
         result = {}
 
         for meal_type in meal_types:
@@ -70,26 +93,7 @@ class RecipeShortlistService:
             meal_cal_target = int(calorie_target * pct)
             meal_protein_target = protein_target * pct
 
-            # Query DB with filters
-            raw_candidates = await self._query_candidates(
-                meal_type=meal_type.capitalize(),
-                preferences=preferences,
-                exclude_recipe_ids=exclude_recipe_ids,
-                limit=200,
-            )
-
-            # If too few results, retry with relaxed filters
-            if len(raw_candidates) < 5:
-                logger.warning(
-                    f"Only {len(raw_candidates)} {meal_type} candidates, relaxing filters"
-                )
-                raw_candidates = await self._query_candidates(
-                    meal_type=meal_type.capitalize(),
-                    preferences=preferences,
-                    exclude_recipe_ids=exclude_recipe_ids,
-                    limit=200,
-                    relaxed=True,
-                )
+            raw_candidates = raw_by_meal_type[meal_type]
 
             # Filter out recipes with empty ingredients (incomplete data)
             raw_candidates = [
@@ -113,6 +117,51 @@ class RecipeShortlistService:
 
         return result
 
+    async def _query_all_meal_types(
+        self,
+        meal_types: List[str],
+        preferences: dict,
+        exclude_recipe_ids: Optional[List[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch raw candidates for all meal types in parallel.
+
+        Strict queries for every meal type go out together; any meal type that
+        comes back with fewer than 5 rows is retried with relaxed filters, again
+        all at once. Worst case is two round trips instead of 2 per meal type.
+        """
+        strict_results = await asyncio.gather(*(
+            self._query_candidates(
+                meal_type=meal_type.capitalize(),
+                preferences=preferences,
+                exclude_recipe_ids=exclude_recipe_ids,
+                limit=200,
+            )
+            for meal_type in meal_types
+        ))
+        raw_by_meal_type = dict(zip(meal_types, strict_results))
+
+        # If too few results, retry with relaxed filters
+        sparse = [mt for mt in meal_types if len(raw_by_meal_type[mt]) < 5]
+        for meal_type in sparse:
+            logger.warning(
+                f"Only {len(raw_by_meal_type[meal_type])} {meal_type} candidates, relaxing filters"
+            )
+        if sparse:
+            relaxed_results = await asyncio.gather(*(
+                self._query_candidates(
+                    meal_type=meal_type.capitalize(),
+                    preferences=preferences,
+                    exclude_recipe_ids=exclude_recipe_ids,
+                    limit=200,
+                    relaxed=True,
+                )
+                for meal_type in sparse
+            ))
+            raw_by_meal_type.update(zip(sparse, relaxed_results))
+
+        return raw_by_meal_type
+
     async def _query_candidates(
         self,
         meal_type: str,
@@ -121,43 +170,61 @@ class RecipeShortlistService:
         limit: int = 200,
         relaxed: bool = False,
     ) -> List[Dict[str, Any]]:
-        """Query Supabase for recipe candidates with server-side filters."""
-        query = self.db.table("recipes").select(
-            "id, title, description, calories, protein_grams, carbs_grams, fat_grams, "
-            "cuisine_type, difficulty, meal_type, dietary_tags, ingredients, "
-            "likes_count, image_url, is_ai_generated, prep_time, cook_time, servings"
-        )
-
-        # Filter by meal type
-        query = query.contains("meal_type", [meal_type])
-
-        # Only include recipes with complete data (image + ingredients)
-        query = query.not_.is_("image_url", "null")
-
-        # Dietary restrictions (ALL must match)
+        """Query recipe candidates (in-process catalog, else Supabase)."""
         dietary_restrictions = preferences.get("dietary_restrictions", [])
-        if dietary_restrictions:
-            query = query.contains("dietary_tags", dietary_restrictions)
+        difficulties = None
+        cuisine_prefs = None
+        is_ai_generated = None
 
         if not relaxed:
             # Difficulty based on cooking skill
             cooking_skill = preferences.get("cooking_skill", "intermediate")
             if cooking_skill == "beginner":
-                query = query.eq("difficulty", "Easy")
+                difficulties = ["Easy"]
             elif cooking_skill == "intermediate":
-                query = query.in_("difficulty", ["Easy", "Medium"])
+                difficulties = ["Easy", "Medium"]
 
             # Cuisine preferences
-            cuisine_prefs = preferences.get("cuisine_preferences", [])
-            if cuisine_prefs:
-                query = query.in_("cuisine_type", cuisine_prefs)
+            cuisine_prefs = preferences.get("cuisine_preferences", []) or None
 
             # Recipe source preference
             source_pref = preferences.get("recipe_source_preference", "mixed")
             if source_pref == "vetted_only":
-                query = query.eq("is_ai_generated", False)
+                is_ai_generated = False
             elif source_pref == "ai_only":
-                query = query.eq("is_ai_generated", True)
+                is_ai_generated = True
+
+        if recipe_catalog.is_ready:
+            return recipe_catalog.query(
+                meal_type=meal_type,
+                dietary_tags=dietary_restrictions or None,
+                cuisine_types=cuisine_prefs,
+                difficulties=difficulties,
+                is_ai_generated=is_ai_generated,
+                require_image=True,
+                exclude_ids=exclude_recipe_ids,
+                fields=CANDIDATE_FIELDS,
+                limit=limit,
+            )
+
+        query = self.db.table("recipes").select(", ".join(CANDIDATE_FIELDS))
+
+        # Filter by meal type
+        query = query.contains("meal_type", [meal_type])
+
+        # Only include recipes with complete data (image + ingredients)
+        query = query.not_.is_("image_url", "null")
+
+        # Dietary restrictions (ALL must match)
+        if dietary_restrictions:
+            query = query.contains("dietary_tags", dietary_restrictions)
+
+        if difficulties is not None:
+            query = query.in_("difficulty", difficulties)
+        if cuisine_prefs:
+            query = query.in_("cuisine_type", cuisine_prefs)
+        if is_ai_generated is not None:
+            query = query.eq("is_ai_generated", is_ai_generated)
 
         # Exclude specific recipe IDs
         if exclude_recipe_ids:
@@ -168,7 +235,7 @@ class RecipeShortlistService:
         query = query.order("likes_count", desc=True)
         query = query.limit(limit)
 
-        result = query.execute()
+        result = await query.execute()
         return result.data or []
 
     def _filter_by_excluded_ingredients(
@@ -178,22 +245,10 @@ class RecipeShortlistService:
         disliked_ingredients: List[str],
     ) -> List[Dict[str, Any]]:
         """Remove recipes containing allergens or disliked ingredients."""
-        excluded = set(item.lower().strip() for item in allergies + disliked_ingredients)
-        if not excluded:
+        matcher = get_exclusion_matcher(allergies + disliked_ingredients)
+        if not matcher:
             return candidates
-
-        filtered = []
-        for recipe in candidates:
-            ingredients = recipe.get("ingredients") or []
-            # Build combined text of all ingredient names
-            ingredient_text = " ".join(
-                (ing.get("name", "") if isinstance(ing, dict) else str(ing)).lower()
-                for ing in ingredients
-            )
-            has_excluded = any(excl in ingredient_text for excl in excluded)
-            if not has_excluded:
-                filtered.append(recipe)
-        return filtered
+        return [recipe for recipe in candidates if not matcher.excludes(recipe)]
 
     def _score_candidates(
         self,
@@ -225,71 +280,28 @@ class RecipeShortlistService:
         - Shorter cook time: 0-3
         - Randomness jitter: 0-8 (prevents identical plans every time)
         """
-        import random
         from datetime import datetime
 
         # Seed with current hour so plans vary throughout the day
         rng = random.Random(int(datetime.now().strftime("%Y%m%d%H")))
 
-        for recipe in candidates:
-            score = 0.0
+        # All terms are computed as array ops over the whole pool
+        scores, coverage_arrays = score_candidates_batch(
+            candidates, target_calories, target_protein,
+            pantry_lookup, household_size, liked_recipe_ids, rng,
+        )
 
-            # === TIER 1: Pantry coverage (0-100 points) — DOMINANT ===
-            ingredients = recipe.get("ingredients") or []
-            if pantry_lookup and ingredients:
-                coverage, matched, total = calculate_pantry_coverage(
-                    ingredients, pantry_lookup
-                )
-                score += coverage * 100
-                recipe["_pantry_coverage"] = round(coverage * 100)
-                recipe["_pantry_matched"] = matched
-                recipe["_pantry_total"] = total
-
-            # === TIER 2: Nutrition targets (0-15 each) ===
-            cal = recipe.get("calories") or 0
-            if cal > 0 and target_calories > 0:
-                cal_diff_pct = abs(cal - target_calories) / target_calories
-                score += max(0, 15 * (1 - cal_diff_pct))
-
-            prot = float(recipe.get("protein_grams") or 0)
-            if prot > 0 and target_protein > 0:
-                prot_diff_pct = abs(prot - target_protein) / target_protein
-                score += max(0, 15 * (1 - prot_diff_pct))
-
-            # === TIER 3: User preferences ===
-            # Liked by user (0 or 15 points)
+        if coverage_arrays is not None:
+            coverage, matched, total = (a.tolist() for a in coverage_arrays)
+        for i, recipe in enumerate(candidates):
+            if coverage_arrays is not None and recipe.get("ingredients"):
+                recipe["_pantry_coverage"] = round(coverage[i] * 100)
+                recipe["_pantry_matched"] = matched[i]
+                recipe["_pantry_total"] = total[i]
             if liked_recipe_ids and recipe.get("id") in liked_recipe_ids:
-                score += 15
                 recipe["_liked"] = True
 
-            # Serving size match (0-10 points)
-            recipe_servings = recipe.get("servings") or 4
-            if household_size > 0:
-                serving_diff = abs(recipe_servings - household_size)
-                if serving_diff == 0:
-                    score += 10
-                elif serving_diff <= 1:
-                    score += 6
-                elif serving_diff <= 2:
-                    score += 3
-
-            # === TIER 4: Quality signals (small bonuses) ===
-            if recipe.get("image_url"):
-                score += 5
-
-            likes = recipe.get("likes_count", 0) or 0
-            score += min(5, math.log2(likes + 1))
-
-            if not recipe.get("is_ai_generated", False):
-                score += 3
-
-            total_time = (recipe.get("prep_time") or 0) + (recipe.get("cook_time") or 0)
-            if total_time > 0:
-                score += max(0, 3 * (1 - total_time / 120))
-
-            # === TIER 5: Randomness jitter (prevents identical plans) ===
-            score += rng.uniform(0, 8)
-
+        for recipe, score in zip(candidates, scores.tolist()):
             recipe["_score"] = round(score, 2)
 
         candidates.sort(key=lambda r: r.get("_score", 0), reverse=True)
@@ -307,34 +319,97 @@ class RecipeShortlistService:
 
         return candidates
 
+    async def slot_pool(
+        self,
+        preferences: dict,
+        meal_type: str,
+        pool_key: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Scored candidates for filling single slots of one meal type.
+
+        Only the fields slot picking needs are kept. With pool_key (e.g. the
+        meal plan ID) the pool is cached, so filling or regenerating several
+        slots of a plan shortlists each meal type once; plan-specific
+        exclusions are applied when picking, not baked into the pool.
+        """
+        async def compute() -> List[Dict[str, Any]]:
+            candidates = await self.shortlist_candidates(
+                preferences=preferences,
+                selected_days=[],
+                meal_types=[meal_type],
+                target_per_meal_type=SLOT_POOL_SIZE,
+            )
+            return [
+                {field: recipe.get(field) for field in SLOT_POOL_FIELDS}
+                for recipe in candidates.get(meal_type, [])
+            ]
+
+        if not pool_key:
+            return await compute()
+        key = make_cache_key("slotpool", pool_key, meal_type, hash_dict(preferences))
+        return await cache.get_or_compute(key, TTL_USER_PREFS, compute) or []
+
+    async def pick_for_slots(
+        self,
+        preferences: dict,
+        slots: List[Tuple[str, str]],
+        exclude_recipe_ids: Optional[List[str]] = None,
+        pool_key: Optional[str] = None,
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Pick a recipe for each (day, meal_type) slot (no Claude needed).
+        Used for fill-remaining and regenerate-meal.
+
+        Each meal type is shortlisted once (pools fetched concurrently), then
+        slots are assigned from the pool in order: no recipe is used twice or
+        reused from exclude_recipe_ids, and a slot avoids the cuisine of the
+        previous pick for the same meal type when the top picks allow it.
+        Recipes deleted since a cached pool was built are skipped (when the
+        catalog is loaded). Slots with no candidate left are missing from the
+        result.
+        """
+        meal_types = list(dict.fromkeys(meal_type for _, meal_type in slots))
+        pools = dict(zip(meal_types, await asyncio.gather(*(
+            self.slot_pool(preferences, meal_type, pool_key) for meal_type in meal_types
+        ))))
+        if recipe_catalog.is_ready:
+            live = recipe_catalog.get_many(r["id"] for pool in pools.values() for r in pool)
+            pools = {
+                meal_type: [r for r in pool if r["id"] in live]
+                for meal_type, pool in pools.items()
+            }
+
+        used = set(exclude_recipe_ids or [])
+        last_cuisine: Dict[str, Optional[str]] = {}
+        picks: Dict[Tuple[str, str], str] = {}
+        for day, meal_type in slots:
+            top = [r for r in pools[meal_type] if r["id"] not in used][:SLOT_PICK_TOP_N]
+            if not top:
+                continue
+            varied = [r for r in top if r.get("cuisine_type") != last_cuisine.get(meal_type)]
+            # Add some randomness to top candidates to avoid always picking the same one
+            pick = random.choice(varied or top)
+            picks[(day, meal_type)] = pick["id"]
+            used.add(pick["id"])
+            last_cuisine[meal_type] = pick.get("cuisine_type")
+        return picks
+
     async def pick_top_for_slot(
         self,
         preferences: dict,
         meal_type: str,
         exclude_recipe_ids: Optional[List[str]] = None,
+        pool_key: Optional[str] = None,
     ) -> Optional[str]:
         """
-        Pick the best single recipe for a slot (no Claude needed).
-        Used for fill-remaining and regenerate-meal.
+        Pick the best single recipe for a slot (see pick_for_slots).
         Returns recipe ID or None.
         """
-        candidates = await self.shortlist_candidates(
-            preferences=preferences,
-            selected_days=[],
-            meal_types=[meal_type],
-            exclude_recipe_ids=exclude_recipe_ids,
-            target_per_meal_type=10,
+        picks = await self.pick_for_slots(
+            preferences, [("", meal_type)], exclude_recipe_ids, pool_key
         )
-
-        slot_candidates = candidates.get(meal_type, [])
-        if not slot_candidates:
-            return None
-
-        # Add some randomness to top candidates to avoid always picking the same one
-        import random
-        top_n = min(5, len(slot_candidates))
-        pick = random.choice(slot_candidates[:top_n])
-        return pick["id"]
+        return picks.get(("", meal_type))
 
 
 # Global instance
@@ -1,19 +1,90 @@
 """
-Lightweight background task tracking for long-running operations.
+Background task queue for long-running operations (meal plan generation,
+slot filling).
 
-Uses in-memory storage. Tasks auto-expire after 1 hour.
-Frontend can poll GET /api/tasks/{task_id} for status.
+Endpoints submit a task and return its ID right away; the frontend polls
+GET /api/tasks/{task_id} for status, progress, stage and result:
+
+    task_id = await task_service.submit(
+        "meal_plan_generation", user.id, {"user_id": user.id, ...}
+    )
+    return {"task_id": task_id, "status": "pending"}
+
+Work is done by handlers registered per task type. A handler receives the
+task's JSON payload and a progress callback, and returns a JSON-serializable
+result:
+
+    async def generate(payload: dict, progress: ProgressCallback) -> dict: ...
+    task_service.register("meal_plan_generation", generate, max_concurrent=4)
+
+Storage is a pluggable TaskBackend:
+- MemoryTaskBackend: per-process dict (default, and for development). Tasks
+  are lost on restart and only visible to the process that created them.
+- SQLiteTaskBackend: a WAL-mode SQLite file shared by every worker process
+  on the host (set TASK_DB_PATH, on a volume to survive deploys).
+
+Runners (TASK_WORKER_CONCURRENCY per web process, or `python -m app.worker`
+to run tasks outside the web processes) claim a task by taking a lease and
+renew it with heartbeats while the handler runs. If a runner dies, its lease
+expires and another runner picks the task up. Failures are retried with
+exponential backoff up to the type's max_attempts; 4xx HTTPExceptions are
+treated as permanent. Claims respect a per-user cap (TASK_MAX_PER_USER) and
+each type's max_concurrent, counted across all runners sharing the backend.
+
+Finished tasks stay pollable for TASK_RETENTION_SECONDS; expiry is indexed,
+so cleanup only touches expired tasks.
+
+Instead of polling, clients can hold one SSE connection per task (GET
+/api/tasks/{task_id} with `Accept: text/event-stream`), fed by watch().
+Every status or progress change made by a runner wakes that task's watchers
+in the same process, and is broadcast over Redis pub/sub (when the cache is
+on Redis) to wake watchers on other workers. Without Redis, watchers of a
+task running in another process re-read the backend every
+WATCH_POLL_SECONDS.
 """
 
 import asyncio
-import uuid
+import heapq
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Callable, Coroutine, Optional
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Progress callback handed to handlers: (percent, stage name)
+ProgressCallback = Callable[[int, str], None]
+TaskHandler = Callable[[dict, ProgressCallback], Awaitable[Any]]
+
+# Retry backoff: RETRY_BASE_SECONDS * 2^(attempt - 1), capped, plus jitter
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+# Idle runners poll the backend this often (local submits wake them at once)
+POLL_INTERVAL_SECONDS = 1.0
+CLEANUP_INTERVAL_SECONDS = 60.0
+
+# Candidates examined per claim when caps rule out the oldest ones
+CLAIM_SCAN_LIMIT = 50
+
+# watch(): backend re-read interval when no change notification arrives, and
+# how long a quiet stream goes before a keep-alive ping
+WATCH_POLL_SECONDS = 1.0
+WATCH_PING_SECONDS = 15.0
+
+TASK_UPDATES_CHANNEL = "task-updates"
+
 
 class TaskStatus(str, Enum):
     PENDING = "pending"
@@ -22,99 +93,803 @@ class TaskStatus(str, Enum):
     FAILED = "failed"
 
 
-class TaskInfo:
-    def __init__(self, task_id: str, task_type: str, user_id: str):
-        self.task_id = task_id
-        self.task_type = task_type
-        self.user_id = user_id
-        self.status = TaskStatus.PENDING
-        self.result: Any = None
-        self.error: Optional[str] = None
-        self.created_at = datetime.utcnow()
-        self.completed_at: Optional[datetime] = None
-        self.progress: int = 0
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
 
-    def to_dict(self) -> dict:
-        return {
-            "task_id": self.task_id,
-            "task_type": self.task_type,
-            "status": self.status.value,
-            "progress": self.progress,
-            "result": self.result,
-            "error": self.error,
-            "created_at": self.created_at.isoformat(),
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-        }
 
+def task_to_dict(task: dict) -> dict:
+    """Public view of a stored task (what GET /api/tasks/{task_id} returns)."""
+    return {
+        "task_id": task["task_id"],
+        "task_type": task["task_type"],
+        "status": task["status"],
+        "progress": task["progress"],
+        "stage": task["stage"],
+        "attempts": task["attempts"],
+        "result": task["result"],
+        "error": task["error"],
+        "created_at": _iso(task["created_at"]),
+        "completed_at": _iso(task["completed_at"]),
+    }
+
+
+def _pick_claimable(
+    candidates: Iterable[dict],
+    running: Iterable[dict],
+    type_caps: Dict[str, Optional[int]],
+    max_per_user: int,
+) -> Optional[dict]:
+    """First candidate (in the given order) whose user and type are under their caps."""
+    per_user: Dict[str, int] = {}
+    per_type: Dict[str, int] = {}
+    for task in running:
+        per_user[task["user_id"]] = per_user.get(task["user_id"], 0) + 1
+        per_type[task["task_type"]] = per_type.get(task["task_type"], 0) + 1
+
+    for task in candidates:
+        cap = type_caps.get(task["task_type"])
+        if max_per_user and per_user.get(task["user_id"], 0) >= max_per_user:
+            continue
+        if cap and per_type.get(task["task_type"], 0) >= cap:
+            continue
+        return task
+    return None
+
+
+class TaskBackend:
+    """Storage interface behind TaskService.
+
+    Tasks are dicts with the columns of SQLiteTaskBackend's table; times are
+    epoch seconds. Every state change made by a runner is conditional on it
+    still holding the lease (`lease_owner`), so a runner that lost its lease
+    can't overwrite the work of the runner that took over.
+    """
+
+    name = "base"
+
+    async def create(self, task: dict) -> None:
+        raise NotImplementedError
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def list_active(self, user_id: str) -> List[dict]:
+        raise NotImplementedError
+
+    async def claim(
+        self,
+        owner: str,
+        type_caps: Dict[str, Optional[int]],
+        max_per_user: int,
+        lease_seconds: float,
+        retention_seconds: float,
+    ) -> Optional[dict]:
+        """
+        Lease the next runnable task of one of type_caps' types, or None.
+
+        Runnable: pending and due, or running under an expired lease (its
+        runner died). Expired-lease tasks that have used all their attempts
+        are failed instead.
+        """
+        raise NotImplementedError
+
+    async def heartbeat(
+        self, task_id: str, owner: str, lease_seconds: float, progress: int, stage: Optional[str]
+    ) -> bool:
+        """Extend the lease and record progress. False if the lease was lost."""
+        raise NotImplementedError
+
+    async def finish(
+        self,
+        task_id: str,
+        owner: str,
+        status: TaskStatus,
+        result: Any,
+        error: Optional[str],
+        retention_seconds: float,
+    ) -> bool:
+        raise NotImplementedError
+
+    async def retry(self, task_id: str, owner: str, error: str, run_at: float) -> bool:
+        """Return the task to pending, due at run_at."""
+        raise NotImplementedError
+
+    async def release(self, task_id: str, owner: str) -> None:
+        """Give a task back without using up an attempt (runner shutting down)."""
+        raise NotImplementedError
+
+    async def delete_expired(self, now: float) -> int:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryTaskBackend(TaskBackend):
+    """Per-process task storage."""
+
+    name = "memory"
 
-class TaskService:
     def __init__(self):
-        self._tasks: dict[str, TaskInfo] = {}
-        self._expiry = timedelta(hours=1)
-
-    def _cleanup(self):
-        """Remove expired tasks."""
-        now = datetime.utcnow()
-        expired = [
-            tid for tid, t in self._tasks.items()
-            if t.completed_at and now - t.completed_at > self._expiry
+        self._tasks: Dict[str, dict] = {}
+        # (expires_at, task_id) min-heap of finished tasks
+        self._expiry: List[Tuple[float, str]] = []
+
+    async def create(self, task: dict) -> None:
+        self._tasks[task["task_id"]] = dict(task)
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        task = self._tasks.get(task_id)
+        return dict(task) if task else None
+
+    async def list_active(self, user_id: str) -> List[dict]:
+        return [
+            dict(t) for t in self._tasks.values()
+            if t["user_id"] == user_id and t["status"] in (TaskStatus.PENDING, TaskStatus.RUNNING)
         ]
-        for tid in expired:
-            del self._tasks[tid]
 
-    def create_task(self, task_type: str, user_id: str) -> str:
-        """Create a task and return its ID."""
-        self._cleanup()
-        task_id = str(uuid.uuid4())
-        self._tasks[task_id] = TaskInfo(task_id, task_type, user_id)
-        return task_id
+    async def claim(self, owner, type_caps, max_per_user, lease_seconds, retention_seconds):
+        now = time.time()
+        running, candidates = [], []
+        for task in self._tasks.values():
+            if task["status"] == TaskStatus.RUNNING:
+                if task["lease_expires_at"] >= now:
+                    running.append(task)
+                elif task["attempts"] >= task["max_attempts"]:
+                    self._fail_abandoned(task, now, retention_seconds)
+                elif task["task_type"] in type_caps:
+                    candidates.append(task)
+            elif (
+                task["status"] == TaskStatus.PENDING
+                and task["run_at"] <= now
+                and task["task_type"] in type_caps
+            ):
+                candidates.append(task)
 
-    def get_task(self, task_id: str, user_id: Optional[str] = None) -> Optional[dict]:
-        """Get task status. Optionally verify user ownership."""
+        candidates.sort(key=lambda t: t["run_at"])
+        task = _pick_claimable(candidates, running, type_caps, max_per_user)
+        if task is None:
+            return None
+        task.update(
+            status=TaskStatus.RUNNING.value,
+            lease_owner=owner,
+            lease_expires_at=now + lease_seconds,
+            attempts=task["attempts"] + 1,
+        )
+        return dict(task)
+
+    def _fail_abandoned(self, task: dict, now: float, retention_seconds: float) -> None:
+        task.update(
+            status=TaskStatus.FAILED.value,
+            error="Task was abandoned by its worker",
+            lease_owner=None,
+            completed_at=now,
+            expires_at=now + retention_seconds,
+        )
+        heapq.heappush(self._expiry, (task["expires_at"], task["task_id"]))
+
+    def _leased(self, task_id: str, owner: str) -> Optional[dict]:
         task = self._tasks.get(task_id)
+        if task and task["status"] == TaskStatus.RUNNING and task["lease_owner"] == owner:
+            return task
+        return None
+
+    async def heartbeat(self, task_id, owner, lease_seconds, progress, stage):
+        task = self._leased(task_id, owner)
         if not task:
+            return False
+        task.update(lease_expires_at=time.time() + lease_seconds, progress=progress, stage=stage)
+        return True
+
+    async def finish(self, task_id, owner, status, result, error, retention_seconds):
+        task = self._leased(task_id, owner)
+        if not task:
+            return False
+        now = time.time()
+        task.update(
+            status=status.value,
+            result=result,
+            error=error,
+            progress=100 if status == TaskStatus.COMPLETED else task["progress"],
+            lease_owner=None,
+            completed_at=now,
+            expires_at=now + retention_seconds,
+        )
+        heapq.heappush(self._expiry, (task["expires_at"], task_id))
+        return True
+
+    async def retry(self, task_id, owner, error, run_at):
+        task = self._leased(task_id, owner)
+        if not task:
+            return False
+        task.update(status=TaskStatus.PENDING.value, error=error, run_at=run_at, lease_owner=None)
+        return True
+
+    async def release(self, task_id, owner):
+        task = self._leased(task_id, owner)
+        if task:
+            task.update(
+                status=TaskStatus.PENDING.value,
+                run_at=time.time(),
+                lease_owner=None,
+                attempts=task["attempts"] - 1,
+            )
+
+    async def delete_expired(self, now):
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, task_id = heapq.heappop(self._expiry)
+            task = self._tasks.get(task_id)
+            if task and task["expires_at"] == expires_at:
+                del self._tasks[task_id]
+                removed += 1
+        return removed
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    task_type TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    stage TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    created_at REAL NOT NULL,
+    completed_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_pending ON tasks (run_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_tasks_running ON tasks (lease_expires_at) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks (user_id, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_expires ON tasks (expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+_JSON_COLUMNS = ("payload", "result")
+
+
+class SQLiteTaskBackend(TaskBackend):
+    """
+    Tasks in a SQLite database file, shared by all processes on the host.
+
+    WAL mode lets pollers read while a runner writes; claims run in a
+    BEGIN IMMEDIATE transaction, so two processes can't lease the same task.
+    Calls run in a thread to keep the event loop free.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SQLITE_SCHEMA)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._locked, fn, *args)
+
+    def _locked(self, fn, *args):
+        with self._lock:
+            return fn(*args)
+
+    def _write(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[dict]:
+        if row is None:
             return None
-        if user_id and task.user_id != user_id:
+        task = dict(row)
+        for column in _JSON_COLUMNS:
+            if task[column] is not None:
+                task[column] = json.loads(task[column])
+        return task
+
+    async def create(self, task: dict) -> None:
+        row = dict(task)
+        for column in _JSON_COLUMNS:
+            row[column] = json.dumps(row[column], default=str) if row[column] is not None else None
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        await asyncio.to_thread(
+            self._write, f"INSERT INTO tasks ({columns}) VALUES ({placeholders})", tuple(row.values())
+        )
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        row = await self._run(
+            lambda: self._conn.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        )
+        return self._row(row)
+
+    async def list_active(self, user_id: str) -> List[dict]:
+        rows = await self._run(lambda: self._conn.execute(
+            "SELECT * FROM tasks WHERE user_id = ? AND status IN ('pending', 'running') ORDER BY created_at",
+            (user_id,),
+        ).fetchall())
+        return [self._row(row) for row in rows]
+
+    async def claim(self, owner, type_caps, max_per_user, lease_seconds, retention_seconds):
+        if not type_caps:
             return None
-        return task.to_dict()
+        row = await self._run(self._claim, owner, type_caps, max_per_user, lease_seconds, retention_seconds)
+        return self._row(row)
+
+    def _claim(self, owner, type_caps, max_per_user, lease_seconds, retention_seconds):
+        now = time.time()
+        types = list(type_caps)
+        type_filter = ", ".join("?" for _ in types)
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """UPDATE tasks SET status = 'failed', error = 'Task was abandoned by its worker',
+                       lease_owner = NULL, completed_at = ?, expires_at = ?
+                   WHERE status = 'running' AND lease_expires_at < ? AND attempts >= max_attempts""",
+                (now, now + retention_seconds, now),
+            )
+            running = conn.execute(
+                "SELECT user_id, task_type FROM tasks WHERE status = 'running' AND lease_expires_at >= ?",
+                (now,),
+            ).fetchall()
+            candidates = conn.execute(
+                f"""SELECT task_id, user_id, task_type, run_at FROM tasks
+                    WHERE status = 'pending' AND run_at <= ? AND task_type IN ({type_filter})
+                    ORDER BY run_at LIMIT ?""",
+                (now, *types, CLAIM_SCAN_LIMIT),
+            ).fetchall()
+            candidates += conn.execute(
+                f"""SELECT task_id, user_id, task_type, lease_expires_at AS run_at FROM tasks
+                    WHERE status = 'running' AND lease_expires_at < ? AND task_type IN ({type_filter})
+                    ORDER BY lease_expires_at LIMIT ?""",
+                (now, *types, CLAIM_SCAN_LIMIT),
+            ).fetchall()
+            candidates.sort(key=lambda r: r["run_at"])
+
+            picked = _pick_claimable(
+                (dict(r) for r in candidates), (dict(r) for r in running), type_caps, max_per_user
+            )
+            row = None
+            if picked:
+                conn.execute(
+                    """UPDATE tasks SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                           attempts = attempts + 1
+                       WHERE task_id = ?""",
+                    (owner, now + lease_seconds, picked["task_id"]),
+                )
+                row = conn.execute("SELECT * FROM tasks WHERE task_id = ?", (picked["task_id"],)).fetchone()
+            conn.execute("COMMIT")
+            return row
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def heartbeat(self, task_id, owner, lease_seconds, progress, stage):
+        updated = await asyncio.to_thread(
+            self._write,
+            """UPDATE tasks SET lease_expires_at = ?, progress = ?, stage = ?
+               WHERE task_id = ? AND status = 'running' AND lease_owner = ?""",
+            (time.time() + lease_seconds, progress, stage, task_id, owner),
+        )
+        return updated == 1
+
+    async def finish(self, task_id, owner, status, result, error, retention_seconds):
+        now = time.time()
+        updated = await asyncio.to_thread(
+            self._write,
+            """UPDATE tasks SET status = ?, result = ?, error = ?, lease_owner = NULL,
+                   progress = CASE WHEN ? = 'completed' THEN 100 ELSE progress END,
+                   completed_at = ?, expires_at = ?
+               WHERE task_id = ? AND status = 'running' AND lease_owner = ?""",
+            (
+                status.value,
+                json.dumps(result, default=str) if result is not None else None,
+                error,
+                status.value,
+                now,
+                now + retention_seconds,
+                task_id,
+                owner,
+            ),
+        )
+        return updated == 1
+
+    async def retry(self, task_id, owner, error, run_at):
+        updated = await asyncio.to_thread(
+            self._write,
+            """UPDATE tasks SET status = 'pending', error = ?, run_at = ?, lease_owner = NULL
+               WHERE task_id = ? AND status = 'running' AND lease_owner = ?""",
+            (error, run_at, task_id, owner),
+        )
+        return updated == 1
+
+    async def release(self, task_id, owner):
+        await asyncio.to_thread(
+            self._write,
+            """UPDATE tasks SET status = 'pending', run_at = ?, lease_owner = NULL, attempts = attempts - 1
+               WHERE task_id = ? AND status = 'running' AND lease_owner = ?""",
+            (time.time(), task_id, owner),
+        )
+
+    async def delete_expired(self, now):
+        return await asyncio.to_thread(
+            self._write, "DELETE FROM tasks WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
+
+
+@dataclass
+class _TaskType:
+    handler: TaskHandler
+    max_concurrent: Optional[int]
+    max_attempts: int
+    timeout: float
+
+
+class TaskService:
+    """Task API used by the app. Delegates storage to a TaskBackend."""
 
-    async def run_task(
+    def __init__(
         self,
-        task_id: str,
-        coro: Coroutine,
+        backend: Optional[TaskBackend] = None,
+        max_per_user: int = 2,
+        lease_seconds: float = 30.0,
+        retention_seconds: float = 3600.0,
+    ):
+        self.backend = backend or MemoryTaskBackend()
+        self.max_per_user = max_per_user
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._types: Dict[str, _TaskType] = {}
+        self._owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._runners: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._watchers: Dict[str, Set[asyncio.Event]] = {}
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.leases_lost = 0
+
+    def register(
+        self,
+        task_type: str,
+        handler: TaskHandler,
+        max_concurrent: Optional[int] = None,
+        max_attempts: int = 3,
+        timeout: float = 300.0,
     ) -> None:
-        """Run an async task in the background and track its status."""
-        task = self._tasks.get(task_id)
+        """
+        Register the handler for a task type.
+
+        max_concurrent caps running tasks of this type across all runners;
+        timeout bounds a single attempt.
+        """
+        self._types[task_type] = _TaskType(handler, max_concurrent, max_attempts, timeout)
+
+    # --- API used by endpoints ---
+
+    async def submit(self, task_type: str, user_id: str, payload: dict) -> str:
+        """Queue a task and return its ID."""
+        task_def = self._types[task_type]
+        now = time.time()
+        task_id = str(uuid.uuid4())
+        await self.backend.create({
+            "task_id": task_id,
+            "task_type": task_type,
+            "user_id": user_id,
+            "payload": payload,
+            "status": TaskStatus.PENDING.value,
+            "progress": 0,
+            "stage": None,
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "max_attempts": task_def.max_attempts,
+            "run_at": now,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "created_at": now,
+            "completed_at": None,
+            "expires_at": None,
+        })
+        self.submitted += 1
+        if self._wakeup:
+            self._wakeup.set()
+        return task_id
+
+    async def get_task(self, task_id: str, user_id: Optional[str] = None) -> Optional[dict]:
+        """Get task status. Optionally verify user ownership."""
+        task = await self.backend.get(task_id)
         if not task:
+            return None
+        if user_id and task["user_id"] != user_id:
+            return None
+        return task_to_dict(task)
+
+    async def get_user_tasks(self, user_id: str) -> List[dict]:
+        """Get all pending and running tasks for a user."""
+        return [task_to_dict(t) for t in await self.backend.list_active(user_id)]
+
+    async def watch(self, task_id: str, user_id: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Yield ("task", snapshot) whenever the task changes, ending with
+        ("done", snapshot) once it completes or fails. ("ping", {}) is sent
+        after WATCH_PING_SECONDS without changes so proxies keep the stream open.
+        Ends without "done" if the task disappears (expired).
+        """
+        wake = asyncio.Event()
+        self._watchers.setdefault(task_id, set()).add(wake)
+        try:
+            last: Optional[dict] = None
+            last_sent = time.monotonic()
+            while True:
+                task = await self.get_task(task_id, user_id)
+                if task is None:
+                    return
+                if task["status"] in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                    yield "done", task
+                    return
+                if task != last:
+                    yield "task", task
+                    last = task
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= WATCH_PING_SECONDS:
+                    yield "ping", {}
+                    last_sent = time.monotonic()
+
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=WATCH_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                wake.clear()
+        finally:
+            watchers = self._watchers.get(task_id)
+            if watchers is not None:
+                watchers.discard(wake)
+                if not watchers:
+                    del self._watchers[task_id]
+
+    def _wake_watchers(self, task_id: str) -> None:
+        for wake in self._watchers.get(task_id, ()):
+            wake.set()
+
+    async def _notify(self, task_id: str) -> None:
+        """A runner here changed task_id: wake its watchers here and on other workers."""
+        self._wake_watchers(task_id)
+        pubsub = _pubsub_backend()
+        if pubsub is None:
             return
+        try:
+            await pubsub.publish(TASK_UPDATES_CHANNEL, {"task_id": task_id, "origin": self._origin})
+        except Exception as e:
+            logger.debug(f"Task update broadcast failed: {e}")
+
+    async def _listen(self, pubsub) -> None:
+        """Wake local watchers for changes made on other workers; reconnect on failure."""
+        while True:
+            try:
+                async for message in pubsub.subscribe(TASK_UPDATES_CHANNEL):
+                    if message.get("origin") != self._origin:
+                        self._wake_watchers(message.get("task_id"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task update listener disconnected: {e}")
+            await asyncio.sleep(1)
+
+    # --- Runners ---
+
+    async def start(self, concurrency: int) -> None:
+        """Start `concurrency` runners in this process, plus expired-task cleanup."""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._runners.append(asyncio.create_task(self._cleanup_loop()))
+        for n in range(concurrency):
+            self._runners.append(asyncio.create_task(self._run_loop(f"{self._owner_prefix}:{n}")))
+        pubsub = _pubsub_backend()
+        if pubsub is not None:
+            self._listener = asyncio.create_task(self._listen(pubsub))
+        logger.info(f"Task runners: {concurrency} on {self.backend.name} backend")
+
+    async def stop(self) -> None:
+        """Stop runners; tasks in progress are released for another runner to pick up."""
+        self._stopping = True
+        tasks = self._runners + ([self._listener] if self._listener else [])
+        for runner in tasks:
+            runner.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runners = []
+        self._listener = None
+        await self.backend.close()
 
-        task.status = TaskStatus.RUNNING
+    async def _run_loop(self, owner: str) -> None:
+        type_caps = {name: t.max_concurrent for name, t in self._types.items()}
+        while not self._stopping:
+            try:
+                task = await self.backend.claim(
+                    owner, type_caps, self.max_per_user, self.lease_seconds, self.retention_seconds
+                )
+            except Exception as e:
+                logger.error(f"Task claim failed: {e}")
+                task = None
+
+            if task is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            try:
+                await self._execute(task, owner)
+            except Exception as e:
+                # Backend error while recording the outcome; the lease expires and the task is retried
+                logger.error(f"Task {task['task_id']} could not be recorded: {e}")
+
+    async def _cleanup_loop(self) -> None:
+        while not self._stopping:
+            try:
+                removed = await self.backend.delete_expired(time.time())
+                if removed:
+                    logger.debug(f"Removed {removed} expired tasks")
+            except Exception as e:
+                logger.warning(f"Task cleanup failed: {e}")
+            await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+
+    async def _execute(self, task: dict, owner: str) -> None:
+        task_id = task["task_id"]
+        task_def = self._types[task["task_type"]]
+        state = {"progress": task["progress"], "stage": task["stage"]}
+        changed = asyncio.Event()
+        await self._notify(task_id)
+
+        def progress(percent: int, stage: str) -> None:
+            state["progress"] = min(100, max(0, percent))
+            state["stage"] = stage
+            changed.set()
+
+        work = asyncio.create_task(
+            asyncio.wait_for(task_def.handler(task["payload"], progress), timeout=task_def.timeout)
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(task_id, owner, state, changed, work))
         try:
-            result = await coro
-            task.result = result
-            task.status = TaskStatus.COMPLETED
-            task.progress = 100
+            result = await work
+        except asyncio.CancelledError:
+            if heartbeat.done() and heartbeat.result() is False:
+                # Lease lost (e.g. this worker stalled); the new holder owns the task
+                self.leases_lost += 1
+                logger.warning(f"Task {task_id} lease lost, abandoning this attempt")
+                return
+            # Shutting down
+            await asyncio.shield(self.backend.release(task_id, owner))
+            await asyncio.shield(self._notify(task_id))
+            raise
         except Exception as e:
-            logger.error(f"Task {task_id} failed: {e}")
-            task.error = str(e)
-            task.status = TaskStatus.FAILED
+            await self._handle_failure(task, owner, e)
+            return
         finally:
-            task.completed_at = datetime.utcnow()
+            heartbeat.cancel()
 
-    def update_progress(self, task_id: str, progress: int) -> None:
-        """Update task progress (0-100)."""
-        task = self._tasks.get(task_id)
-        if task:
-            task.progress = min(100, max(0, progress))
+        try:
+            await self.backend.finish(
+                task_id, owner, TaskStatus.COMPLETED, result, None, self.retention_seconds
+            )
+            self.completed += 1
+            await self._notify(task_id)
+        except Exception as e:
+            # e.g. result not serializable: fail rather than leave the lease to expire
+            await self._handle_failure(task, owner, e, retry=False)
 
-    def get_user_tasks(self, user_id: str) -> list[dict]:
-        """Get all active tasks for a user."""
-        self._cleanup()
-        return [
-            t.to_dict() for t in self._tasks.values()
-            if t.user_id == user_id and t.status in (TaskStatus.PENDING, TaskStatus.RUNNING)
-        ]
+    async def _heartbeat(
+        self, task_id: str, owner: str, state: dict, changed: asyncio.Event, work: asyncio.Task
+    ) -> bool:
+        """Renew the lease every lease/3 seconds, or sooner to publish progress."""
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=self.lease_seconds / 3)
+                progressed = True
+            except asyncio.TimeoutError:
+                progressed = False
+            changed.clear()
+            try:
+                held = await self.backend.heartbeat(
+                    task_id, owner, self.lease_seconds, state["progress"], state["stage"]
+                )
+            except Exception as e:
+                logger.warning(f"Task {task_id} heartbeat failed: {e}")
+                continue
+            if not held:
+                work.cancel()
+                return False
+            if progressed:
+                await self._notify(task_id)
+
+    async def _handle_failure(self, task: dict, owner: str, error: Exception, retry: bool = True) -> None:
+        task_id = task["task_id"]
+        # HTTPExceptions raised by shared endpoint code carry their message in detail
+        message = str(getattr(error, "detail", None) or error) or type(error).__name__
+        status_code = getattr(error, "status_code", None)
+        permanent = not retry or (status_code is not None and status_code < 500)
+
+        if not permanent and task["attempts"] < task["max_attempts"]:
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (task["attempts"] - 1))
+            delay += random.uniform(0, RETRY_BASE_SECONDS)
+            logger.warning(
+                f"Task {task_id} attempt {task['attempts']}/{task['max_attempts']} failed, "
+                f"retrying in {delay:.0f}s: {message}"
+            )
+            await self.backend.retry(task_id, owner, message, time.time() + delay)
+            self.retried += 1
+            await self._notify(task_id)
+            return
+
+        logger.error(f"Task {task_id} failed: {message}")
+        await self.backend.finish(
+            task_id, owner, TaskStatus.FAILED, None, message, self.retention_seconds
+        )
+        self.failed += 1
+        await self._notify(task_id)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "runners": max(0, len(self._runners) - 1),
+            "task_types": sorted(self._types),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "leases_lost": self.leases_lost,
+            "watched_tasks": len(self._watchers),
+            "watchers": sum(len(w) for w in self._watchers.values()),
+        }
+
+
+def _pubsub_backend():
+    """The cache's Redis backend, used to broadcast task updates between workers."""
+    from app.services.cache_service import cache, RedisCacheBackend
+
+    backend = getattr(cache.backend, "shared", cache.backend)
+    return backend if isinstance(backend, RedisCacheBackend) else None
+
+
+def _create_backend() -> TaskBackend:
+    if settings.task_db_path:
+        try:
+            backend = SQLiteTaskBackend(settings.task_db_path)
+            logger.info(f"Tasks: using SQLite backend at {settings.task_db_path}")
+            return backend
+        except Exception as e:
+            logger.warning(f"Failed to open task database, falling back to memory: {e}")
+    return MemoryTaskBackend()
 
 
 # Global instance
-task_service = TaskService()
+task_service = TaskService(
+    _create_backend(),
+    max_per_user=settings.task_max_per_user,
+    lease_seconds=settings.task_lease_seconds,
+    retention_seconds=settings.task_retention_seconds,
+)
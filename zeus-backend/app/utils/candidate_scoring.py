@@ -0,0 +1,156 @@
+"""
+Vectorized recipe candidate scoring.
+
+Used by:
+- recipe_shortlist_service (meal plan candidate ranking)
+- recipe_service (pantry-mode feed filtering)
+
+Candidates are turned into column arrays once, then every scoring term is a
+NumPy array operation over the whole pool. Pantry coverage is a sparse
+recipe x ingredient-id matrix (CSR: one row of interned signature-name ids
+per recipe) reduced against a pantry bit vector, where each distinct name is
+matched against the pantry once per pool instead of once per occurrence.
+
+Terms are computed with the same float operations, added in the same order
+as the original per-recipe loop, so scores are bit-for-bit identical
+(including the seeded jitter, which is drawn from the caller's
+random.Random in candidate order).
+"""
+
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.ingredient_matching import PantryIndex, recipe_signature_names
+
+# min(5, log2(likes + 1)) for likes 0..31; log2(32) == 5, so the table is
+# exact for any likes count once clipped, and uses math.log2 like the
+# original scorer (np.log2 can differ in the last bit).
+_LIKES_BONUS = np.array([min(5, math.log2(likes + 1)) for likes in range(32)])
+
+
+def pantry_coverage_batch(
+    recipes: List[Dict[str, Any]],
+    pantry_lookup: Dict[str, dict],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    calculate_recipe_pantry_coverage for a whole pool.
+
+    Returns (coverage_ratio, matched_count, total_non_trivial_count) arrays,
+    one entry per recipe. Coverage is 0.0 where total is 0.
+    """
+    if not isinstance(pantry_lookup, PantryIndex):
+        pantry_lookup = PantryIndex(pantry_lookup)
+
+    n = len(recipes)
+    vocab: Dict[str, int] = {}
+    indices: List[int] = []
+    totals = np.zeros(n, dtype=np.int64)
+    for i, recipe in enumerate(recipes):
+        names = recipe_signature_names(recipe)
+        totals[i] = len(names)
+        indices.extend(vocab.setdefault(name, len(vocab)) for name in names)
+
+    pantry_bits = np.fromiter(
+        (pantry_lookup.match(name)[1] != "none" for name in vocab),
+        dtype=bool,
+        count=len(vocab),
+    )
+    rows = np.repeat(np.arange(n), totals)
+    hits = pantry_bits[np.asarray(indices, dtype=np.intp)]
+    matched = np.bincount(rows, weights=hits, minlength=n).astype(np.int64)
+
+    coverage = np.zeros(n)
+    np.divide(matched, totals, out=coverage, where=totals > 0)
+    return coverage, matched, totals
+
+
+def score_candidates_batch(
+    candidates: List[Dict[str, Any]],
+    target_calories: int,
+    target_protein: float,
+    pantry_lookup: Optional[Dict[str, dict]],
+    household_size: int,
+    liked_recipe_ids: Optional[set],
+    rng: random.Random,
+) -> Tuple[np.ndarray, Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """
+    Raw (unrounded) scores for every candidate, in input order.
+
+    Same terms as RecipeShortlistService._score_candidates documents. Also
+    returns the pantry coverage arrays when pantry scoring applied, so the
+    caller can annotate candidates.
+    """
+    n = len(candidates)
+    score = np.zeros(n)
+    if n == 0:
+        return score, None
+
+    # === TIER 1: Pantry coverage (0-100 points) — DOMINANT ===
+    coverage_arrays = None
+    if pantry_lookup:
+        has_ingredients = np.fromiter(
+            (bool(r.get("ingredients")) for r in candidates), dtype=bool, count=n
+        )
+        coverage_arrays = pantry_coverage_batch(candidates, pantry_lookup)
+        score += np.where(has_ingredients, coverage_arrays[0] * 100, 0.0)
+
+    # === TIER 2: Nutrition targets (0-15 each) ===
+    cal = np.fromiter((r.get("calories") or 0 for r in candidates), dtype=float, count=n)
+    if target_calories > 0:
+        cal_term = np.maximum(0, 15 * (1 - np.abs(cal - target_calories) / target_calories))
+        score += np.where(cal > 0, cal_term, 0.0)
+
+    prot = np.fromiter(
+        (float(r.get("protein_grams") or 0) for r in candidates), dtype=float, count=n
+    )
+    if target_protein > 0:
+        prot_term = np.maximum(0, 15 * (1 - np.abs(prot - target_protein) / target_protein))
+        score += np.where(prot > 0, prot_term, 0.0)
+
+    # === TIER 3: User preferences ===
+    if liked_recipe_ids:
+        liked = np.fromiter(
+            (r.get("id") in liked_recipe_ids for r in candidates), dtype=bool, count=n
+        )
+        score += np.where(liked, 15.0, 0.0)
+
+    if household_size > 0:
+        servings = np.fromiter(
+            (r.get("servings") or 4 for r in candidates), dtype=np.int64, count=n
+        )
+        serving_diff = np.abs(servings - household_size)
+        score += np.select(
+            [serving_diff == 0, serving_diff <= 1, serving_diff <= 2],
+            [10.0, 6.0, 3.0],
+            default=0.0,
+        )
+
+    # === TIER 4: Quality signals (small bonuses) ===
+    has_image = np.fromiter((bool(r.get("image_url")) for r in candidates), dtype=bool, count=n)
+    score += np.where(has_image, 5.0, 0.0)
+
+    likes = np.fromiter(
+        (r.get("likes_count", 0) or 0 for r in candidates), dtype=np.int64, count=n
+    )
+    score += _LIKES_BONUS[np.clip(likes, 0, len(_LIKES_BONUS) - 1)]
+
+    not_ai = np.fromiter(
+        (not r.get("is_ai_generated", False) for r in candidates), dtype=bool, count=n
+    )
+    score += np.where(not_ai, 3.0, 0.0)
+
+    total_time = np.fromiter(
+        ((r.get("prep_time") or 0) + (r.get("cook_time") or 0) for r in candidates),
+        dtype=float,
+        count=n,
+    )
+    time_term = np.maximum(0, 3 * (1 - total_time / 120))
+    score += np.where(total_time > 0, time_term, 0.0)
+
+    # === TIER 5: Randomness jitter (prevents identical plans) ===
+    score += np.fromiter((rng.uniform(0, 8) for _ in range(n)), dtype=float, count=n)
+
+    return score, coverage_arrays
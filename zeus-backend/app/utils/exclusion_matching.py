@@ -0,0 +1,188 @@
+"""
+Allergen / disliked-ingredient / dietary-restriction exclusion matching.
+
+Used by:
+- recipe_shortlist_service (allergies + disliked ingredients)
+- nutrition_service (FORBIDDEN_INGREDIENTS compliance checks)
+
+Semantics are the original substring rule: a term excludes a recipe when it
+appears anywhere in the recipe's lowercased ingredient names joined by
+spaces. Two things make that cheap:
+
+- Every term in EXCLUSION_VOCABULARY (known allergens plus every
+  FORBIDDEN_INGREDIENTS entry) has a bit. Each recipe's ingredient signature
+  stores the OR of the bits whose term occurs in its ingredient text, so for
+  vocabulary terms exclusion is one AND per recipe.
+- Terms outside the vocabulary are compiled into an Aho-Corasick automaton
+  that scans the ingredient text once for all of them.
+
+Matchers are cached per exclusion set, so a user's preferences compile once.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.data.dietary_restrictions import FORBIDDEN_INGREDIENTS
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher (one pass over the text for all terms)."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = list(dict.fromkeys(terms))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[int]] = [set()]
+
+        for index, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                state = nxt
+            self._out[state].add(index)
+
+        # Breadth-first failure links; outputs inherit their fallback's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def _step(self, state: int, ch: str) -> int:
+        while state and ch not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(ch, 0)
+
+    def search(self, text: str) -> bool:
+        """True if any term occurs in text."""
+        if self._out[0]:
+            return True
+        state = 0
+        for ch in text:
+            state = self._step(state, ch)
+            if self._out[state]:
+                return True
+        return False
+
+    def find_all(self, text: str) -> Set[str]:
+        """Every term that occurs in text."""
+        found = set(self._out[0])
+        state = 0
+        for ch in text:
+            state = self._step(state, ch)
+            if self._out[state]:
+                found |= self._out[state]
+        return {self.terms[i] for i in found}
+
+
+# ============================================================================
+# Per-recipe exclusion bitmasks
+# ============================================================================
+
+# Common allergens/dislikes on top of the dietary restriction lists. Bit
+# positions follow vocabulary order and are stored on recipes, so bump
+# INGREDIENT_SIGNATURE_VERSION (ingredient_matching) whenever this list or
+# FORBIDDEN_INGREDIENTS changes.
+_COMMON_EXCLUSIONS = [
+    "peanut", "tree nut", "nut", "almond", "cashew", "walnut", "pecan", "pistachio",
+    "hazelnut", "egg", "milk", "dairy", "cheese", "butter", "cream", "yogurt",
+    "wheat", "gluten", "soy", "sesame", "fish", "shellfish", "shrimp", "crab",
+    "lobster", "clam", "mussel", "oyster", "scallop", "squid", "mushroom",
+    "onion", "garlic", "cilantro", "olive", "coconut", "tomato", "pepper",
+    "pork", "beef", "chicken", "lamb", "mustard", "celery", "sulfite", "corn",
+]
+
+EXCLUSION_VOCABULARY: List[str] = list(dict.fromkeys(
+    _COMMON_EXCLUSIONS
+    + [term.lower() for terms in FORBIDDEN_INGREDIENTS.values() for term in terms]
+))
+EXCLUSION_BITS: Dict[str, int] = {term: 1 << i for i, term in enumerate(EXCLUSION_VOCABULARY)}
+
+_VOCABULARY_AUTOMATON = AhoCorasick(EXCLUSION_VOCABULARY)
+
+
+def ingredient_text(recipe_ingredients: Optional[List]) -> str:
+    """Lowercased ingredient names joined by spaces (what exclusion terms are matched against)."""
+    return " ".join(
+        (ing.get("name", "") if isinstance(ing, dict) else str(ing)).lower()
+        for ing in recipe_ingredients or []
+    )
+
+
+def build_exclusion_mask(recipe_ingredients: Optional[List]) -> int:
+    """OR of EXCLUSION_BITS for every vocabulary term in the ingredient text."""
+    mask = 0
+    for term in _VOCABULARY_AUTOMATON.find_all(ingredient_text(recipe_ingredients)):
+        mask |= EXCLUSION_BITS[term]
+    return mask
+
+
+class ExclusionMatcher:
+    """Compiled exclusion set: a vocabulary bitmask plus an automaton for the rest."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = frozenset(terms)
+        self.mask = 0
+        residual = []
+        for term in sorted(self.terms):
+            bit = EXCLUSION_BITS.get(term)
+            if bit is None:
+                residual.append(term)
+            else:
+                self.mask |= bit
+        self._residual = AhoCorasick(residual) if residual else None
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def excludes(self, recipe: dict) -> bool:
+        """True if any exclusion term appears in the recipe's ingredients."""
+        if self.mask and self.mask & recipe_exclusion_mask(recipe):
+            return True
+        if self._residual is not None:
+            return self._residual.search(ingredient_text(recipe.get("ingredients")))
+        return False
+
+
+def recipe_exclusion_mask(recipe: dict) -> int:
+    """Exclusion bitmask for a recipe row; from its signature when current."""
+    # Imported here: ingredient_matching builds signatures with build_exclusion_mask
+    from app.utils.ingredient_matching import INGREDIENT_SIGNATURE_VERSION
+
+    signature = recipe.get("ingredient_signature")
+    if (
+        isinstance(signature, dict)
+        and signature.get("version") == INGREDIENT_SIGNATURE_VERSION
+        and "exclusion_mask" in signature
+    ):
+        return signature["exclusion_mask"]
+    return build_exclusion_mask(recipe.get("ingredients"))
+
+
+@lru_cache(maxsize=1024)
+def _cached_matcher(terms: frozenset) -> ExclusionMatcher:
+    return ExclusionMatcher(terms)
+
+
+def get_exclusion_matcher(terms: Iterable[str]) -> ExclusionMatcher:
+    """Matcher for a user's exclusion terms (lowercased + trimmed), cached per set."""
+    return _cached_matcher(frozenset(term.lower().strip() for term in terms))
+
+
+@lru_cache(maxsize=None)
+def forbidden_automaton(restriction: str) -> AhoCorasick:
+    """Automaton over FORBIDDEN_INGREDIENTS[restriction] (lowercased)."""
+    return AhoCorasick(item.lower() for item in FORBIDDEN_INGREDIENTS.get(restriction, []))
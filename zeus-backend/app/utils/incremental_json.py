@@ -0,0 +1,137 @@
+"""
+Incremental parser for a JSON object arriving in chunks.
+
+Used by:
+- ai_service (streamed recipe generation)
+- api/ai.py (streamed cook-tonight suggestion)
+
+Claude's structured responses are a single JSON object, possibly wrapped in
+prose or a ```json fence. Streaming endpoints want each top-level field as
+soon as its value is complete ("recipe_title" long before
+"quick_instructions"), without re-parsing the whole buffer on every token:
+
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        for key, value in parser.feed(chunk):
+            ...
+
+Each character is scanned once. Text before the first '{' is skipped. A
+value that fails to parse is dropped; callers still run the full-text parser
+on the complete response, so a malformed field only loses its early event.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+# Scanner states
+_BEFORE_OBJECT = 0   # looking for the opening '{'
+_BEFORE_KEY = 1      # inside the object, expecting a key or '}'
+_IN_KEY = 2          # inside a key string
+_BEFORE_VALUE = 3    # after the key, expecting ':' then a value
+_IN_VALUE = 4        # inside a value (any type, any depth)
+_DONE = 5            # top-level object closed
+
+
+class IncrementalJSONParser:
+    """Emits (key, value) for each top-level field of a streamed JSON object."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._state = _BEFORE_OBJECT
+        self._key_start = 0
+        self._key: Optional[str] = None
+        self._value_start = 0
+        self._depth = 0            # nesting inside the current value
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level object has closed."""
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add text; return the fields completed by it, in order."""
+        self._buffer += chunk
+        completed: List[Tuple[str, Any]] = []
+        buffer = self._buffer
+
+        while self._pos < len(buffer) and self._state != _DONE:
+            ch = buffer[self._pos]
+            state = self._state
+
+            if state == _BEFORE_OBJECT:
+                if ch == "{":
+                    self._state = _BEFORE_KEY
+
+            elif state == _BEFORE_KEY:
+                if ch == '"':
+                    self._state = _IN_KEY
+                    self._key_start = self._pos
+                elif ch == "}":
+                    self._state = _DONE
+
+            elif state == _IN_KEY:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._key = self._loads(buffer[self._key_start:self._pos + 1])
+                    self._state = _BEFORE_VALUE
+
+            elif state == _BEFORE_VALUE:
+                if ch != ":" and not ch.isspace():
+                    self._state = _IN_VALUE
+                    self._value_start = self._pos
+                    self._depth = 0
+                    continue  # rescan this character as the start of the value
+
+            else:  # _IN_VALUE
+                if self._in_string:
+                    if self._escaped:
+                        self._escaped = False
+                    elif ch == "\\":
+                        self._escaped = True
+                    elif ch == '"':
+                        self._in_string = False
+                        if self._depth == 0:
+                            self._complete(buffer, self._pos + 1, completed)
+                elif ch == '"':
+                    self._in_string = True
+                elif ch in "{[":
+                    self._depth += 1
+                elif ch in "}]":
+                    if self._depth == 0:
+                        # Closing brace of the top-level object ends a scalar value
+                        self._complete(buffer, self._pos, completed)
+                        self._state = _DONE
+                    else:
+                        self._depth -= 1
+                        if self._depth == 0:
+                            self._complete(buffer, self._pos + 1, completed)
+                elif ch == "," and self._depth == 0:
+                    self._complete(buffer, self._pos, completed)
+
+            self._pos += 1
+
+        return completed
+
+    def _complete(self, buffer: str, end: int, completed: List[Tuple[str, Any]]) -> None:
+        """Finish the current value at buffer[:end] and go back to expecting a key."""
+        raw = buffer[self._value_start:end].strip()
+        if raw and self._key is not None:
+            try:
+                completed.append((self._key, json.loads(raw)))
+            except ValueError:
+                pass
+        self._key = None
+        self._state = _BEFORE_KEY
+
+    @staticmethod
+    def _loads(raw: str) -> Optional[str]:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
@@ -8,6 +8,7 @@ Used by:
 """
 
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Set, Tuple
 
 
@@ -85,6 +86,21 @@ _COOKING_MODIFIERS = [
 ]
 
 
+# Precompiled patterns for normalize_ingredient_name. All modifiers go into one
+# alternation so stripping them is a single pass instead of one re.sub each.
+_PARENTHETICAL_RE = re.compile(r'\([^)]*\)')
+_MODIFIERS_RE = re.compile(
+    r'\b(?:' + '|'.join(
+        re.escape(m) for m in sorted(_COOKING_MODIFIERS, key=len, reverse=True)
+    ) + r')\b'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Max distinct raw names kept by the normalize_ingredient_name memo
+NORMALIZE_CACHE_SIZE = 16384
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_ingredient_name(name: str) -> str:
     """
     Normalize ingredient name for matching.
@@ -94,6 +110,9 @@ def normalize_ingredient_name(name: str) -> str:
     - Remove cooking modifiers (boneless, skinless, chopped, etc.)
     - Collapse whitespace
     - Naive depluralize (remove trailing 's')
+
+    Memoized on the raw name (bounded LRU): the same few thousand ingredient
+    names come up for every candidate of every plan. See normalize_cache_stats().
     """
     if not name:
         return ""
@@ -101,14 +120,13 @@ def normalize_ingredient_name(name: str) -> str:
     normalized = name.lower().strip()
 
     # Remove content in parentheses: "tomatoes (diced)" → "tomatoes"
-    normalized = re.sub(r'\([^)]*\)', '', normalized).strip()
+    normalized = _PARENTHETICAL_RE.sub('', normalized).strip()
 
     # Remove cooking modifiers
-    for modifier in _COOKING_MODIFIERS:
-        normalized = re.sub(r'\b' + modifier + r'\b', '', normalized)
+    normalized = _MODIFIERS_RE.sub('', normalized)
 
     # Collapse whitespace
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    normalized = _WHITESPACE_RE.sub(' ', normalized).strip()
 
     # Handle pluralization
     if normalized.endswith('oes') and len(normalized) > 4:
@@ -124,6 +142,146 @@ def normalize_ingredient_name(name: str) -> str:
     return normalized
 
 
+def normalize_cache_stats() -> dict:
+    """Hit/miss counters for the normalize_ingredient_name memo."""
+    info = normalize_ingredient_name.cache_info()
+    total = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": f"{(info.hits / total * 100):.1f}%" if total > 0 else "0%",
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+class PantryIndex(dict):
+    """
+    Pantry lookup (normalized_name -> pantry item) with match indexes.
+
+    Still a plain dict to callers. On top of it keeps:
+    - base ingredient -> first pantry key with that base (variation level)
+    - pantry keys by length, and every substring of every key -> first key
+      containing it (substring level, built on first use)
+    - token -> pantry keys containing it (word-overlap level)
+
+    "First" means earliest in dict order, so every level returns exactly the
+    key the old linear scans over the dict returned. Results are memoized per
+    index since the same ingredients recur across a recipe pool. Indexes are
+    built at construction; treat the dict as read-only afterwards.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._position: Dict[str, int] = {key: i for i, key in enumerate(self)}
+
+        self._base_to_key: Dict[str, str] = {}
+        for key in self:
+            base = INGREDIENT_TO_BASE.get(key)
+            if base and base not in self._base_to_key:
+                self._base_to_key[base] = key
+
+        self._key_lengths = sorted({len(key) for key in self if key})
+        self._substring_to_key: Optional[Dict[str, str]] = None
+
+        # Word-overlap only considers keys of 3+ characters
+        self._token_to_keys: Dict[str, List[str]] = {}
+        self._key_word_count: Dict[str, int] = {}
+        for key in self:
+            if len(key) < 3:
+                continue
+            words = set(key.split())
+            self._key_word_count[key] = len(words)
+            for word in words:
+                self._token_to_keys.setdefault(word, []).append(key)
+
+        self._memo: Dict[str, Tuple[Optional[str], str]] = {}
+
+    def match(self, norm: str) -> Tuple[Optional[str], str]:
+        """Match an already-normalized ingredient name. See match_ingredient_to_pantry."""
+        if not norm:
+            return None, "none"
+        cached = self._memo.get(norm)
+        if cached is None:
+            cached = self._match(norm)
+            self._memo[norm] = cached
+        return cached
+
+    def _match(self, norm: str) -> Tuple[Optional[str], str]:
+        # 1. Exact match
+        if norm in self:
+            return norm, "exact"
+
+        # 2. Variation match (both map to same base ingredient)
+        ing_base = INGREDIENT_TO_BASE.get(norm)
+        if ing_base and ing_base in self._base_to_key:
+            return self._base_to_key[ing_base], "variation"
+
+        # 3. Substring match
+        key = self._first_substring_match(norm)
+        if key is not None:
+            return key, "substring"
+
+        # 4. Word-overlap match
+        key = self._first_word_overlap_match(norm)
+        if key is not None:
+            return key, "word_overlap"
+
+        return None, "none"
+
+    def _first_substring_match(self, norm: str) -> Optional[str]:
+        best: Optional[str] = None
+
+        # Pantry key inside the ingredient name: probe each window of norm
+        # whose length matches some key
+        for length in self._key_lengths:
+            if length > len(norm):
+                break
+            for i in range(len(norm) - length + 1):
+                window = norm[i:i + length]
+                if window in self._position and (
+                    best is None or self._position[window] < self._position[best]
+                ):
+                    best = window
+
+        # Ingredient name inside a pantry key
+        if self._substring_to_key is None:
+            self._substring_to_key = self._build_substring_index()
+        key = self._substring_to_key.get(norm)
+        if key is not None and (best is None or self._position[key] < self._position[best]):
+            best = key
+
+        return best
+
+    def _build_substring_index(self) -> Dict[str, str]:
+        index: Dict[str, str] = {}
+        for key in self:
+            for i in range(len(key)):
+                for j in range(i + 1, len(key) + 1):
+                    index.setdefault(key[i:j], key)
+        return index
+
+    def _first_word_overlap_match(self, norm: str) -> Optional[str]:
+        ing_words = set(norm.split())
+        overlap: Dict[str, int] = {}
+        for word in ing_words:
+            for key in self._token_to_keys.get(word, ()):
+                overlap[key] = overlap.get(key, 0) + 1
+
+        best: Optional[str] = None
+        for key, shared in overlap.items():
+            key_words = self._key_word_count[key]
+            if key_words <= len(ing_words):
+                # Pantry words are the shorter set: all of them must appear
+                ok = shared == key_words
+            else:
+                # Ingredient words are the shorter set: all of them must appear
+                ok = shared == len(ing_words)
+            if ok and (best is None or self._position[key] < self._position[best]):
+                best = key
+        return best
+
+
 def match_ingredient_to_pantry(
     ingredient_name: str,
     pantry_normalized: Dict[str, dict],
@@ -135,45 +293,17 @@ def match_ingredient_to_pantry(
 
     Args:
         ingredient_name: raw ingredient name from recipe
-        pantry_normalized: dict of normalized_name -> pantry_item_dict
+        pantry_normalized: PantryIndex from prepare_pantry_lookup (a plain
+            dict of normalized_name -> pantry_item_dict also works, but is
+            re-indexed on every call)
 
     Returns:
         (matched_pantry_normalized_name, match_type)
         match_type is 'exact', 'variation', 'substring', 'word_overlap', or 'none'
     """
-    norm = normalize_ingredient_name(ingredient_name)
-    if not norm:
-        return None, "none"
-
-    # 1. Exact match
-    if norm in pantry_normalized:
-        return norm, "exact"
-
-    # 2. Variation match (both map to same base ingredient)
-    ing_base = INGREDIENT_TO_BASE.get(norm)
-    if ing_base:
-        for pantry_norm in pantry_normalized:
-            pantry_base = INGREDIENT_TO_BASE.get(pantry_norm)
-            if pantry_base and pantry_base == ing_base:
-                return pantry_norm, "variation"
-
-    # 3. Substring match
-    for pantry_norm in pantry_normalized:
-        if pantry_norm and norm:
-            if pantry_norm in norm or norm in pantry_norm:
-                return pantry_norm, "substring"
-
-    # 4. Word-overlap match
-    ing_words = set(norm.split())
-    for pantry_norm in pantry_normalized:
-        if pantry_norm and len(pantry_norm) >= 3:
-            pantry_words = set(pantry_norm.split())
-            shorter = pantry_words if len(pantry_words) <= len(ing_words) else ing_words
-            longer = ing_words if len(pantry_words) <= len(ing_words) else pantry_words
-            if shorter and shorter.issubset(longer):
-                return pantry_norm, "word_overlap"
-
-    return None, "none"
+    if not isinstance(pantry_normalized, PantryIndex):
+        pantry_normalized = PantryIndex(pantry_normalized)
+    return pantry_normalized.match(normalize_ingredient_name(ingredient_name))
 
 
 def is_trivial_ingredient(name: str) -> bool:
@@ -197,11 +327,62 @@ def calculate_pantry_coverage(
     """
     if not recipe_ingredients:
         return 0.0, 0, 0
+    signature = build_ingredient_signature(recipe_ingredients)
+    return calculate_signature_coverage(signature["names"], pantry_normalized)
+
+
+def calculate_recipe_pantry_coverage(
+    recipe: dict,
+    pantry_normalized: Dict[str, dict],
+) -> Tuple[float, int, int]:
+    """calculate_pantry_coverage for a recipe row, using its stored signature when current."""
+    return calculate_signature_coverage(recipe_signature_names(recipe), pantry_normalized)
+
+
+def calculate_signature_coverage(
+    signature_names: List[str],
+    pantry_normalized: Dict[str, dict],
+) -> Tuple[float, int, int]:
+    """Pantry coverage over already-normalized, non-trivial ingredient names."""
+    if not signature_names:
+        return 0.0, 0, 0
 
-    total = 0
+    if not isinstance(pantry_normalized, PantryIndex):
+        pantry_normalized = PantryIndex(pantry_normalized)
+
+    total = len(signature_names)
     matched = 0
+    for norm in signature_names:
+        _, match_type = pantry_normalized.match(norm)
+        if match_type != "none":
+            matched += 1
+
+    return matched / total, matched, total
+
+
+# ============================================================================
+# Ingredient Signatures
+# ============================================================================
 
-    for ing in recipe_ingredients:
+# Stored on recipes.ingredient_signature. Bump when normalize_ingredient_name,
+# _TRIVIAL_INGREDIENTS or the exclusion vocabulary change so stale signatures
+# are recomputed, not trusted.
+INGREDIENT_SIGNATURE_VERSION = 2
+
+
+def build_ingredient_signature(recipe_ingredients: Optional[List[dict]]) -> dict:
+    """
+    Precompute the pantry-matching view of a recipe's ingredients.
+
+    "names" holds the normalized name of every non-trivial ingredient, in
+    recipe order (duplicates kept, so len(names) is the coverage total).
+    "exclusion_mask" is the allergen/restriction bitmask from
+    exclusion_matching.build_exclusion_mask.
+    """
+    from app.utils.exclusion_matching import build_exclusion_mask
+
+    names = []
+    for ing in recipe_ingredients or []:
         if not isinstance(ing, dict):
             continue
         name = ing.get("name", "")
@@ -209,21 +390,25 @@ def calculate_pantry_coverage(
             continue
         if is_trivial_ingredient(name):
             continue
+        names.append(normalize_ingredient_name(name))
+    return {
+        "version": INGREDIENT_SIGNATURE_VERSION,
+        "names": names,
+        "exclusion_mask": build_exclusion_mask(recipe_ingredients),
+    }
 
-        total += 1
-        _, match_type = match_ingredient_to_pantry(name, pantry_normalized)
-        if match_type != "none":
-            matched += 1
 
-    if total == 0:
-        return 0.0, 0, 0
-
-    return matched / total, matched, total
+def recipe_signature_names(recipe: dict) -> List[str]:
+    """Signature names for a recipe row; recomputed if missing or outdated."""
+    signature = recipe.get("ingredient_signature")
+    if isinstance(signature, dict) and signature.get("version") == INGREDIENT_SIGNATURE_VERSION:
+        return signature.get("names") or []
+    return build_ingredient_signature(recipe.get("ingredients"))["names"]
 
 
-def prepare_pantry_lookup(pantry_items: List[dict]) -> Dict[str, dict]:
+def prepare_pantry_lookup(pantry_items: List[dict]) -> PantryIndex:
     """
-    Pre-normalize all pantry items into a lookup dict.
+    Pre-normalize all pantry items into an indexed lookup dict.
 
     Key: normalized_name, Value: pantry item dict.
     Called once per meal plan generation, reused for all candidates.
@@ -234,7 +419,7 @@ def prepare_pantry_lookup(pantry_items: List[dict]) -> Dict[str, dict]:
         normalized = normalize_ingredient_name(name)
         if normalized:
             lookup[normalized] = item
-    return lookup
+    return PantryIndex(lookup)
 
 
 # ============================================================================
@@ -0,0 +1,64 @@
+"""
+Keyset pagination over (created_at DESC, id DESC).
+
+Listings used to page with .range(offset, offset + limit - 1), which makes
+Postgres walk and discard every skipped row and shifts pages when rows are
+inserted mid-scroll. A keyset cursor carries the last row's (created_at, id)
+instead, so the next page is an index range scan starting right after it.
+Offsets still work when no cursor is given.
+
+Cursors are opaque to clients (base64url JSON) and returned in the
+X-Next-Cursor response header.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_keyset_cursor(created_at: str, row_id: str) -> str:
+    payload = json.dumps({"c": created_at, "i": row_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_keyset_cursor(cursor: str) -> Tuple[str, str]:
+    """(created_at, id) from a cursor. Raises 400 for anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at, row_id = payload["c"], payload["i"]
+        # Both end up inside a PostgREST filter string; only accept exact shapes
+        datetime.fromisoformat(created_at)
+        uuid.UUID(row_id)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return created_at, row_id
+
+
+def apply_keyset_page(query, limit: int, offset: int = 0, cursor: Optional[str] = None):
+    """Order by (created_at, id) desc and select one page, by cursor if given, else offset."""
+    query = query.order("created_at", desc=True).order("id", desc=True)
+    if not cursor:
+        return query.range(offset, offset + limit - 1)
+
+    created_at, row_id = decode_keyset_cursor(cursor)
+    # Timestamps contain ':' and '.', which must be quoted inside or=()
+    query = query.or_(
+        f'created_at.lt."{created_at}",'
+        f'and(created_at.eq."{created_at}",id.lt.{row_id})'
+    )
+    return query.limit(limit)
+
+
+def next_keyset_cursor(rows: List[dict], limit: int) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page."""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_keyset_cursor(last["created_at"], last["id"])
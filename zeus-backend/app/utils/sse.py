@@ -0,0 +1,71 @@
+"""
+Server-Sent Events responses for streaming AI endpoints.
+
+Endpoints that support streaming keep their JSON response by default and
+switch to text/event-stream when the client sends `Accept: text/event-stream`.
+The stream is a sequence of (event, data) pairs produced by an async
+generator; data is JSON-encoded:
+
+    event: field
+    data: {"name": "recipe_title", "value": "Lemon Chicken"}
+
+A stream always ends with either `done` (the same body the JSON response
+would have returned) or `error` ({"status_code": ..., "detail": ...}).
+
+The first event is awaited before the response starts, so errors raised
+before any output (limiter 503, rate limit 429, validation) still come back
+as ordinary HTTP errors with their status codes and headers.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM = "text/event-stream"
+
+
+def wants_event_stream(request: Request) -> bool:
+    return EVENT_STREAM in request.headers.get("accept", "")
+
+
+def format_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+async def event_stream_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """Stream (event, data) pairs as SSE. Raises if the stream fails before its first event."""
+    try:
+        first = await events.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except BaseException:
+        await events.aclose()
+        raise
+
+    async def body():
+        try:
+            if first is not None:
+                yield format_event(*first)
+            async for event in events:
+                yield format_event(*event)
+        except HTTPException as e:
+            yield format_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"Event stream failed: {e}")
+            yield format_event("error", {"status_code": 500, "detail": "Stream failed"})
+        finally:
+            # Client disconnects cancel this generator; close the source so the
+            # upstream Claude stream and its concurrency slot are released now
+            await events.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=EVENT_STREAM,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
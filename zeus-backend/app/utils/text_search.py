@@ -0,0 +1,200 @@
+"""
+In-process full-text search index.
+
+Used by:
+- recipe_catalog_service (recipe search when the catalog is warm)
+
+Mirrors what migration 008 does in Postgres, closely enough that results
+agree on ordinary queries:
+
+- Documents are weighted fields (title > ingredients > description),
+  tokenized to lowercase alphanumerics with light plural stemming.
+- Every query token must match (AND). A token matches a term exactly, as a
+  prefix of a longer term, or, when the token isn't in the vocabulary at
+  all, a term with trigram similarity >= FUZZY_THRESHOLD (typos).
+- Relevance is the sum over query tokens of the best matching term's
+  field-weighted tf * idf, discounted for prefix and fuzzy matches.
+
+Lookups touch only the postings of the matched terms, and prefix/fuzzy
+expansion works on the vocabulary, so latency follows query selectivity
+rather than catalog size.
+"""
+
+import bisect
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Minimum pg_trgm-style similarity for a typo match (pg_trgm's default is 0.3)
+FUZZY_THRESHOLD = 0.3
+
+# Score multipliers relative to an exact term match
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+
+# Expansion caps per query token (most frequent terms win)
+MAX_PREFIX_EXPANSIONS = 64
+MAX_FUZZY_EXPANSIONS = 8
+
+# Tokens shorter than this only match exactly
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+
+
+def _stem(token: str) -> str:
+    """Fold simple English plurals (tomatoes -> tomato, berries -> berry)."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased, stemmed alphanumeric tokens."""
+    return [_stem(t) for t in _TOKEN_RE.findall((text or "").lower())]
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Weighted inverted index with prefix and trigram (typo) expansion."""
+
+    def __init__(self, field_weights: Dict[str, float]):
+        self.field_weights = field_weights
+        self._postings: Dict[str, Dict[str, float]] = {}   # term -> {doc_id: weight}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}    # doc_id -> its terms
+        self._doc_fields: Dict[str, Tuple[str, ...]] = {}   # doc_id -> indexed text
+        self._trigram_terms: Dict[str, Set[str]] = {}       # trigram -> terms
+        self._sorted_terms: Optional[List[str]] = None       # lazily rebuilt for prefix lookups
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    # --- Maintenance ---
+
+    def add(self, doc_id: str, fields: Dict[str, Optional[str]]) -> None:
+        """Index (or re-index) a document. No-op if its text is unchanged."""
+        texts = tuple(fields.get(name) or "" for name in self.field_weights)
+        if self._doc_fields.get(doc_id) == texts:
+            return
+        self.remove(doc_id)
+
+        weights: Dict[str, float] = {}
+        for weight, text in zip(self.field_weights.values(), texts):
+            for term in tokenize(text):
+                weights[term] = weights.get(term, 0.0) + weight
+
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                for gram in _trigrams(term):
+                    self._trigram_terms.setdefault(gram, set()).add(term)
+                self._sorted_terms = None
+            postings[doc_id] = weight
+        self._doc_terms[doc_id] = tuple(weights)
+        self._doc_fields[doc_id] = texts
+
+    def remove(self, doc_id: str) -> None:
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                for gram in _trigrams(term):
+                    terms = self._trigram_terms.get(gram)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._trigram_terms[gram]
+                self._sorted_terms = None
+        self._doc_fields.pop(doc_id, None)
+
+    # --- Queries ---
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(doc_id, score) for documents matching every query token, best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        for token in tokens:
+            token_scores = self._token_scores(token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    doc_id: score + token_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in token_scores
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        return ranked[:limit] if limit is not None else ranked
+
+    def _token_scores(self, token: str) -> Dict[str, float]:
+        """Best score per document for one query token."""
+        scores: Dict[str, float] = {}
+        for term, multiplier in self._expand(token):
+            postings = self._postings[term]
+            idf = math.log(1 + len(self._doc_terms) / len(postings))
+            for doc_id, weight in postings.items():
+                score = weight * idf * multiplier
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def _expand(self, token: str) -> Iterable[Tuple[str, float]]:
+        """Vocabulary terms a query token matches, with their score multiplier."""
+        expansions: List[Tuple[str, float]] = []
+        if token in self._postings:
+            expansions.append((token, 1.0))
+
+        if len(token) >= MIN_PREFIX_LENGTH:
+            expansions.extend((term, PREFIX_WEIGHT) for term in self._prefix_terms(token))
+
+        if not expansions and len(token) >= MIN_FUZZY_LENGTH:
+            expansions.extend(
+                (term, FUZZY_WEIGHT * similarity) for term, similarity in self._fuzzy_terms(token)
+            )
+        return expansions
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        matches = []
+        i = bisect.bisect_right(terms, prefix)  # skip the exact term itself
+        while i < len(terms) and terms[i].startswith(prefix):
+            matches.append(terms[i])
+            i += 1
+        if len(matches) > MAX_PREFIX_EXPANSIONS:
+            matches.sort(key=lambda term: -len(self._postings[term]))
+            matches = matches[:MAX_PREFIX_EXPANSIONS]
+        return matches
+
+    def _fuzzy_terms(self, token: str) -> List[Tuple[str, float]]:
+        grams = _trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for term in self._trigram_terms.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        matches = []
+        for term, count in shared.items():
+            similarity = count / (len(grams) + len(_trigrams(term)) - count)
+            if similarity >= FUZZY_THRESHOLD:
+                matches.append((term, similarity))
+        matches.sort(key=lambda item: -item[1])
+        return matches[:MAX_FUZZY_EXPANSIONS]
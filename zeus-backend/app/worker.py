@@ -0,0 +1,75 @@
+"""
+Standalone background task runner.
+
+Runs TaskService runners without the HTTP app, so long-running jobs (meal
+plan generation, slot filling) scale separately from the web processes.
+Needs a shared task backend (TASK_DB_PATH) on the same host as the web
+processes; set TASK_WORKER_CONCURRENCY=0 there to leave all tasks to this
+process.
+
+Usage:
+    cd zeus-backend
+    python -m app.worker --concurrency 4
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.config import settings
+from app.services.task_service import task_service
+
+# Importing the API modules registers their task handlers
+import app.api.meal_plans  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    # Meal plan shortlisting reads the in-process catalog when it's loaded
+    from app.services.recipe_catalog_service import recipe_catalog
+    if settings.recipe_catalog_enabled:
+        recipe_catalog.start()
+
+    # Handlers read and invalidate the shared cache; connect it (and its
+    # near-cache invalidation listener) as the web app does on startup
+    from app.services.cache_service import cache
+    await cache.start()
+
+    await task_service.start(concurrency)
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Stopping task runners")
+        await task_service.stop()
+        await recipe_catalog.stop()
+        await cache.close()
+
+        from app.services.ai_service import ai_service
+        from app.database import database
+        await ai_service.close()
+        await database.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run Zeus background tasks")
+    parser.add_argument("--concurrency", type=int, default=4, help="tasks run at once by this process")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if settings.debug else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if task_service.backend.name == "memory":
+        logger.warning("TASK_DB_PATH is not set: this worker can't see tasks queued by the web processes")
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
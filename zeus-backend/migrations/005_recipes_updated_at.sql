@@ -0,0 +1,28 @@
+-- Track when a recipe row last changed so the in-process recipe catalog
+-- (app/services/recipe_catalog_service.py) can refresh incrementally.
+-- Without this column the catalog falls back to created_at and only picks up
+-- edits on its hourly full reload.
+
+ALTER TABLE recipes
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+UPDATE recipes SET updated_at = COALESCE(created_at, updated_at);
+
+CREATE OR REPLACE FUNCTION set_recipes_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Fires for likes_count updates too (trigger_update_recipe_likes_count),
+-- which keeps catalog like counts current.
+DROP TRIGGER IF EXISTS trigger_set_recipes_updated_at ON recipes;
+CREATE TRIGGER trigger_set_recipes_updated_at
+    BEFORE UPDATE ON recipes
+    FOR EACH ROW EXECUTE FUNCTION set_recipes_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_recipes_updated_at ON recipes(updated_at);
+
+SELECT 'recipes.updated_at added successfully!' as message;
@@ -0,0 +1,11 @@
+-- Precomputed pantry-matching view of each recipe's ingredients.
+-- Shape: {"version": 2, "names": ["chicken breast", "onion", ...], "exclusion_mask": 1234}
+-- (normalized, non-trivial ingredient names plus the allergen/restriction
+-- bitmask; see app/utils/ingredient_matching.build_ingredient_signature).
+-- Written by RecipeService on create/update; backfill existing rows with:
+--   python scripts/backfill_ingredient_signatures.py
+
+ALTER TABLE recipes
+ADD COLUMN IF NOT EXISTS ingredient_signature JSONB;
+
+SELECT 'recipes.ingredient_signature added successfully!' as message;
@@ -0,0 +1,18 @@
+-- Composite indexes for keyset pagination (app/utils/pagination.py).
+-- User, saved and liked recipe listings and meal plan listings page over
+-- (created_at DESC, id DESC) within one user; these let each page start with
+-- an index range scan right after the cursor instead of skipping rows.
+
+CREATE INDEX IF NOT EXISTS idx_recipes_user_created
+    ON recipes(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_recipe_saves_user_created
+    ON recipe_saves(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_recipe_likes_user_created
+    ON recipe_likes(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_meal_plans_user_created
+    ON meal_plans(user_id, created_at DESC, id DESC);
+
+SELECT 'Keyset pagination indexes created successfully!' as message;
@@ -0,0 +1,75 @@
+-- Indexed recipe search (app/services/recipe_search_service.py).
+-- Replaces title ILIKE '%term%' scans with:
+--   - search_vector: weighted tsvector over title (A), ingredient names (B)
+--     and description (C), GIN-indexed, matched with prefix queries
+--   - trigram GIN indexes on title and search_text for typo tolerance
+--   - search_recipes(): ranked ids for a query, optionally for one owner
+-- Apply in the Supabase SQL editor. Until it is applied the API falls back
+-- to the in-process catalog index, then to ILIKE.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- jsonb_path_query_array and the regconfig-qualified to_tsvector are
+-- immutable, so both columns can be generated and stay in sync on write.
+ALTER TABLE recipes
+ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(
+        coalesce(title, '') || ' ' ||
+        coalesce(jsonb_path_query_array(ingredients, '$[*].name')::text, '') || ' ' ||
+        coalesce(description, '')
+    )
+) STORED;
+
+ALTER TABLE recipes
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig,
+        coalesce(jsonb_path_query_array(ingredients, '$[*].name')::text, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_recipes_search_vector ON recipes USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_recipes_title_trgm ON recipes USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_recipes_search_text_trgm ON recipes USING GIN (search_text gin_trgm_ops);
+
+-- Ranked search. Every query word must match as a word prefix (full-text),
+-- or the whole query must be trigram-similar to the title or to some word
+-- span of search_text (typos). Rank combines both signals; ties go to the
+-- more liked recipe.
+CREATE OR REPLACE FUNCTION search_recipes(
+    search_query TEXT,
+    result_limit INT DEFAULT 500,
+    owner_id UUID DEFAULT NULL
+)
+RETURNS TABLE(recipe_id UUID, rank REAL)
+LANGUAGE sql STABLE AS $$
+    WITH q AS (
+        SELECT
+            lower(search_query) AS term,
+            to_tsquery('english', NULLIF(array_to_string(ARRAY(
+                SELECT word || ':*'
+                FROM regexp_split_to_table(
+                    regexp_replace(lower(search_query), '[^a-z0-9]+', ' ', 'g'), ' '
+                ) AS word
+                WHERE word <> ''
+            ), ' & '), '')) AS prefix_query
+    )
+    SELECT
+        r.id AS recipe_id,
+        (
+            coalesce(ts_rank(r.search_vector, q.prefix_query), 0) * 4
+            + similarity(r.title, q.term)
+            + word_similarity(q.term, r.search_text) * 0.5
+        )::REAL AS rank
+    FROM recipes r, q
+    WHERE (owner_id IS NULL OR r.user_id = owner_id)
+      AND (
+          r.search_vector @@ q.prefix_query
+          OR r.title % q.term
+          OR q.term <% r.search_text
+      )
+    ORDER BY rank DESC, r.likes_count DESC, r.id
+    LIMIT result_limit;
+$$;
+
+SELECT 'Recipe search indexes created successfully!' as message;
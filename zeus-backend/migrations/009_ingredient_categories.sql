@@ -0,0 +1,19 @@
+-- Persistent ingredient categorization for grocery lists.
+-- One row per normalized ingredient name (app/utils/ingredient_matching
+-- normalize_ingredient_name) with the clean display name and grocery category
+-- Claude assigned it. Loaded into memory by each worker at startup; Claude is
+-- only asked about names that aren't here yet.
+-- See app/services/ingredient_category_service.py
+
+CREATE TABLE IF NOT EXISTS ingredient_categories (
+    normalized_name VARCHAR(200) PRIMARY KEY,
+    clean_name VARCHAR(200) NOT NULL,
+    category VARCHAR(50) NOT NULL, -- Produce, Dairy, Protein, Grains, Spices, Condiments, Beverages, Frozen, Pantry, Other
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Fix a bad categorization by updating (or deleting) its row; workers pick the
+-- change up on restart.
+
+SELECT 'ingredient_categories created successfully!' as message;
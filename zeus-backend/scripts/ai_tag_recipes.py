@@ -16,7 +16,7 @@ import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import Database
+from app.database import get_sync_database
 from app.config import settings
 import anthropic
 
@@ -69,8 +69,7 @@ Recipes:
 
 
 def main():
-    db = Database()
-    client = db.connect()
+    client = get_sync_database()
 
     ai_client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
 
@@ -0,0 +1,66 @@
+"""
+Backfill recipes.ingredient_signature (precomputed pantry-matching names).
+
+Recomputes the signature for every recipe whose stored signature is missing,
+from an older INGREDIENT_SIGNATURE_VERSION, or out of date with its
+ingredients. Run after applying migrations/006_recipe_ingredient_signature.sql
+and whenever INGREDIENT_SIGNATURE_VERSION is bumped.
+
+Usage:
+    cd zeus-backend
+    python scripts/backfill_ingredient_signatures.py
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import get_sync_database
+from app.utils.ingredient_matching import build_ingredient_signature
+
+
+def main():
+    client = get_sync_database()
+
+    print("Fetching all recipes...")
+
+    # Fetch all recipes in batches (Supabase has row limits)
+    all_recipes = []
+    offset = 0
+    batch_size = 1000
+    while True:
+        result = client.table('recipes').select(
+            'id, title, ingredients, ingredient_signature'
+        ).order('id').range(offset, offset + batch_size - 1).execute()
+
+        if not result.data:
+            break
+        all_recipes.extend(result.data)
+        if len(result.data) < batch_size:
+            break
+        offset += batch_size
+
+    print(f"Found {len(all_recipes)} recipes total")
+
+    updated = 0
+    skipped = 0
+
+    for recipe in all_recipes:
+        signature = build_ingredient_signature(recipe.get('ingredients'))
+        if recipe.get('ingredient_signature') != signature:
+            client.table('recipes').update({
+                'ingredient_signature': signature
+            }).eq('id', recipe['id']).execute()
+            updated += 1
+            if updated <= 10:
+                print(f"  Signed: {recipe['title']}: {signature['names']}")
+            elif updated == 11:
+                print("  ... (showing first 10 only)")
+        else:
+            skipped += 1
+
+    print(f"\nDone! Updated: {updated}, Already current: {skipped}")
+
+
+if __name__ == '__main__':
+    main()
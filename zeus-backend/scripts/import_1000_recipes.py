@@ -13,7 +13,7 @@ import os
 # Add parent dir to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from app.database import get_database
+from app.database import get_sync_database
 
 SYSTEM_USER_ID = "00000000-0000-0000-0000-000000000001"
 ZIP_PATH = os.path.join(os.path.dirname(__file__), "allrecipes_import", "recipes.zip")
@@ -156,7 +156,7 @@ def infer_dietary_tags(title, ing_text):
 
 
 def main():
-    db = get_database()
+    db = get_sync_database()
 
     # Get existing titles
     existing = db.table("recipes").select("title").eq("user_id", SYSTEM_USER_ID).execute()
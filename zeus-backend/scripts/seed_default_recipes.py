@@ -12,7 +12,7 @@ from pathlib import Path
 # Add parent directory to path so we can import from app
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.database import get_database
+from app.database import get_sync_database
 from app.data.default_recipes import get_default_recipes
 
 SYSTEM_USER_ID = "00000000-0000-0000-0000-000000000001"
@@ -20,7 +20,7 @@ SYSTEM_USER_ID = "00000000-0000-0000-0000-000000000001"
 
 def seed_default_recipes():
     """Seed the recipes table with default scraped recipes."""
-    db = get_database()
+    db = get_sync_database()
     recipes = get_default_recipes()
 
     print(f"\n{'=' * 60}")
@@ -124,7 +124,7 @@ def seed_default_recipes():
 
 def verify_seed_data():
     """Verify that the default recipes were seeded correctly."""
-    db = get_database()
+    db = get_sync_database()
 
     print("Verifying seed data...")
 
@@ -164,7 +164,7 @@ def main():
     print("=" * 60 + "\n")
 
     # Verify system user exists
-    db = get_database()
+    db = get_sync_database()
     try:
         user_check = (
             db.table("users")
@@ -9,7 +9,7 @@ from pathlib import Path
 # Add parent directory to path so we can import from app
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.database import get_database
+from app.database import get_sync_database
 from app.data.seed_ingredients import get_all_ingredients, get_category_counts
 
 
@@ -18,7 +18,7 @@ def create_ingredient_library_table():
     Create the ingredient_library table if it doesn't exist.
     This table stores common ingredients for autocomplete functionality.
     """
-    db = get_database()
+    db = get_sync_database()
 
     create_table_sql = """
     CREATE TABLE IF NOT EXISTS ingredient_library (
@@ -47,7 +47,7 @@ def create_ingredient_library_table():
 
 def seed_ingredients():
     """Seed the ingredient_library table with common ingredients"""
-    db = get_database()
+    db = get_sync_database()
 
     ingredients = get_all_ingredients()
     category_counts = get_category_counts()
@@ -109,7 +109,7 @@ def seed_ingredients():
 
 def verify_seed_data():
     """Verify that the ingredients were seeded correctly"""
-    db = get_database()
+    db = get_sync_database()
 
     print("Verifying seed data...")
 
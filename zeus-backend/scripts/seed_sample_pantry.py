@@ -10,7 +10,7 @@ from datetime import datetime, timedelta
 # Add parent directory to path to import app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.database import get_database
+from app.database import get_sync_database
 
 # Sample pantry items across all categories
 SAMPLE_ITEMS = [
@@ -73,7 +73,7 @@ SAMPLE_ITEMS = [
 
 def seed_pantry_items(user_id: str):
     """Seed pantry items for a specific user"""
-    supabase = get_database()
+    supabase = get_sync_database()
 
     try:
         # Clear existing pantry items for this user
@@ -127,7 +127,7 @@ if __name__ == "__main__":
         print("1. Open your app and log in")
         print("2. Check the 'Profile' tab or check network requests")
         print("3. Or run this to list users:")
-        print("   python -c \"from app.database import get_database; db = get_database(); print([u['id'] + ': ' + u['email'] for u in db.table('users').select('id, email').execute().data])\"")
+        print("   python -c \"from app.database import get_sync_database; db = get_sync_database(); print([u['id'] + ': ' + u['email'] for u in db.table('users').select('id, email').execute().data])\"")
         sys.exit(1)
 
     user_id = sys.argv[1]
@@ -13,7 +13,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import Database
+from app.database import get_sync_database
 
 # Ingredient keywords that indicate non-vegetarian
 MEAT_KEYWORDS = [
@@ -125,8 +125,7 @@ def determine_dietary_tags(recipe: dict) -> list[str]:
 
 
 def main():
-    db = Database()
-    client = db.connect()
+    client = get_sync_database()
 
     print("Fetching all recipes...")
 
@@ -27,7 +27,7 @@ async def test_database_connection():
     try:
         db = get_database()
         # Simple test query
-        result = db.table("users").select("count").execute()
+        result = await db.table("users").select("count").execute()
         print("[SUCCESS] Database connection successful!")
         return True
     except Exception as e:
@@ -0,0 +1,277 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from app.services.cache_service import (
+    CacheBackend,
+    CacheService,
+    MemoryCacheBackend,
+    NearCacheBackend,
+    RedisCacheBackend,
+)
+
+TTL = 60
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def make_backend(server, monkeypatch):
+    """RedisCacheBackend factory; every backend gets its own client on one fake server."""
+    monkeypatch.setattr(
+        "redis.asyncio.from_url", lambda url: fakeredis.FakeAsyncRedis(server=server)
+    )
+    return lambda prefix="zeus": RedisCacheBackend("redis://fake", prefix=prefix)
+
+
+async def _eventually(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_get_many_set_many_round_trip(make_backend):
+    async def run():
+        backend = make_backend()
+        await backend.set_many({"feed:a": {"items": [1, 2]}, "recipe:b": "text"}, TTL)
+        assert await backend.get_many(["feed:a", "missing:x", "recipe:b"], TTL) == [
+            {"items": [1, 2]}, None, "text",
+        ]
+        assert await backend.get_many([], TTL) == []
+
+        await backend.delete("feed:a")
+        assert await backend.get_many(["feed:a", "recipe:b"], TTL) == [None, "text"]
+        await backend.close()
+
+    asyncio.run(run())
+
+
+def test_namespace_invalidation_bumps_generation(make_backend, server):
+    async def run():
+        backend = make_backend()
+        await backend.set_many({"feed:a": 1, "feed:b": 2, "recipe:c": 3}, TTL)
+
+        assert await backend.invalidate_prefix("feed:") == 0
+        assert await backend.get_many(["feed:a", "feed:b", "recipe:c"], TTL) == [None, None, 3]
+
+        client = fakeredis.FakeAsyncRedis(server=server)
+        assert await client.get("zeus:gen:feed") == b"1"
+
+        # New writes land in the new generation and are readable
+        await backend.set_many({"feed:a": 10}, TTL)
+        assert await backend.get_many(["feed:a"], TTL) == [10]
+        await backend.close()
+
+    asyncio.run(run())
+
+
+def test_narrow_prefix_invalidation(make_backend, server):
+    async def run():
+        backend = make_backend()
+        await backend.set_many({
+            "feed:user1:p1": 1,
+            "feed:user1:p2": 2,
+            "feed:user2:p1": 3,
+            "recipe:user1": 4,
+        }, TTL)
+
+        assert await backend.invalidate_prefix("feed:user1") == 2
+        assert await backend.get_many(
+            ["feed:user1:p1", "feed:user1:p2", "feed:user2:p1", "recipe:user1"], TTL
+        ) == [None, None, 3, 4]
+
+        client = fakeredis.FakeAsyncRedis(server=server)
+        assert await client.zrange("zeus:index:feed:0", 0, -1) == [b"user2:p1"]
+        assert await client.zrange("zeus:lexindex:feed:0", 0, -1) == [b"user2:p1"]
+
+    asyncio.run(run())
+
+
+def test_narrow_prefix_index_prunes_expired_members(make_backend, server, monkeypatch):
+    async def run():
+        backend = make_backend()
+        clock = [1000.0]
+        monkeypatch.setattr(time, "time", lambda: clock[0])
+        await backend.set_many({"feed:old:p1": 1, "feed:old:p2": 2}, TTL)
+
+        clock[0] += TTL + 1
+        await backend.set_many({"feed:new:p1": 3}, TTL)
+
+        client = fakeredis.FakeAsyncRedis(server=server)
+        assert await client.zrange("zeus:index:feed:0", 0, -1) == [b"new:p1"]
+        assert await client.zrange("zeus:lexindex:feed:0", 0, -1) == [b"new:p1"]
+
+        # Multi-byte identifiers sort inside the [prefix .. [prefix\xff range
+        await backend.set_many({"feed:new:\u00e9t\u00e9": 4, "feed:newer": 5}, TTL)
+        assert await backend.invalidate_prefix("feed:new:") == 2
+        assert await backend.get_many(["feed:newer"], TTL) == [5]
+
+    asyncio.run(run())
+
+
+def test_narrow_prefix_is_literal_not_glob(make_backend):
+    async def run():
+        backend = make_backend()
+        await backend.set_many({"feed:a*b": 1, "feed:abc": 2, "feed:a?": 3, "feed:[a]": 4}, TTL)
+
+        assert await backend.invalidate_prefix("feed:a*") == 1
+        assert await backend.invalidate_prefix("feed:[") == 1
+        assert await backend.get_many(["feed:a*b", "feed:abc", "feed:a?", "feed:[a]"], TTL) == [
+            None, 2, 3, None,
+        ]
+
+    asyncio.run(run())
+
+
+def test_clear_only_touches_own_prefix(make_backend):
+    async def run():
+        ours, theirs = make_backend("zeus"), make_backend("other")
+        await ours.set_many({"feed:a": 1}, TTL)
+        await theirs.set_many({"feed:a": 2}, TTL)
+
+        await ours.clear()
+        assert await ours.get_many(["feed:a"], TTL) == [None]
+        assert await theirs.get_many(["feed:a"], TTL) == [2]
+
+    asyncio.run(run())
+
+
+def test_lock_acquire_and_release(make_backend):
+    async def run():
+        backend = make_backend()
+        token = await backend.acquire_lock("feed:a", 30)
+        assert token
+        assert await backend.acquire_lock("feed:a", 30) is None
+
+        # Only the holder's token releases it
+        await backend.release_lock("feed:a", "someone-else")
+        assert await backend.acquire_lock("feed:a", 30) is None
+
+        await backend.release_lock("feed:a", token)
+        assert await backend.acquire_lock("feed:a", 30)
+
+    asyncio.run(run())
+
+
+def test_near_cache_broadcasts_invalidations(make_backend):
+    async def run():
+        worker1 = NearCacheBackend(make_backend())
+        worker2 = NearCacheBackend(make_backend())
+        await worker1.start()
+        await worker2.start()
+        await asyncio.sleep(0.05)  # let both listeners subscribe
+
+        await worker1.set_many({"feed:a": 1, "feed:b": 2, "recipe:c": 3}, TTL)
+        assert await worker2.get_many(["feed:a", "feed:b", "recipe:c"], TTL) == [1, 2, 3]
+        assert worker2.size() == 3
+
+        await worker1.delete("feed:a")
+        await _eventually(lambda: "feed:a" not in worker2._local)
+        assert await worker2.get_many(["feed:a"], TTL) == [None]
+
+        await worker1.invalidate_prefix("feed:")
+        await _eventually(lambda: "feed:b" not in worker2._local)
+        assert "recipe:c" in worker2._local
+        assert worker2.stats()["invalidations_received"] == 2
+
+        await worker1.clear()
+        await _eventually(lambda: worker2.size() == 0)
+
+        await worker1.close()
+        await worker2.close()
+
+    asyncio.run(run())
+
+
+def test_cache_service_treats_backend_errors_as_misses():
+    class BrokenBackend(CacheBackend):
+        name = "broken"
+
+        async def get_many(self, keys, ttl):
+            raise ConnectionError("down")
+
+        async def set_many(self, items, ttl):
+            raise ConnectionError("down")
+
+        async def invalidate_prefix(self, prefix):
+            raise ConnectionError("down")
+
+        async def clear(self):
+            raise ConnectionError("down")
+
+    async def run():
+        cache = CacheService(BrokenBackend())
+        await cache.set("feed:a", 1)
+        assert await cache.get("feed:a") is None
+        assert await cache.invalidate_pattern("feed:") == 0
+        await cache.clear()
+        assert cache.stats["errors"] == 4
+
+    asyncio.run(run())
+
+
+class _SlowInteractions:
+    """Stands in for the likes table: the first read blocks after taking its snapshot."""
+
+    def __init__(self):
+        self.liked = {"r1"}
+        self.gate = asyncio.Event()
+        self.reads = 0
+
+    async def fetch(self):
+        snapshot = sorted(self.liked)
+        self.reads += 1
+        if self.reads == 1:
+            await self.gate.wait()
+        return snapshot
+
+
+async def _like_during_compute(cache, invalidate):
+    db = _SlowInteractions()
+    key = "interactions:u1"
+
+    def read():
+        return cache.get_or_compute(key, TTL, db.fetch, stale_ttl=0)
+
+    first = asyncio.create_task(read())
+    await asyncio.sleep(0.01)  # first read has its pre-like snapshot
+
+    db.liked.add("r2")         # like_recipe commits...
+    await invalidate(key)      # ...then drops the cached interactions
+
+    # A request after the like must not join the pre-like computation
+    assert await asyncio.wait_for(read(), timeout=3) == ["r1", "r2"]
+
+    db.gate.set()
+    assert await first == ["r1"]
+    # ...and the pre-like result must not be written back over the fresh one
+    assert await read() == ["r1", "r2"]
+    assert db.reads == 2
+    assert cache.stats["discarded_after_invalidation"] == 1
+
+
+def test_like_during_compute_is_not_undone_by_stale_write():
+    cache = CacheService(MemoryCacheBackend())
+    asyncio.run(_like_during_compute(cache, cache.delete))
+
+
+def test_prefix_invalidation_during_compute_discards_result():
+    cache = CacheService(MemoryCacheBackend())
+    asyncio.run(_like_during_compute(cache, lambda key: cache.invalidate_pattern("interactions:")))
+
+
+def test_like_during_compute_on_redis_does_not_wait_for_stale_lock(make_backend):
+    async def run():
+        cache = CacheService(make_backend())
+        started = asyncio.get_running_loop().time()
+        await _like_during_compute(cache, cache.delete)
+        # The fresh read waits for the detached computation's lock, not COMPUTE_WAIT_SECONDS
+        assert asyncio.get_running_loop().time() - started < 2
+
+    asyncio.run(run())
@@ -0,0 +1,102 @@
+import itertools
+import random
+
+import pytest
+
+from app.services.calorie_optimizer_service import MIN_IMPROVEMENT, DaySlot, calorie_optimizer
+
+CALORIE_TARGET = 2000
+PROTEIN_TARGET = 120
+MEAL_TYPES = ("breakfast", "lunch", "dinner")
+
+
+def _day_cost(calories, protein):
+    return abs(calories - CALORIE_TARGET) + 2.0 * max(0.0, PROTEIN_TARGET - protein)
+
+
+def _random_instance(rng, num_days, pool_size):
+    # One small pool shared by every meal type, so days compete for recipes
+    shared = [
+        {"id": f"r{i}", "calories": rng.randint(150, 900), "protein_grams": rng.randint(5, 60)}
+        for i in range(pool_size)
+    ]
+    pools = {meal_type: shared for meal_type in MEAL_TYPES}
+
+    days = {}
+    for d in range(num_days):
+        slots = [
+            DaySlot(meal_type, f"plan-{d}-{meal_type}", rng.randint(150, 900), rng.randint(5, 60))
+            for meal_type in rng.sample(MEAL_TYPES, rng.randint(1, 3))
+        ]
+        days[f"day{d}"] = {
+            "calories": sum(s.calories for s in slots) + rng.randint(-300, 900),
+            "protein": sum(s.protein for s in slots) + rng.randint(0, 40),
+            "slots": slots,
+        }
+    return days, pools
+
+
+def _brute_force(days, pools):
+    """Lowest total cost over every combination of one option (or none) per day."""
+    per_day = []
+    for info in days.values():
+        baseline = _day_cost(info["calories"], info["protein"])
+        choices = [(baseline, None)]
+        for slot in info["slots"]:
+            for recipe in pools[slot.meal_type]:
+                cost = _day_cost(
+                    info["calories"] - slot.calories + recipe["calories"],
+                    info["protein"] - slot.protein + recipe["protein_grams"],
+                )
+                if baseline - cost >= MIN_IMPROVEMENT:
+                    choices.append((cost, recipe["id"]))
+        per_day.append(choices)
+
+    best = float("inf")
+    for combo in itertools.product(*per_day):
+        ids = [recipe_id for _, recipe_id in combo if recipe_id]
+        if len(ids) == len(set(ids)):
+            best = min(best, sum(cost for cost, _ in combo))
+    return best
+
+
+def _total_cost(days, chosen):
+    return sum(
+        option.cost if option else _day_cost(days[day]["calories"], days[day]["protein"])
+        for day, option in chosen.items()
+    )
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_solve_matches_brute_force(seed):
+    rng = random.Random(seed)
+    days, pools = _random_instance(rng, num_days=rng.randint(3, 5), pool_size=5)
+
+    chosen = calorie_optimizer.solve(days, pools, CALORIE_TARGET, PROTEIN_TARGET)
+
+    assert _total_cost(days, chosen) == pytest.approx(_brute_force(days, pools))
+    used = [option.recipe["id"] for option in chosen.values() if option]
+    assert len(used) == len(set(used))
+
+
+def test_solve_gives_contested_recipe_to_day_without_alternative():
+    # Both days want "a"; only day1 can fall back to "b"
+    days = {
+        "day1": {"calories": 2400, "protein": 120, "slots": [DaySlot("lunch", "plan-lunch", 500, 30)]},
+        "day2": {"calories": 2400, "protein": 120, "slots": [DaySlot("dinner", "plan-dinner", 500, 30)]},
+    }
+    recipe_a = {"id": "a", "calories": 100, "protein_grams": 30}
+    recipe_b = {"id": "b", "calories": 150, "protein_grams": 30}
+    pools = {"lunch": [recipe_a, recipe_b], "dinner": [recipe_a]}
+
+    chosen = calorie_optimizer.solve(days, pools, CALORIE_TARGET, PROTEIN_TARGET)
+
+    assert chosen["day1"].recipe["id"] == "b"
+    assert chosen["day2"].recipe["id"] == "a"
+
+
+def test_solve_keeps_days_without_worthwhile_swap():
+    days = {"day1": {"calories": 2020, "protein": 120, "slots": [DaySlot("lunch", "x", 500, 30)]}}
+    pools = {"lunch": [{"id": "a", "calories": 480, "protein_grams": 30}]}
+
+    assert calorie_optimizer.solve(days, pools, CALORIE_TARGET, PROTEIN_TARGET) == {"day1": None}
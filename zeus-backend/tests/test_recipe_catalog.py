@@ -0,0 +1,184 @@
+import asyncio
+import copy
+import random
+import threading
+
+from app.services.recipe_catalog_service import RecipeCatalog
+
+
+def _recipe(rid, title, likes=0, user_id="u1", **extra):
+    return {
+        "id": rid,
+        "title": title,
+        "description": None,
+        "ingredients": [],
+        "likes_count": likes,
+        "user_id": user_id,
+        "updated_at": "2024-01-01T00:00:00+00:00",
+        **extra,
+    }
+
+
+def _catalog(monkeypatch, rows):
+    catalog = RecipeCatalog()
+    state = {"rows": rows}
+
+    async def fetch_pages(since=None, columns=None):
+        if columns == "id":
+            return [{"id": r["id"]} for r in state["rows"]]
+        return [r for r in state["rows"] if since is None or r["updated_at"] >= since]
+
+    monkeypatch.setattr(catalog, "_fetch_pages", fetch_pages)
+    return catalog, state
+
+
+def test_search_orders_by_relevance_then_likes(monkeypatch):
+    catalog, _ = _catalog(monkeypatch, [
+        _recipe("a", "Lemon Chicken", likes=1),
+        _recipe("b", "Chicken Soup", likes=9),
+        _recipe("c", "Pasta", likes=50, description="goes well with chicken"),
+        _recipe("d", "Chicken Curry", likes=3, user_id="u2"),
+    ])
+    asyncio.run(catalog.refresh())
+
+    assert catalog.search("chicken") == ["b", "d", "a", "c"]
+    assert catalog.search("chicken", owner_id="u2") == ["d"]
+    assert catalog.search("chiken", limit=2) == ["b", "d"]
+    assert [r["id"] for r in catalog.query(search="chick", limit=3)] == ["b", "d", "a"]
+
+
+def test_full_load_swaps_rows_and_search_together(monkeypatch):
+    catalog, state = _catalog(monkeypatch, [_recipe("old", "Chicken Soup")])
+    asyncio.run(catalog.refresh())
+
+    # The reload drops "old"; queries made while the search index is still
+    # building must keep seeing the previous snapshot rather than a mix
+    state["rows"] = [_recipe("new", "Chicken Pie")]
+    catalog._last_full_load = None
+    building, release = threading.Event(), threading.Event()
+    build_search = catalog._build_search
+
+    def slow_build(rows):
+        building.set()
+        release.wait(5)
+        return build_search(rows)
+
+    monkeypatch.setattr(catalog, "_build_search", slow_build)
+
+    async def run():
+        reload = asyncio.create_task(catalog.refresh())
+        while not building.is_set():
+            await asyncio.sleep(0.01)
+        during = (catalog.search("chicken"), [r["id"] for r in catalog.query(search="chicken")])
+        release.set()
+        await reload
+        return during
+
+    assert asyncio.run(run()) == (["old"], ["old"])
+    assert catalog.search("chicken") == ["new"]
+    assert [r["id"] for r in catalog.query(search="chicken")] == ["new"]
+
+
+def test_writes_during_full_load_are_carried_over(monkeypatch):
+    catalog, state = _catalog(monkeypatch, [_recipe("a", "Chicken Soup"), _recipe("b", "Beef Stew")])
+    asyncio.run(catalog.refresh())
+
+    catalog._last_full_load = None
+    building, release = threading.Event(), threading.Event()
+    build_search = catalog._build_search
+
+    def slow_build(rows):
+        building.set()
+        release.wait(5)
+        return build_search(rows)
+
+    monkeypatch.setattr(catalog, "_build_search", slow_build)
+
+    async def run():
+        reload = asyncio.create_task(catalog.refresh())
+        while not building.is_set():
+            await asyncio.sleep(0.01)
+        catalog.upsert(_recipe("c", "Chicken Pie"))
+        catalog.remove("b")
+        release.set()
+        await reload
+
+    asyncio.run(run())
+    assert sorted(catalog.get_many(["a", "b", "c"])) == ["a", "c"]
+    assert catalog.search("chicken") == ["a", "c"]
+    assert catalog.search("beef") == []
+
+
+def test_local_writes_patch_indexes_like_a_rebuild(monkeypatch):
+    rng = random.Random(7)
+
+    def random_recipe(rid):
+        return _recipe(
+            rid, rng.choice(["Chicken Soup", "Beef Stew", "Tofu Bowl"]),
+            likes=rng.randint(0, 5),
+            meal_type=rng.sample(["Breakfast", "Lunch", "Dinner"], rng.randint(0, 2)),
+            dietary_tags=rng.sample(["vegan", "gluten-free"], rng.randint(0, 2)),
+            cuisine_type=rng.choice([None, "Thai", "Italian"]),
+            difficulty=rng.choice([None, "easy", "hard"]),
+            calories=rng.choice([None, 300, 450, 450, 600]),
+        )
+
+    catalog, _ = _catalog(monkeypatch, [random_recipe(f"r{i}") for i in range(30)])
+    asyncio.run(catalog.refresh())
+
+    for _ in range(200):
+        rid = f"r{rng.randint(0, 40)}"
+        if rng.random() < 0.3:
+            catalog.remove(rid)
+        else:
+            catalog.upsert(random_recipe(rid))
+
+    def snapshot():
+        return (
+            catalog._by_meal_type, catalog._by_dietary_tag, catalog._by_cuisine,
+            catalog._by_difficulty, catalog._by_likes, catalog._likes_rank,
+            catalog._calorie_keys, catalog._calorie_ids,
+        )
+
+    patched = copy.deepcopy(snapshot())
+    catalog._rebuild_indexes()
+    assert patched == snapshot()
+    assert [r["id"] for r in catalog.query(meal_type="Dinner", min_calories=400, max_calories=500)] == [
+        rid for rid in catalog._by_likes
+        if "Dinner" in (catalog._rows[rid].get("meal_type") or [])
+        and catalog._rows[rid].get("calories") == 450
+    ]
+
+
+def test_incremental_refresh_drops_rows_deleted_elsewhere(monkeypatch):
+    catalog, state = _catalog(monkeypatch, [
+        _recipe("a", "Chicken Soup", meal_type=["Dinner"], calories=400),
+        _recipe("b", "Chicken Pie", meal_type=["Dinner"], calories=500),
+    ])
+    asyncio.run(catalog.refresh())
+
+    # Deleted by another worker (or SQL): no upsert comes through for it
+    state["rows"] = [r for r in state["rows"] if r["id"] != "b"]
+    asyncio.run(catalog.refresh())
+
+    assert catalog.get_many(["a", "b"]).keys() == {"a"}
+    assert catalog.search("chicken") == ["a"]
+    assert [r["id"] for r in catalog.query(meal_type="Dinner", min_calories=300)] == ["a"]
+
+
+def test_incremental_refresh_keeps_rows_written_locally_during_the_pull(monkeypatch):
+    catalog, state = _catalog(monkeypatch, [_recipe("a", "Chicken Soup")])
+    asyncio.run(catalog.refresh())
+    fetch_pages = catalog._fetch_pages
+
+    async def fetch_then_write(since=None, columns=None):
+        rows = await fetch_pages(since, columns)
+        if columns == "id":
+            # This worker saves a recipe after the id list was read
+            catalog.upsert(_recipe("new", "Chicken Pie"))
+        return rows
+
+    monkeypatch.setattr(catalog, "_fetch_pages", fetch_then_write)
+    asyncio.run(catalog.refresh())
+
+    assert sorted(catalog.get_many(["a", "new"])) == ["a", "new"]
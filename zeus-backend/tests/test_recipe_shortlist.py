@@ -0,0 +1,30 @@
+import asyncio
+
+from app.services import recipe_shortlist_service as shortlist_module
+from app.services.recipe_catalog_service import RecipeCatalog
+
+
+def _loaded_catalog(monkeypatch, ids):
+    catalog = RecipeCatalog()
+
+    async def fetch_pages(since=None, columns=None):
+        return [{"id": rid, "title": rid, "updated_at": "2024-01-01T00:00:00+00:00"} for rid in ids]
+
+    monkeypatch.setattr(catalog, "_fetch_pages", fetch_pages)
+    asyncio.run(catalog.refresh())
+    return catalog
+
+
+def test_pick_for_slots_skips_recipes_deleted_since_the_pool_was_cached(monkeypatch):
+    service = shortlist_module.RecipeShortlistService()
+    pool = [{"id": rid, "cuisine_type": None} for rid in ("gone1", "kept", "gone2")]
+
+    async def slot_pool(preferences, meal_type, pool_key=None):
+        return pool
+
+    monkeypatch.setattr(service, "slot_pool", slot_pool)
+    monkeypatch.setattr(shortlist_module, "recipe_catalog", _loaded_catalog(monkeypatch, ["kept", "other"]))
+
+    picks = asyncio.run(service.pick_for_slots({}, [("monday", "dinner"), ("tuesday", "dinner")]))
+
+    assert picks == {("monday", "dinner"): "kept"}
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from app.services import task_service as task_module
+from app.services.task_service import MemoryTaskBackend, SQLiteTaskBackend, TaskStatus
+
+LEASE = 30
+RETENTION = 600
+CAPS = {"plan": None, "slot": None}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(task_module.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryTaskBackend()
+    else:
+        backend = SQLiteTaskBackend(str(tmp_path / "tasks.db"))
+    yield backend
+    asyncio.run(backend.close())
+
+
+def _task(task_id, user_id="u1", task_type="plan", run_at=1_000_000.0, max_attempts=3):
+    return {
+        "task_id": task_id,
+        "task_type": task_type,
+        "user_id": user_id,
+        "payload": {"user_id": user_id},
+        "status": TaskStatus.PENDING.value,
+        "progress": 0,
+        "stage": None,
+        "result": None,
+        "error": None,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_at": run_at,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "created_at": run_at,
+        "completed_at": None,
+        "expires_at": None,
+    }
+
+
+def _claim(backend, owner, type_caps=CAPS, max_per_user=0):
+    return backend.claim(owner, type_caps, max_per_user, LEASE, RETENTION)
+
+
+def test_claim_heartbeat_finish(backend, clock):
+    async def run():
+        await backend.create(_task("t1"))
+
+        task = await _claim(backend, "w1")
+        assert task["task_id"] == "t1"
+        assert task["status"] == TaskStatus.RUNNING
+        assert (task["lease_owner"], task["attempts"]) == ("w1", 1)
+        assert task["payload"] == {"user_id": "u1"}
+        assert await _claim(backend, "w2") is None
+
+        # Only the lease holder may report progress or finish
+        assert not await backend.heartbeat("t1", "w2", LEASE, 50, "other")
+        assert await backend.heartbeat("t1", "w1", LEASE, 40, "scoring")
+        stored = await backend.get("t1")
+        assert (stored["progress"], stored["stage"]) == (40, "scoring")
+        assert not await backend.finish("t1", "w2", TaskStatus.COMPLETED, {"ok": 0}, None, RETENTION)
+
+        assert await backend.finish("t1", "w1", TaskStatus.COMPLETED, {"ok": 1}, None, RETENTION)
+        stored = await backend.get("t1")
+        assert stored["status"] == TaskStatus.COMPLETED
+        assert (stored["progress"], stored["result"], stored["lease_owner"]) == (100, {"ok": 1}, None)
+        assert stored["expires_at"] == clock[0] + RETENTION
+        assert await backend.list_active("u1") == []
+
+        # A finished task can't be finished or heartbeat again
+        assert not await backend.heartbeat("t1", "w1", LEASE, 100, None)
+        assert not await backend.finish("t1", "w1", TaskStatus.FAILED, None, "late", RETENTION)
+
+    asyncio.run(run())
+
+
+def test_retry_waits_for_run_at_and_release_returns_the_attempt(backend, clock):
+    async def run():
+        await backend.create(_task("t1"))
+        await _claim(backend, "w1")
+
+        assert not await backend.retry("t1", "w2", "boom", clock[0] + 10)
+        assert await backend.retry("t1", "w1", "boom", clock[0] + 10)
+        stored = await backend.get("t1")
+        assert (stored["status"], stored["error"], stored["attempts"]) == (TaskStatus.PENDING, "boom", 1)
+        assert await _claim(backend, "w1") is None
+
+        clock[0] += 10
+        task = await _claim(backend, "w2")
+        assert (task["lease_owner"], task["attempts"]) == ("w2", 2)
+
+        # Shutting down: the task goes back without using up an attempt
+        await backend.release("t1", "w1")
+        assert (await backend.get("t1"))["lease_owner"] == "w2"
+        await backend.release("t1", "w2")
+        stored = await backend.get("t1")
+        assert (stored["status"], stored["attempts"], stored["lease_owner"]) == (TaskStatus.PENDING, 1, None)
+        assert [t["task_id"] for t in await backend.list_active("u1")] == ["t1"]
+
+        assert (await _claim(backend, "w3"))["attempts"] == 2
+
+    asyncio.run(run())
+
+
+def test_claim_respects_per_user_cap(backend, clock):
+    async def run():
+        await backend.create(_task("a1", user_id="a", run_at=clock[0] - 3))
+        await backend.create(_task("a2", user_id="a", run_at=clock[0] - 2))
+        await backend.create(_task("b1", user_id="b", run_at=clock[0] - 1))
+
+        assert (await _claim(backend, "w1", max_per_user=1))["task_id"] == "a1"
+        # a2 is older than b1 but user a is at the cap
+        assert (await _claim(backend, "w2", max_per_user=1))["task_id"] == "b1"
+        assert await _claim(backend, "w3", max_per_user=1) is None
+
+        await backend.finish("a1", "w1", TaskStatus.COMPLETED, None, None, RETENTION)
+        assert (await _claim(backend, "w3", max_per_user=1))["task_id"] == "a2"
+
+    asyncio.run(run())
+
+
+def test_claim_respects_per_type_cap_and_types(backend, clock):
+    async def run():
+        await backend.create(_task("p1", user_id="a", run_at=clock[0] - 4))
+        await backend.create(_task("p2", user_id="b", run_at=clock[0] - 3))
+        await backend.create(_task("s1", user_id="c", task_type="slot", run_at=clock[0] - 2))
+        await backend.create(_task("x1", user_id="d", task_type="other", run_at=clock[0] - 5))
+
+        caps = {"plan": 1, "slot": None}
+        assert (await _claim(backend, "w1", caps))["task_id"] == "p1"
+        # p2 is older than s1 but one plan is already running; "other" isn't handled here
+        assert (await _claim(backend, "w2", caps))["task_id"] == "s1"
+        assert await _claim(backend, "w3", caps) is None
+        assert await _claim(backend, "w3", {}) is None
+
+        assert (await _claim(backend, "w3", {"other": None}))["task_id"] == "x1"
+
+    asyncio.run(run())
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_locked_out(backend, clock):
+    async def run():
+        await backend.create(_task("t1"))
+        await _claim(backend, "w1")
+
+        # Heartbeats keep the lease
+        clock[0] += LEASE - 1
+        assert await backend.heartbeat("t1", "w1", LEASE, 10, "start")
+        clock[0] += LEASE - 1
+        assert await _claim(backend, "w2") is None
+
+        clock[0] += 2
+        task = await _claim(backend, "w2")
+        assert (task["task_id"], task["lease_owner"], task["attempts"]) == ("t1", "w2", 2)
+
+        assert not await backend.heartbeat("t1", "w1", LEASE, 20, "late")
+        assert not await backend.retry("t1", "w1", "late", clock[0])
+        assert not await backend.finish("t1", "w1", TaskStatus.COMPLETED, None, None, RETENTION)
+        assert await backend.finish("t1", "w2", TaskStatus.COMPLETED, {"ok": 1}, None, RETENTION)
+
+    asyncio.run(run())
+
+
+def test_expired_lease_on_last_attempt_fails_the_task(backend, clock):
+    async def run():
+        await backend.create(_task("t1", max_attempts=1))
+        await _claim(backend, "w1")
+
+        clock[0] += LEASE + 1
+        assert await _claim(backend, "w2") is None
+        stored = await backend.get("t1")
+        assert stored["status"] == TaskStatus.FAILED
+        assert stored["error"] == "Task was abandoned by its worker"
+        assert stored["expires_at"] == clock[0] + RETENTION
+
+    asyncio.run(run())
+
+
+def test_delete_expired_removes_only_finished_tasks_past_retention(backend, clock):
+    async def run():
+        await backend.create(_task("done"))
+        await backend.create(_task("pending", run_at=clock[0] + 60))
+        await _claim(backend, "w1")
+        await backend.finish("done", "w1", TaskStatus.FAILED, None, "boom", RETENTION)
+        finished_at = clock[0]
+
+        assert await backend.delete_expired(finished_at + RETENTION - 1) == 0
+        assert await backend.get("done") is not None
+
+        assert await backend.delete_expired(finished_at + RETENTION) == 1
+        assert await backend.get("done") is None
+        assert (await backend.get("pending"))["status"] == TaskStatus.PENDING
+        assert await backend.delete_expired(finished_at + 10 * RETENTION) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,77 @@
+from app.utils.text_search import SearchIndex, tokenize
+
+WEIGHTS = {"title": 3.0, "ingredients": 2.0, "description": 1.0}
+
+
+def _index(docs):
+    index = SearchIndex(WEIGHTS)
+    for doc_id, fields in docs.items():
+        index.add(doc_id, fields)
+    return index
+
+
+def _ids(index, query):
+    return [doc_id for doc_id, _ in index.search(query)]
+
+
+DOCS = {
+    "pasta": {"title": "Tomato Basil Pasta", "ingredients": "tomatoes basil spaghetti", "description": None},
+    "salad": {"title": "Caprese Salad", "ingredients": "tomato mozzarella basil", "description": "Fresh and quick"},
+    "curry": {"title": "Chickpea Curry", "ingredients": "chickpeas coconut milk", "description": "Serve with basil"},
+    "cake": {"title": "Chocolate Cake", "ingredients": "flour cocoa sugar", "description": None},
+}
+
+
+def test_tokenize_stems_plurals():
+    assert tokenize("Tomatoes, Berries & Chickpeas!") == ["tomato", "berry", "chickpea"]
+
+
+def test_exact_and_plural_match():
+    index = _index(DOCS)
+    assert set(_ids(index, "tomatoes")) == {"pasta", "salad"}
+    assert _ids(index, "chickpea") == ["curry"]
+
+
+def test_prefix_match():
+    index = _index(DOCS)
+    assert _ids(index, "choc") == ["cake"]
+    assert set(_ids(index, "mozz")) == {"salad"}
+    # Tokens below MIN_PREFIX_LENGTH only match exactly
+    assert _ids(index, "c") == []
+
+
+def test_typo_match():
+    index = _index(DOCS)
+    assert _ids(index, "spagetti") == ["pasta"]
+    assert _ids(index, "choclate") == ["cake"]
+
+
+def test_every_token_must_match():
+    index = _index(DOCS)
+    assert set(_ids(index, "basil tomato")) == {"pasta", "salad"}
+    assert _ids(index, "basil cocoa") == []
+
+
+def test_ranking_prefers_title_over_description():
+    index = _index(DOCS)
+    # "basil" is in pasta's title and ingredients, salad's ingredients, curry's description
+    assert _ids(index, "basil") == ["pasta", "salad", "curry"]
+
+
+def test_ranking_prefers_exact_over_prefix_and_fuzzy():
+    index = _index({
+        "exact": {"title": "Pear Tart", "ingredients": None, "description": None},
+        "prefix": {"title": "Pearl Barley", "ingredients": None, "description": None},
+    })
+    assert _ids(index, "pear") == ["exact", "prefix"]
+
+
+def test_readd_and_remove_update_postings():
+    index = _index(DOCS)
+    index.add("cake", {"title": "Carrot Cake", "ingredients": "carrots flour", "description": None})
+    assert _ids(index, "chocolate") == []
+    assert _ids(index, "carrot") == ["cake"]
+
+    index.remove("cake")
+    assert _ids(index, "carrot") == []
+    assert len(index) == 3